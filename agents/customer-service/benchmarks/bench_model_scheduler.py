@@ -0,0 +1,129 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Queueing delay per priority class when a FAQ burst exhausts the quota.
+
+Drives `customer_service.shared_libraries.model_scheduler.ModelScheduler`
+directly, without models: `--faq` HR model calls arrive at once, while
+`--interview` and `--onboarding` calls arrive evenly over `--seconds`. The
+run is repeated with the configured class weights and with every call in
+one class (first come, first served), both on a quota of `--rpm`:
+
+    python -m benchmarks.bench_model_scheduler --rpm 600 --faq 150
+
+Prints queueing delay (p50/p95/p99), admitted and shed calls per class for
+both runs.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_sse_server import percentiles
+from customer_service.config import ModelSchedulerModel
+from customer_service.shared_libraries.model_scheduler import ModelScheduler
+
+
+async def arrivals(
+    scheduler: ModelScheduler,
+    cls: str,
+    count: int,
+    seconds: float,
+    fifo: bool,
+    report: Dict[str, Dict[str, Any]],
+) -> None:
+    delays: List[float] = []
+    shed = 0
+
+    async def call() -> None:
+        nonlocal shed
+        started = time.perf_counter()
+        if await scheduler.acquire("all" if fifo else cls):
+            delays.append(time.perf_counter() - started)
+        else:
+            shed += 1
+
+    gap = seconds / count if count else 0.0
+    tasks: List[asyncio.Task] = []
+    for _ in range(count):
+        tasks.append(asyncio.create_task(call()))
+        await asyncio.sleep(gap)
+    await asyncio.gather(*tasks)
+    report[cls] = {
+        "admitted": len(delays),
+        "shed": shed,
+        "delay_ms": percentiles([d * 1000 for d in delays]),
+    }
+
+
+async def measure(
+    settings: ModelSchedulerModel,
+    fifo: bool,
+    faq: int,
+    interview: int,
+    onboarding: int,
+    seconds: float,
+) -> Dict[str, Any]:
+    scheduler = ModelScheduler(settings)
+    report: Dict[str, Dict[str, Any]] = {}
+    await asyncio.gather(
+        arrivals(scheduler, "hr", faq, 0.0, fifo, report),
+        arrivals(scheduler, "interview", interview, seconds, fifo, report),
+        arrivals(scheduler, "onboarding", onboarding, seconds, fifo, report),
+    )
+    return report
+
+
+async def run(
+    rpm: float, faq: int, interview: int, onboarding: int, seconds: float
+) -> Dict[str, Any]:
+    settings = ModelSchedulerModel(requests_per_minute=rpm, burst=5)
+    # First come, first served: one class, nothing shed.
+    fifo = settings.model_copy(
+        update={
+            "max_wait_secs": {},
+            "default_max_wait_secs": 3600.0,
+            "max_queue_depth": faq + interview + onboarding,
+        }
+    )
+    counts = (faq, interview, onboarding, seconds)
+    return {
+        "rpm": rpm,
+        "weighted": await measure(settings, False, *counts),
+        "fifo": await measure(fifo, True, *counts),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rpm", type=float, default=600.0)
+    parser.add_argument("--faq", type=int, default=150)
+    parser.add_argument("--interview", type=int, default=20)
+    parser.add_argument("--onboarding", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    report = asyncio.run(
+        run(
+            args.rpm, args.faq, args.interview, args.onboarding, args.seconds
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
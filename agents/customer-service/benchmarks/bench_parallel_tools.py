@@ -0,0 +1,206 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Latency of model turns that emit several function calls at once.
+
+A stub model answers each turn with `--candidates` x `--steps` function
+calls of a slow stub tool (`--tool-ms` of blocking work per call), then a
+text reply. The turn is run with the plain synchronous tool and with the
+tool wrapped by `customer_service.shared_libraries.tool_executor`:
+
+    python -m benchmarks.bench_parallel_tools --candidates 4 --steps 3
+
+Reports turn latency (p50/p95) for both, and checks that the function
+responses come back in call order and that the steps of each candidate
+ran in order.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from google.adk import Agent
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from benchmarks.bench_sse_server import percentiles
+from customer_service.config import ToolExecutorModel
+from customer_service.shared_libraries.tool_executor import (
+    ToolExecutor,
+    parallelize,
+)
+
+
+class MultiCallLlm(BaseLlm):
+    """Emits `candidates` x `steps` calls of `update_step`, then replies."""
+
+    candidates: int = 4
+    steps: int = 3
+
+    async def generate_content_async(self, llm_request, stream=False):
+        if llm_request.contents[-1].parts[0].function_response:
+            yield LlmResponse(
+                content=types.Content(
+                    role="model", parts=[types.Part(text="All done.")]
+                )
+            )
+            return
+        # Interleaved the way a model lists them: step 0 for everyone, then
+        # step 1, ...
+        calls = [
+            types.Part(
+                function_call=types.FunctionCall(
+                    id=f"call-{step}-{candidate}",
+                    name="update_step",
+                    args={"candidate_id": f"C{candidate:03d}", "step": step},
+                )
+            )
+            for step in range(self.steps)
+            for candidate in range(self.candidates)
+        ]
+        yield LlmResponse(content=types.Content(role="model", parts=calls))
+
+
+def slow_tool(tool_ms: float, log: List[tuple]) -> Callable[..., dict]:
+    """Returns a blocking stub tool that records the order it ran in."""
+    lock = threading.Lock()
+
+    def update_step(candidate_id: str, step: int) -> dict:
+        """Moves a candidate to the given onboarding step.
+
+        Args:
+            candidate_id (str): The ID of the candidate.
+            step (int): The step to move to.
+
+        Returns:
+            dict: The candidate and the step it is now at.
+        """
+        time.sleep(tool_ms / 1000)
+        with lock:
+            log.append((candidate_id, step))
+        return {"candidate_id": candidate_id, "step": step}
+
+    return update_step
+
+
+def bench_runner(
+    tool: Callable[..., Any], candidates: int, steps: int
+) -> InMemoryRunner:
+    agent = Agent(
+        name="bench_agent",
+        model=MultiCallLlm(model="stub", candidates=candidates, steps=steps),
+        instruction="Update every candidate.",
+        tools=[tool],
+    )
+    return InMemoryRunner(agent=agent, app_name="bench")
+
+
+async def run_turn(runner: InMemoryRunner) -> Dict[str, Any]:
+    """Runs one turn; returns its latency and the function responses."""
+    session = await runner.session_service.create_session(
+        app_name="bench", user_id="bench"
+    )
+    message = types.Content(role="user", parts=[types.Part(text="go")])
+    started = time.perf_counter()
+    responses = []
+    async for event in runner.run_async(
+        user_id="bench", session_id=session.id, new_message=message
+    ):
+        responses += [
+            part.function_response
+            for part in (event.content.parts if event.content else None) or []
+            if part.function_response
+        ]
+    return {
+        "ms": (time.perf_counter() - started) * 1000,
+        "responses": responses,
+    }
+
+
+def in_call_order(responses: List[types.FunctionResponse]) -> bool:
+    ids = [response.id for response in responses]
+    key = lambda i: tuple(int(n) for n in i.split("-")[1:])  # noqa: E731
+    return ids == sorted(ids, key=key)
+
+
+def in_step_order(log: List[tuple]) -> bool:
+    steps: Dict[str, int] = {}
+    for candidate_id, step in log:
+        if step < steps.get(candidate_id, -1):
+            return False
+        steps[candidate_id] = step
+    return True
+
+
+async def measure(
+    parallel: bool, turns: int, candidates: int, steps: int, tool_ms: float
+) -> Dict[str, Any]:
+    log: List[tuple] = []
+    tool = slow_tool(tool_ms, log)
+    executor = None
+    if parallel:
+        executor = ToolExecutor(ToolExecutorModel(max_workers=16))
+        tool = parallelize([tool], executor)[0]
+    runner = bench_runner(tool, candidates, steps)
+    # The first run pays for ADK's lazy imports; keep it out of the numbers.
+    await run_turn(runner)
+    results = []
+    for _ in range(turns):
+        log.clear()
+        result = await run_turn(runner)
+        result["steps_in_order"] = in_step_order(log)
+        results.append(result)
+    if executor is not None:
+        executor.shutdown()
+    return {
+        "turn_ms": percentiles([r["ms"] for r in results]),
+        "responses_in_call_order": all(
+            in_call_order(r["responses"]) for r in results
+        ),
+        "steps_in_order": all(r["steps_in_order"] for r in results),
+    }
+
+
+async def run(
+    turns: int, candidates: int, steps: int, tool_ms: float
+) -> Dict[str, Any]:
+    return {
+        "calls_per_turn": candidates * steps,
+        "tool_ms": tool_ms,
+        "sequential": await measure(False, turns, candidates, steps, tool_ms),
+        "parallel": await measure(True, turns, candidates, steps, tool_ms),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--candidates", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument("--tool-ms", type=float, default=100.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    report = asyncio.run(
+        run(args.turns, args.candidates, args.steps, args.tool_ms)
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
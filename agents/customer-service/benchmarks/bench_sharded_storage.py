@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Write throughput of the employee roster against its number of shards.
+
+`--writers` threads (the tool executor's workers on a busy day) each run
+read-modify-write updates of random employees, the way
+`update_employee_status` does, against a file-backed roster of
+`--employees` records split into 1, 2, 4, ... `--max-shards` shards:
+
+    python -m benchmarks.bench_sharded_storage --writers 8 --max-shards 8
+
+Reports writes per second and write latency (p50/p95) per shard count,
+plus the time `reshard` takes to go from one shard to the most.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_sse_server import percentiles
+from customer_service.config import StorageModel
+from customer_service.jobs.generate_synthetic import RosterGenerator
+from customer_service.shared_libraries.sharded_storage import (
+    ShardedEmployeeStore,
+)
+
+
+def seed(path: str, shards: int, employees: int) -> ShardedEmployeeStore:
+    store = ShardedEmployeeStore(
+        path, shards, StorageModel(layout_refresh_secs=0)
+    )
+    generator = RosterGenerator(seed=0)
+    for start in range(0, employees, 1000):
+        store.put_many(
+            generator.employees(min(1000, employees - start), start)
+        )
+    return store
+
+
+def measure(
+    store: ShardedEmployeeStore, writers: int, writes: int, employees: int
+) -> Dict[str, Any]:
+    """Runs `writes` updates per writer thread; returns rate and latency."""
+    latencies: List[float] = []
+    lock = threading.Lock()
+    ids = [f"E{i:07d}" for i in range(employees)]
+
+    def write(worker: int) -> None:
+        rng = random.Random(worker)
+        mine = []
+        for _ in range(writes):
+            started = time.perf_counter()
+            employee = store.get(rng.choice(ids))
+            employee.status = rng.choice(("Interviewed", "Hired", "Agent"))
+            store.put(employee)
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [
+        threading.Thread(target=write, args=(w,)) for w in range(writers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "writes_per_sec": round(len(latencies) / elapsed, 1),
+        "write_ms": percentiles([s * 1000 for s in latencies]),
+    }
+
+
+def run(
+    writers: int, writes: int, employees: int, max_shards: int
+) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "writers": writers,
+        "employees": employees,
+        "by_shards": {},
+    }
+    shards = 1
+    with tempfile.TemporaryDirectory() as tmp:
+        while shards <= max_shards:
+            path = os.path.join(tmp, f"roster-{shards}.db")
+            store = seed(path, shards, employees)
+            report["by_shards"][shards] = measure(
+                store, writers, writes, employees
+            )
+            store.close()
+            shards *= 2
+        store = seed(os.path.join(tmp, "reshard.db"), 1, employees)
+        report["reshard"] = store.reshard(max_shards)
+        store.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=300)
+    parser.add_argument("--employees", type=int, default=20000)
+    parser.add_argument("--max-shards", type=int, default=8)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    report = run(args.writers, args.writes, args.employees, args.max_shards)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
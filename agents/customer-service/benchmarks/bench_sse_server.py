@@ -0,0 +1,225 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Load test of the SSE front end: time-to-first-event under concurrency.
+
+Starts `customer_service.main.ChatServer` in process on a free port, backed
+by an agent whose model is a stub that waits `--latency-ms` and then streams
+`--chunks` partial responses. `--clients` concurrent clients each hold one
+keep-alive connection and send `--turns` chats over it:
+
+    python -m benchmarks.bench_sse_server --clients 500 --max-concurrent 64
+
+Reports time to the first `message` event and to `done` (p50/p95/p99),
+rejected chats (503) and chats per second.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk import Agent
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from customer_service.config import ServerModel
+from customer_service.main import ChatServer
+
+
+class StreamingLlm(BaseLlm):
+    """Waits `latency_ms`, then streams `chunks` partial text responses."""
+
+    latency_ms: float = 50.0
+    chunks: int = 5
+    chunk_interval_ms: float = 5.0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        await asyncio.sleep(self.latency_ms / 1000)
+        words = [f"word{i} " for i in range(self.chunks)]
+        if stream:
+            for word in words:
+                yield LlmResponse(
+                    content=types.Content(
+                        role="model", parts=[types.Part(text=word)]
+                    ),
+                    partial=True,
+                )
+                await asyncio.sleep(self.chunk_interval_ms / 1000)
+        yield LlmResponse(
+            content=types.Content(
+                role="model", parts=[types.Part(text="".join(words))]
+            )
+        )
+
+
+def bench_runner(**llm_settings: Any) -> InMemoryRunner:
+    agent = Agent(
+        name="bench_agent",
+        model=StreamingLlm(model="stub", **llm_settings),
+        instruction="Answer briefly.",
+    )
+    return InMemoryRunner(agent=agent, app_name="bench")
+
+
+async def read_chunked_events(reader: asyncio.StreamReader):
+    """Yields (event, data) pairs from a chunked SSE response body."""
+    buffer = b""
+    while True:
+        size = int((await reader.readline()).strip(), 16)
+        if size == 0:
+            await reader.readline()
+            return
+        buffer += await reader.readexactly(size)
+        await reader.readline()
+        while b"\n\n" in buffer:
+            block, buffer = buffer.split(b"\n\n", 1)
+            fields = dict(
+                line.split(": ", 1)
+                for line in block.decode().splitlines()
+                if not line.startswith(":")
+            )
+            if "event" in fields:
+                yield fields["event"], json.loads(fields["data"])
+
+
+async def read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode().partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, headers
+
+
+async def chat(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    message: str,
+    session_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Sends one chat on an open connection and reads its event stream."""
+    body = json.dumps({"message": message, "session_id": session_id}).encode()
+    started = time.perf_counter()
+    writer.write(
+        b"POST /chat HTTP/1.1\r\nHost: localhost\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+    )
+    await writer.drain()
+    status, headers = await read_head(reader)
+    result: Dict[str, Any] = {"status": status, "events": []}
+    if status != 200:
+        await reader.readexactly(int(headers["content-length"]))
+        return result
+    async for event, data in read_chunked_events(reader):
+        if event == "message" and "first_event_ms" not in result:
+            result["first_event_ms"] = (time.perf_counter() - started) * 1000
+        if event == "session":
+            result["session_id"] = data["session_id"]
+        result["events"].append((event, data))
+    result["total_ms"] = (time.perf_counter() - started) * 1000
+    result["keep_alive"] = headers.get("connection") == "keep-alive"
+    return result
+
+
+async def client(port: int, turns: int, results: List[Dict[str, Any]]):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    session_id = None
+    try:
+        for turn in range(turns):
+            result = await chat(reader, writer, f"hello {turn}", session_id)
+            session_id = result.get("session_id", session_id)
+            results.append(result)
+            if not result.get("keep_alive"):
+                break
+    finally:
+        writer.close()
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    cuts = statistics.quantiles(values, n=100) if len(values) > 1 else values
+    pick = lambda p: cuts[min(p, len(cuts)) - 1]  # noqa: E731
+    return {
+        "p50": round(pick(50), 1),
+        "p95": round(pick(95), 1),
+        "p99": round(pick(99), 1),
+    }
+
+
+async def run(
+    clients: int,
+    turns: int,
+    max_concurrent: int,
+    latency_ms: float,
+    chunks: int,
+) -> Dict[str, Any]:
+    settings = ServerModel(
+        port=0,
+        max_concurrent_runs=max_concurrent,
+        admission_timeout_secs=30.0,
+    )
+    server = ChatServer(
+        bench_runner(latency_ms=latency_ms, chunks=chunks), settings
+    )
+    await server.start()
+    # The first run pays for ADK's lazy imports; keep it out of the numbers.
+    await client(server.port, 1, [])
+    results: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(client(server.port, turns, results) for _ in range(clients))
+    )
+    elapsed = time.perf_counter() - started
+    await server.shutdown()
+    ok = [r for r in results if r["status"] == 200]
+    return {
+        "clients": clients,
+        "chats": len(results),
+        "rejected": len(results) - len(ok),
+        "chats_per_sec": round(len(ok) / elapsed, 1),
+        "first_event_ms": percentiles([r["first_event_ms"] for r in ok]),
+        "total_ms": percentiles([r["total_ms"] for r in ok]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--max-concurrent", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--chunks", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    report = asyncio.run(
+        run(
+            args.clients,
+            args.turns,
+            args.max_concurrent,
+            args.latency_ms,
+            args.chunks,
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
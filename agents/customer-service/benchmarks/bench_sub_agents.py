@@ -0,0 +1,226 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares prompt size and turn latency of the agent tree vs. one agent.
+
+Replays the queries of `eval/eval_data/*.test.json` through both the router +
+sub-agent tree in `customer_service.agent` and a monolithic agent carrying the
+full `INSTRUCTION` and every tool. Models are replaced by stubs that measure
+the request ADK actually builds (instructions, tool declarations, history)
+and optionally simulate prefill cost per 1k prompt tokens, so the benchmark
+runs offline:
+
+    python -m benchmarks.bench_sub_agents --ms-per-1k-tokens 40
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+from google.adk import Agent
+from google.adk.agents import BaseAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from customer_service import agent as agent_module
+from customer_service.prompts import GLOBAL_INSTRUCTION, INSTRUCTION
+from customer_service.shared_libraries import callbacks
+from customer_service.shared_libraries.history import estimate_tokens
+from customer_service.shared_libraries.model_router import FAST, classify_turn
+
+EVAL_DATA = os.path.join(
+    os.path.dirname(__file__), "..", "eval", "eval_data", "*.test.json"
+)
+
+# Stand-in for the router model's decision; the stub only needs a plausible
+# split of traffic across specialists.
+_ROUTES = [
+    (
+        "interview_agent",
+        ("interview", "applicant", "apply", "candidate", "promot"),
+    ),
+    ("onboarding_agent", ("onboard", "start date", "status", "check out")),
+]
+
+
+def prompt_tokens(llm_request: LlmRequest) -> int:
+    """Estimates the prompt tokens of a request as the model would see it."""
+    config = llm_request.config
+    text = str(config.system_instruction or "") if config else ""
+    for tool in (config.tools if config else None) or []:
+        for declaration in getattr(tool, "function_declarations", None) or []:
+            text += declaration.model_dump_json(exclude_none=True)
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            text += part.model_dump_json(exclude_none=True)
+    return estimate_tokens(text)
+
+
+class BenchLlm(BaseLlm):
+    """Records request sizes and answers like a router or a specialist."""
+
+    router: bool = False
+    ms_per_1k_tokens: float = 0.0
+    # Typed Any so pydantic keeps the caller's list instead of copying it.
+    samples: Any = None
+
+    async def generate_content_async(self, llm_request, stream=False):
+        tokens = prompt_tokens(llm_request)
+        self.samples.append(tokens)
+        await asyncio.sleep(tokens / 1000 * self.ms_per_1k_tokens / 1000)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        query = (last.parts[0].text or "") if last and last.parts else ""
+        if self.router and query and classify_turn(llm_request) != FAST:
+            target = next(
+                (
+                    name
+                    for name, words in _ROUTES
+                    if any(w in query.lower() for w in words)
+                ),
+                "hr_agent",
+            )
+            part = types.Part(
+                function_call=types.FunctionCall(
+                    name="transfer_to_agent", args={"agent_name": target}
+                )
+            )
+        else:
+            part = types.Part(text=f"[{self.model}] ok")
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def _walk(agent: BaseAgent):
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+
+
+def _prepare(
+    root: BaseAgent, samples: List[int], ms_per_1k_tokens: float
+) -> None:
+    for node in _walk(root):
+        node.model = BenchLlm(
+            model=node.name,
+            router=bool(node.sub_agents),
+            ms_per_1k_tokens=ms_per_1k_tokens,
+            samples=samples,
+        )
+        # Measure every call: no cached answers.
+        node.before_model_callback = [
+            callbacks.route_model_callback,
+            callbacks.prune_history_callback,
+            callbacks.rate_limit_callback,
+        ]
+
+
+def build_monolith() -> Agent:
+    """Builds the single agent that carried every tool and responsibility."""
+    tools = []
+    for node in _walk(agent_module.root_agent):
+        tools.extend(t for t in node.tools if t not in tools)
+    return Agent(
+        model=agent_module.configs.agent_settings.model,
+        global_instruction=GLOBAL_INSTRUCTION,
+        instruction=INSTRUCTION,
+        name="monolith",
+        tools=tools,
+        **agent_module.CALLBACKS,
+    )
+
+
+async def run_conversations(
+    root: BaseAgent, conversations: List[List[str]], ms_per_1k_tokens: float
+) -> Dict[str, float]:
+    """Plays every conversation through `root` and summarizes the samples."""
+    samples: List[int] = []
+    _prepare(root, samples, ms_per_1k_tokens)
+    runner = InMemoryRunner(agent=root, app_name="bench")
+    turn_latencies, turn_tokens = [], []
+    # The first conversation is played once unmeasured to warm up imports
+    # and lazily built state.
+    for warm_up, queries in [(True, conversations[0])] + [
+        (False, q) for q in conversations
+    ]:
+        session = await runner.session_service.create_session(
+            app_name="bench", user_id="bench"
+        )
+        for query in queries:
+            before = len(samples)
+            started = time.perf_counter()
+            async for _ in runner.run_async(
+                user_id="bench",
+                session_id=session.id,
+                new_message=types.Content(
+                    role="user", parts=[types.Part(text=query)]
+                ),
+            ):
+                pass
+            if warm_up:
+                del samples[before:]
+                continue
+            turn_latencies.append(time.perf_counter() - started)
+            turn_tokens.append(sum(samples[before:]))
+    turn_latencies.sort()
+    return {
+        "model_calls": len(samples),
+        "mean_prompt_tokens_per_call": statistics.mean(samples),
+        "mean_prompt_tokens_per_turn": statistics.mean(turn_tokens),
+        "mean_turn_latency_ms": statistics.mean(turn_latencies) * 1000,
+        "p95_turn_latency_ms": turn_latencies[
+            min(len(turn_latencies) - 1, int(len(turn_latencies) * 0.95))
+        ]
+        * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--ms-per-1k-tokens",
+        type=float,
+        default=0.0,
+        help="Simulated model prefill latency per 1k prompt tokens",
+    )
+    args = parser.parse_args()
+
+    # Benchmark traffic must never wait on the per-session RPM quota.
+    callbacks.RPM_QUOTA = 10**9
+    conversations = []
+    for path in sorted(glob.glob(EVAL_DATA)):
+        with open(path, encoding="utf-8") as f:
+            conversations.append([case["query"] for case in json.load(f)])
+
+    results = {
+        "sub_agents": asyncio.run(
+            run_conversations(
+                agent_module.root_agent, conversations, args.ms_per_1k_tokens
+            )
+        ),
+        "monolith": asyncio.run(
+            run_conversations(
+                build_monolith(), conversations, args.ms_per_1k_tokens
+            )
+        ),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Replays recorded sessions through `root_agent` against latency budgets.
+
+Every user message of `eval/sessions/*.session.json` is sent to the agent
+tree again, while the model's answers are served from the recorded events, so
+no model is called and what remains is the overhead of ADK and our own code.
+Every callback and tool is timed per turn, and a second pass under
+`tracemalloc` measures peak allocation per turn. Results are compared
+against `replay_budgets.json`:
+
+    python -m benchmarks.replay_sessions            # diff report, exit 1 on
+                                                    # any budget exceeded
+    python -m benchmarks.replay_sessions --update-budgets
+
+Recorded tool calls are re-executed against the real tools. A call to a
+tool owned by another agent of the tree is preceded by a transfer to that
+agent; calls to tools that no longer exist are dropped from the replay.
+"""
+
+import argparse
+import asyncio
+import functools
+import glob
+import inspect
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from customer_service import agent as agent_module
+from customer_service.config import ModelSchedulerModel
+from customer_service.shared_libraries import callbacks
+from customer_service.shared_libraries.model_scheduler import ModelScheduler
+
+SESSIONS = os.path.join(
+    os.path.dirname(__file__), "..", "eval", "sessions", "*.session.json"
+)
+BUDGETS = os.path.join(os.path.dirname(__file__), "replay_budgets.json")
+_CALLBACK_FIELDS = (
+    "before_agent_callback",
+    "after_agent_callback",
+    "before_model_callback",
+    "after_model_callback",
+    "before_tool_callback",
+    "after_tool_callback",
+)
+
+
+def load_turns(path: str) -> List[Dict[str, Any]]:
+    """Splits a session trace into turns of user text and model contents."""
+    with open(path, encoding="utf-8") as f:
+        events = json.load(f)["events"]
+    turns: List[Dict[str, Any]] = []
+    for event in events:
+        content = event.get("content") or {}
+        parts = content.get("parts") or []
+        if event["author"] == "user":
+            text = " ".join(p["text"] for p in parts if p.get("text"))
+            turns.append({"query": text, "model": []})
+        elif turns and content.get("role") == "model":
+            turns[-1]["model"].append(types.Content.model_validate(content))
+    return turns
+
+
+class Timings:
+    """Accumulates wall time per instrumented callable for the current turn."""
+
+    def __init__(self):
+        self.turn: Dict[str, float] = defaultdict(float)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.turn[name] += seconds
+
+    def take(self) -> Dict[str, float]:
+        turn, self.turn = dict(self.turn), defaultdict(float)
+        return turn
+
+
+def timed(func: Callable, name: str, timings: Timings) -> Callable:
+    """Wraps a sync or async callable so each call's duration is recorded."""
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                timings.add(name, time.perf_counter() - started)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings.add(name, time.perf_counter() - started)
+
+    return wrapper
+
+
+class ReplayLlm(BaseLlm):
+    """Answers each model call with the next recorded model content."""
+
+    # Typed Any so pydantic keeps the shared objects instead of copying them.
+    player: Any = None
+
+    async def generate_content_async(self, llm_request, stream=False):
+        yield LlmResponse(content=self.player.next(llm_request))
+
+
+class Player:
+    """Serves the recorded model contents of the current turn in order."""
+
+    def __init__(self, tool_owners: Dict[str, str]):
+        self.tool_owners = tool_owners
+        self.queue: List[types.Content] = []
+        self.dropped_calls = 0
+        self._transfers = 0
+
+    def start_turn(self, model_contents: List[types.Content]) -> None:
+        self.queue = list(model_contents)
+        self._transfers = 0
+
+    def next(self, llm_request) -> types.Content:
+        while self.queue:
+            content = self.queue[0]
+            calls = [p.function_call for p in content.parts if p.function_call]
+            missing = [c for c in calls if c.name not in llm_request.tools_dict]
+            owner = next(
+                (
+                    self.tool_owners[c.name]
+                    for c in missing
+                    if c.name in self.tool_owners
+                ),
+                None,
+            )
+            if owner and self._transfers < 3:
+                # The call belongs to another agent: route there first and
+                # serve the same content again once it asks.
+                self._transfers += 1
+                return _function_call("transfer_to_agent", agent_name=owner)
+            self.queue.pop(0)
+            self._transfers = 0
+            if not missing:
+                return content
+            self.dropped_calls += len(missing)
+            kept = [
+                p
+                for p in content.parts
+                if not any(p.function_call is c for c in missing)
+            ]
+            if kept:
+                return types.Content(role="model", parts=kept)
+        return types.Content(role="model", parts=[types.Part(text="")])
+
+
+def _function_call(name: str, **args) -> types.Content:
+    return types.Content(
+        role="model",
+        parts=[
+            types.Part(function_call=types.FunctionCall(name=name, args=args))
+        ],
+    )
+
+
+def _walk(agent: BaseAgent):
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from _walk(sub_agent)
+
+
+def instrument(
+    root: BaseAgent, player: Player, timings: Timings
+) -> Callable[[], None]:
+    """Installs the replay model and timing wrappers on every agent.
+
+    Returns:
+        A function that restores the agents' original models, callbacks and
+        tools.
+    """
+    saved = []
+    for node in _walk(root):
+        for field in ("model", "tools", *_CALLBACK_FIELDS):
+            if hasattr(node, field):
+                saved.append((node, field, getattr(node, field)))
+        node.model = ReplayLlm(model=f"replay:{node.name}", player=player)
+        for field in _CALLBACK_FIELDS:
+            value = getattr(node, field, None)
+            if value is None:
+                continue
+            funcs = value if isinstance(value, list) else [value]
+            setattr(
+                node,
+                field,
+                [
+                    timed(f, f"callback:{f.__name__}", timings)
+                    for f in funcs
+                ],
+            )
+        node.tools = [
+            timed(t, f"tool:{t.__name__}", timings) if callable(t) else t
+            for t in node.tools
+        ]
+
+    def restore() -> None:
+        for node, field, value in saved:
+            setattr(node, field, value)
+
+    return restore
+
+
+async def replay(
+    root: BaseAgent,
+    turns: List[Dict[str, Any]],
+    player: Player,
+    timings: Timings,
+    measure_alloc: bool = False,
+) -> List[Dict[str, Any]]:
+    """Plays every turn once and returns per-turn measurements."""
+    runner = InMemoryRunner(agent=root, app_name="replay")
+    session = await runner.session_service.create_session(
+        app_name="replay", user_id="replay"
+    )
+    results = []
+    for index, turn in enumerate(turns):
+        player.start_turn(turn["model"])
+        timings.take()
+        if measure_alloc:
+            tracemalloc.start()
+        started = time.perf_counter()
+        async for _ in runner.run_async(
+            user_id="replay",
+            session_id=session.id,
+            new_message=types.Content(
+                role="user", parts=[types.Part(text=turn["query"])]
+            ),
+        ):
+            pass
+        elapsed = time.perf_counter() - started
+        result = {"turn": index, "query": turn["query"][:60]}
+        if measure_alloc:
+            peak = tracemalloc.get_traced_memory()[1]
+            result["alloc_kib"] = round(peak / 1024, 1)
+            tracemalloc.stop()
+        else:
+            result["latency_ms"] = round(elapsed * 1000, 2)
+            result["breakdown_ms"] = {
+                k: round(v * 1000, 3)
+                for k, v in sorted(timings.take().items())
+            }
+        results.append(result)
+    return results
+
+
+def measure(path: str, repeats: int = 5) -> List[Dict[str, Any]]:
+    """Replays one trace: best-of-`repeats` timings, then one alloc pass."""
+    tool_owners = {
+        t.__name__: node.name
+        for node in _walk(agent_module.root_agent)
+        for t in node.tools
+        if callable(t)
+    }
+    turns = load_turns(path)
+    player, timings = Player(tool_owners), Timings()
+    restore = instrument(agent_module.root_agent, player, timings)
+    try:
+        best: Optional[List[Dict[str, Any]]] = None
+        for _ in range(repeats + 1):  # the first pass warms up imports
+            callbacks.response_cache.clear()
+            run = asyncio.run(
+                replay(agent_module.root_agent, turns, player, timings)
+            )
+            if best is None:
+                best = [dict(r, latency_ms=float("inf")) for r in run]
+                continue
+            for kept, new in zip(best, run):
+                if new["latency_ms"] < kept["latency_ms"]:
+                    kept.update(new)
+        callbacks.response_cache.clear()
+        player.dropped_calls = 0  # report a single pass
+        allocs = asyncio.run(
+            replay(agent_module.root_agent, turns, player, timings, True)
+        )
+    finally:
+        restore()
+        callbacks.response_cache.clear()
+    for kept, alloc in zip(best, allocs):
+        kept["alloc_kib"] = alloc["alloc_kib"]
+    if player.dropped_calls:
+        print(
+            f"{os.path.basename(path)}: dropped {player.dropped_calls} calls "
+            "to tools no agent provides",
+            file=sys.stderr,
+        )
+    return best
+
+
+def diff(
+    measured: Dict[str, List[Dict[str, Any]]],
+    budgets: Dict[str, Any],
+) -> List[str]:
+    """Returns report lines; lines of exceeded budgets start with 'FAIL'."""
+    lines = []
+    for session, turns in measured.items():
+        session_budgets = budgets.get("sessions", {}).get(session, [])
+        for turn in turns:
+            budget = (
+                session_budgets[turn["turn"]]
+                if turn["turn"] < len(session_budgets)
+                else None
+            )
+            if budget is None:
+                lines.append(f"NEW   {session}#{turn['turn']}: no budget")
+                continue
+            for key, unit in (("latency_ms", "ms"), ("alloc_kib", "KiB")):
+                limit = budget[key]
+                value = turn[key]
+                status = "FAIL " if value > limit else "ok   "
+                lines.append(
+                    f"{status} {session}#{turn['turn']} {key}: "
+                    f"{value:.1f}{unit} / {limit:.1f}{unit} "
+                    f"({(value - limit) / limit * 100:+.0f}%)"
+                )
+            if turn["latency_ms"] > budget["latency_ms"]:
+                top = sorted(
+                    turn["breakdown_ms"].items(), key=lambda kv: -kv[1]
+                )[:3]
+                lines.append(
+                    "      slowest: "
+                    + ", ".join(f"{k} {v:.2f}ms" for k, v in top)
+                )
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--update-budgets",
+        action="store_true",
+        help="Write the measurements plus headroom as the new budgets",
+    )
+    parser.add_argument(
+        "--headroom",
+        type=float,
+        default=2.0,
+        help="Budget multiplier applied by --update-budgets",
+    )
+    args = parser.parse_args()
+
+    # Per-call debug and telemetry warnings would dominate the overhead
+    # being measured.
+    logging.disable(logging.WARNING)
+    # Replayed traffic must never wait on the per-session RPM quota or on
+    # the shared model quota.
+    callbacks.RPM_QUOTA = 10**9
+    callbacks.model_scheduler = ModelScheduler(ModelSchedulerModel(burst=10**9))
+
+    measured = {
+        os.path.basename(path): measure(path, args.repeats)
+        for path in sorted(glob.glob(SESSIONS))
+    }
+    if args.update_budgets:
+        budgets = {
+            "headroom": args.headroom,
+            "sessions": {
+                session: [
+                    {
+                        "query": t["query"],
+                        "latency_ms": round(
+                            t["latency_ms"] * args.headroom, 1
+                        ),
+                        "alloc_kib": round(
+                            t["alloc_kib"] * args.headroom, 1
+                        ),
+                    }
+                    for t in turns
+                ]
+                for session, turns in measured.items()
+            },
+        }
+        with open(BUDGETS, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {BUDGETS}")
+        return
+
+    with open(BUDGETS, encoding="utf-8") as f:
+        budgets = json.load(f)
+    lines = diff(measured, budgets)
+    print("\n".join(lines))
+    if any(line.startswith("FAIL") for line in lines):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,11 +18,27 @@ import logging
 import warnings
 from google.adk import Agent
 from .config import Config
-from .prompts import GLOBAL_INSTRUCTION, INSTRUCTION
+from .prompts import (
+    GLOBAL_INSTRUCTION,
+    HR_INSTRUCTION,
+    INTERVIEW_INSTRUCTION,
+    ONBOARDING_INSTRUCTION,
+    ROUTER_INSTRUCTION,
+)
+from .shared_libraries import profiling, tool_executor
+from .shared_libraries.prompt_assembly import assemble
 from .shared_libraries.callbacks import (
+    prune_history_callback,
     rate_limit_callback,
+    record_route_latency,
+    schedule_model_call,
+    response_cache_lookup,
+    response_cache_store,
+    route_model_callback,
     before_agent,
     before_tool,
+    after_tool,
+    on_tool_error,
 )
 from .tools.tools import (
     add_applicant_and_prompt_interview,
@@ -30,8 +46,10 @@ from .tools.tools import (
     evaluate_interview,
     promote_employee,
     start_onboarding,
+    get_onboarding_status,
     ask_hr_question,
     update_employee_status,
+    find_employee,
 )
 
 warnings.filterwarnings("ignore", category=UserWarning, module=".*pydantic.*")
@@ -42,22 +60,103 @@ configs = Config()
 # Setup logger
 logger = logging.getLogger(__name__)
 
-# Create the onboarding-focused agent
-root_agent = Agent(
-    model=configs.agent_settings.model,
-    global_instruction=GLOBAL_INSTRUCTION,
-    instruction=INSTRUCTION,
-    name=configs.agent_settings.name,
-    tools=[
+# Every agent in the tree shares the same callback pipeline.
+CALLBACKS = dict(
+    before_tool_callback=before_tool,
+    after_tool_callback=after_tool,
+    on_tool_error_callback=on_tool_error,
+    before_agent_callback=before_agent,
+    # Cache hits skip the rest of the chain, including the rate limiter. Prune
+    # before rate limiting so its per-part walk sees the bounded history. The
+    # scheduler runs last: a call takes its share of the shared quota only
+    # when it is about to reach the model.
+    before_model_callback=[
+        response_cache_lookup,
+        route_model_callback,
+        prune_history_callback,
+        rate_limit_callback,
+        schedule_model_call,
+    ],
+    after_model_callback=[response_cache_store, record_route_latency],
+)
+# Adds the on-demand profiling hooks only when `profiling_settings` enable
+# them.
+CALLBACKS = profiling.instrument(CALLBACKS, configs.profiling_settings)
+
+# Several calls in one model response run concurrently on a thread pool;
+# calls for the same candidate keep their order.
+INTERVIEW_TOOLS = tool_executor.parallelize(
+    [
         add_applicant_and_prompt_interview,
         schedule_interview,
         evaluate_interview,
         promote_employee,
+        find_employee,
+    ]
+)
+ONBOARDING_TOOLS = tool_executor.parallelize(
+    [
         start_onboarding,
-        ask_hr_question,
+        get_onboarding_status,
         update_employee_status,
-    ],
-    before_tool_callback=before_tool,
-    before_agent_callback=before_agent,
-    before_model_callback=rate_limit_callback,
+        find_employee,
+    ]
+)
+HR_TOOLS = tool_executor.parallelize([ask_hr_question])
+
+# Instructions are rendered once at import; `PROMPTS` keeps the per-section
+# token accounting for the prompt budget checks.
+PROMPTS = {
+    "router": assemble("router", ROUTER_INSTRUCTION),
+    "interview_agent": assemble(
+        "interview_agent", INTERVIEW_INSTRUCTION, INTERVIEW_TOOLS
+    ),
+    "onboarding_agent": assemble(
+        "onboarding_agent", ONBOARDING_INSTRUCTION, ONBOARDING_TOOLS
+    ),
+    "hr_agent": assemble("hr_agent", HR_INSTRUCTION, HR_TOOLS),
+}
+
+# Specialists carry only their own tools and instruction slice, so a model
+# call never pays for the schemas and rules of the other workflows.
+interview_agent = Agent(
+    model=configs.agent_settings.model,
+    instruction=PROMPTS["interview_agent"].text,
+    name="interview_agent",
+    description=(
+        "Adds applicants, schedules and evaluates interviews and promotes"
+        " candidates."
+    ),
+    tools=INTERVIEW_TOOLS,
+    **CALLBACKS,
+)
+
+onboarding_agent = Agent(
+    model=configs.agent_settings.model,
+    instruction=PROMPTS["onboarding_agent"].text,
+    name="onboarding_agent",
+    description="Starts onboarding and updates employee status.",
+    tools=ONBOARDING_TOOLS,
+    **CALLBACKS,
+)
+
+hr_agent = Agent(
+    model=configs.agent_settings.model,
+    instruction=PROMPTS["hr_agent"].text,
+    name="hr_agent",
+    description=(
+        "Logs and tracks HR questions about policies, benefits, pay and leave."
+    ),
+    tools=HR_TOOLS,
+    **CALLBACKS,
+)
+
+# The onboarding router: no tools of its own, it only transfers to specialists.
+root_agent = Agent(
+    model=configs.agent_settings.model,
+    global_instruction=GLOBAL_INSTRUCTION,
+    instruction=PROMPTS["router"].text,
+    name=configs.agent_settings.name,
+    sub_agents=[interview_agent, onboarding_agent, hr_agent],
+    **CALLBACKS,
 )
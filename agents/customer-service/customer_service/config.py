@@ -15,6 +15,7 @@
 
 import os
 import logging
+from typing import Dict, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import BaseModel, Field
 
@@ -28,6 +29,169 @@ class AgentModel(BaseModel):
 
     name: str = Field(default="customer_service_agent")
     model: str = Field(default="gemini-2.0-flash-001")
+    # Small talk and confirmations are routed to `fast_model`; everything
+    # else goes to `model`. Leave `fast_model` unset to disable routing.
+    fast_model: str | None = Field(default="gemini-2.0-flash-lite-001")
+    fast_turn_max_words: int = Field(default=8)
+
+
+class HistoryModel(BaseModel):
+    """Conversation history pruning settings."""
+
+    token_budget: int = Field(default=6000)
+    keep_recent_turns: int = Field(default=4)
+    summary_max_tokens: int = Field(default=600)
+
+
+class ResponseCacheModel(BaseModel):
+    """Model response cache settings."""
+
+    enabled: bool = Field(default=True)
+    max_entries: int = Field(default=1024)
+    ttl_seconds: float = Field(default=3600)
+    history_window: int = Field(default=2)
+    disk_path: str | None = Field(default=None)
+
+
+class ModelSchedulerModel(BaseModel):
+    """Shared model quota and priority scheduling settings."""
+
+    enabled: bool = Field(default=True)
+    requests_per_minute: float = Field(default=300.0)
+    burst: int = Field(default=20)
+    # Share of the quota each class gets while calls are queued.
+    weights: Dict[str, float] = Field(
+        default={"interview": 4.0, "onboarding": 2.0, "general": 2.0, "hr": 1.0}
+    )
+    agent_classes: Dict[str, str] = Field(
+        default={
+            "interview_agent": "interview",
+            "onboarding_agent": "onboarding",
+            "hr_agent": "hr",
+        }
+    )
+    # Word prefixes that classify router calls by the user's intent.
+    intent_keywords: Dict[str, List[str]] = Field(
+        default={
+            "interview": ["interview", "schedul", "evaluat", "promot"],
+            "onboarding": ["onboard", "status", "hire", "hiring"],
+            "hr": ["polic", "benefit", "leave", "vacation", "payroll", "pto"],
+        }
+    )
+    default_class: str = Field(default="general")
+    max_queue_depth: int = Field(default=200)
+    max_wait_secs: Dict[str, float] = Field(default={"hr": 20.0})
+    default_max_wait_secs: float = Field(default=60.0)
+
+
+class StorageModel(BaseModel):
+    """Employee storage settings."""
+
+    path: str = Field(default=":memory:")
+    # Employee shards of a new roster; `jobs.reshard` changes an existing
+    # one. Shard 0 is `path` itself, so 1 means no sharding.
+    shards: int = Field(default=1)
+    # How often a sharded store re-reads its layout to notice a reshard
+    # run by another process.
+    layout_refresh_secs: float = Field(default=1.0)
+
+
+class ProfileCacheModel(BaseModel):
+    """Employee profile cache settings."""
+
+    enabled: bool = Field(default=True)
+    max_bytes: int = Field(default=16 * 1024 * 1024)
+
+
+class DeadlineModel(BaseModel):
+    """Per-turn time budget settings."""
+
+    enabled: bool = Field(default=True)
+    turn_budget_secs: float = Field(default=30.0)
+
+
+class ToolExecutorModel(BaseModel):
+    """Concurrent tool execution settings."""
+
+    enabled: bool = Field(default=True)
+    max_workers: int = Field(default=8)
+    timeout_secs: float = Field(default=20.0)
+    # Per-tool overrides of `timeout_secs`, by tool name.
+    timeouts: Dict[str, float] = Field(default={})
+    # Calls naming the same value in the first of these arguments run in
+    # order; other calls run concurrently.
+    key_args: List[str] = Field(default=["candidate_id", "employee_id"])
+
+
+class OnboardingModel(BaseModel):
+    """Onboarding workflow execution settings."""
+
+    max_attempts: int = Field(default=3)
+    backoff_base_secs: float = Field(default=0.5)
+    backoff_max_secs: float = Field(default=8.0)
+    step_timeout_secs: float = Field(default=30.0)
+
+
+class NotificationModel(BaseModel):
+    """Notification outbox delivery settings."""
+
+    # Notifications are always queued; only a process with `deliver` set
+    # runs the SMTP worker.
+    deliver: bool = Field(default=False)
+    sender: str = Field(default="onboarding@cymbal.example")
+    smtp_host: str = Field(default="localhost")
+    smtp_port: int = Field(default=25)
+    smtp_username: str | None = Field(default=None)
+    smtp_password: str | None = Field(default=None)
+    starttls: bool = Field(default=False)
+    pool_size: int = Field(default=4)
+    batch_size: int = Field(default=50)
+    max_attempts: int = Field(default=5)
+
+
+class AuditModel(BaseModel):
+    """Tool-call audit log settings."""
+
+    # Defaults to an `audit` directory next to the storage file, or to
+    # ~/.customer_service/audit when storage is in memory.
+    directory: str | None = Field(default=None)
+    max_segment_bytes: int = Field(default=64 * 1024 * 1024)
+    block_records: int = Field(default=1024)
+    flush_interval_secs: float = Field(default=0.2)
+
+
+class ProfilingModel(BaseModel):
+    """On-demand profiling settings."""
+
+    # With `enabled` off no profiling hooks are registered at all.
+    enabled: bool = Field(default=False)
+    mode: str = Field(default="cprofile")  # "cprofile" or "sampling"
+    sessions: List[str] = Field(default=[])
+    tools: List[str] = Field(default=[])
+    sample_rate: float = Field(default=0.0)
+    tracemalloc: bool = Field(default=False)
+    top_n: int = Field(default=25)
+    sampling_interval_secs: float = Field(default=0.005)
+    # Defaults to `customer_service_profiles` in the temp directory.
+    directory: str | None = Field(default=None)
+
+
+class ServerModel(BaseModel):
+    """Local HTTP/SSE front end settings."""
+
+    host: str = Field(default="127.0.0.1")
+    port: int = Field(default=8080)
+    backlog: int = Field(default=1024)
+    max_concurrent_runs: int = Field(default=64)
+    admission_timeout_secs: float = Field(default=5.0)
+    # Events buffered per client before the agent run waits for the client.
+    client_queue_size: int = Field(default=32)
+    # Clients that accept no data for this long are disconnected.
+    write_timeout_secs: float = Field(default=30.0)
+    keepalive_timeout_secs: float = Field(default=15.0)
+    heartbeat_secs: float = Field(default=15.0)
+    drain_timeout_secs: float = Field(default=30.0)
+    max_body_bytes: int = Field(default=64 * 1024)
 
 
 class Config(BaseSettings):
@@ -41,6 +205,28 @@ class Config(BaseSettings):
         case_sensitive=True,
     )
     agent_settings: AgentModel = Field(default=AgentModel())
+    history_settings: HistoryModel = Field(default=HistoryModel())
+    response_cache_settings: ResponseCacheModel = Field(
+        default=ResponseCacheModel()
+    )
+    model_scheduler_settings: ModelSchedulerModel = Field(
+        default=ModelSchedulerModel()
+    )
+    storage_settings: StorageModel = Field(default=StorageModel())
+    profile_cache_settings: ProfileCacheModel = Field(
+        default=ProfileCacheModel()
+    )
+    deadline_settings: DeadlineModel = Field(default=DeadlineModel())
+    tool_executor_settings: ToolExecutorModel = Field(
+        default=ToolExecutorModel()
+    )
+    onboarding_settings: OnboardingModel = Field(default=OnboardingModel())
+    notification_settings: NotificationModel = Field(
+        default=NotificationModel()
+    )
+    audit_settings: AuditModel = Field(default=AuditModel())
+    profiling_settings: ProfilingModel = Field(default=ProfilingModel())
+    server_settings: ServerModel = Field(default=ServerModel())
     app_name: str = "customer_service_app"
     CLOUD_PROJECT: str = Field(default="driven-torus-457106-j4")
     CLOUD_LOCATION: str = Field(default="us-central1")
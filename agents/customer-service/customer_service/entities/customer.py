@@ -3,6 +3,21 @@ from pydantic import BaseModel, Field, ConfigDict
 import uuid
 import datetime
 
+# Canonical spelling of the employee statuses used across the hiring flow.
+STATUSES = ("Applicant", "Interview Scheduled", "Interviewed", "Hired", "Onboarded", "Agent", "Terminated")
+_STATUS_BY_KEY = {s.lower(): s for s in STATUSES}
+
+
+def canonical_status(status: str) -> str:
+    """
+    Returns a status in its canonical spelling, e.g. "hired" -> "Hired" and
+    "interview_scheduled" -> "Interview Scheduled". Statuses outside `STATUSES`
+    are only stripped.
+    """
+    key = " ".join(status.replace("_", " ").split()).lower()
+    return _STATUS_BY_KEY.get(key, status.strip())
+
+
 class Address(BaseModel):
     """
     Represents an employee's address.
@@ -56,6 +71,7 @@ class HRQuestions(BaseModel):
     question: str
     answered: bool = False
     response: Optional[str] = None
+    asked_at: Optional[str] = None  # ISO timestamp, used to age the HR queue
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -148,36 +164,55 @@ class Employee(BaseModel):
 
     def evaluate_interview(self, interview_index: int, result: str, marks: int, feedback: Optional[str] = None) -> None:
         """
-        Records the result and feedback of an interview.
+        Records the result and feedback of an interview. Once every scheduled
+        interview is graded, the candidate is 'Interviewed' and awaits the
+        promotion decision.
         """
         interview = self.interviews[interview_index]
         interview.result = result
         interview.marks = marks
         interview.feedback = feedback
+        if canonical_status(self.status) == "Interview Scheduled" and all(i.result for i in self.interviews):
+            self.status = "Interviewed"
+
+    def is_eligible_for_promotion(self, passing_marks: int = 60) -> bool:
+        """
+        Checks if the candidate has passed at least 3 interviews with `passing_marks` or more.
+        """
+        passed_interviews = [i for i in self.interviews if i.result == "Passed" and (i.marks or 0) >= passing_marks]
+        return len(passed_interviews) >= 3
+
+    def apply_promotion_rules(self, start_date: str, passing_marks: int = 60) -> bool:
+        """
+        Promotes an eligible 'Interviewed' candidate to 'Agent' with onboarding.
+        Never moves a candidate back: anyone else is left unchanged.
+        Returns True if the candidate was promoted.
+        """
+        if self.status != "Interviewed" or not self.is_eligible_for_promotion(passing_marks):
+            return False
+        self.onboarding = Onboarding(
+            start_date=start_date,
+            orientation_scheduled=True,
+            benefits_package=True,
+            system_access_granted=True
+        )
+        self.status = "Agent"
+        return True
 
     def evaluate_candidate(self, start_date: str, passing_marks: int = 60) -> None:
         """
         Evaluates if the candidate has passed at least 3 interviews and promotes to 'Agent' if eligible.
         """
-        passed_interviews = [i for i in self.interviews if i.result == "Passed" and (i.marks or 0) >= passing_marks]
-        if len(passed_interviews) >= 3:
+        if self.apply_promotion_rules(start_date, passing_marks):
             print(f"🎉 Congratulations {self.first_name}, you’ve been promoted to Agent after clearing all 3 interviews!")
-            self.onboarding = Onboarding(
-                start_date=start_date,
-                orientation_scheduled=True,
-                benefits_package=True,
-                system_access_granted=True
-            )
-            self.status = "Agent"
         else:
             print(f"⚠️ {self.first_name} has not passed all required interview rounds yet.")
-            self.status = "Interviewed"
 
     def onboard_employee(self, start_date: str) -> None:
         """
         Onboards an employee manually if already hired.
         """
-        if self.status == "Hired":
+        if canonical_status(self.status) == "Hired":
             self.onboarding = Onboarding(
                 start_date=start_date,
                 orientation_scheduled=True,
@@ -188,17 +223,34 @@ class Employee(BaseModel):
         else:
             raise ValueError("Employee must be hired before onboarding.")
 
+    def begin_onboarding(self, start_date: str) -> None:
+        """
+        Creates an onboarding record with no steps completed, if there is none yet.
+        """
+        if self.onboarding is None:
+            self.onboarding = Onboarding(
+                start_date=start_date,
+                orientation_scheduled=False,
+                benefits_package=False,
+                system_access_granted=False
+            )
+
     def ask_hr_question(self, question: str) -> None:
         """
         Submits a question to HR.
         """
-        self.hr_questions.append(HRQuestions(question=question))
+        self.hr_questions.append(
+            HRQuestions(
+                question=question,
+                asked_at=datetime.datetime.now().isoformat(),
+            )
+        )
 
     def update_employee_status(self, new_status: str) -> None:
         """
-        Updates the employee's current status.
+        Updates the employee's current status, in its canonical spelling.
         """
-        self.status = new_status
+        self.status = canonical_status(new_status)
 
     def get_customer(employee_id: str) -> "Employee":
         # Mock employee data
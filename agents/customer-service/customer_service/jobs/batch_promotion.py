@@ -0,0 +1,263 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Nightly job that applies the promotion rules to the whole candidate pool.
+
+The roster is split into id-range chunks that a process pool evaluates in
+parallel. Each worker applies `Employee.apply_promotion_rules` to the candidates
+of its chunk awaiting a decision. Promotions are written with
+version-checked updates, so a tool writing the same employee meanwhile is
+never overwritten. Completed chunks are recorded in a checkpoint file, so a run
+that crashes resumes where it stopped:
+
+    python -m customer_service.jobs.batch_promotion --db roster.db \\
+        --start-date 2025-05-01 --checkpoint promotion.ckpt.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from typing import Dict, List, NamedTuple, Optional
+
+from ..config import Config
+from ..entities.customer import Employee
+from ..shared_libraries.storage import (
+    EmployeeStore,
+    VersionConflict,
+    open_store,
+)
+
+logger = logging.getLogger(__name__)
+
+# Only candidates awaiting the promotion decision are evaluated: earlier
+# states are still interviewing, later ones ("Hired", "Agent", ...) are
+# past it.
+OPEN_STATUSES = {"Interviewed"}
+
+
+class ChunkResult(NamedTuple):
+    """Outcome of evaluating one id-range chunk."""
+
+    index: int
+    scanned: int
+    promoted: int
+    held: int
+    skipped: int
+
+
+_worker_store: Optional[EmployeeStore] = None
+
+
+def _open_worker_store(db_path: str) -> None:
+    global _worker_store
+    _worker_store = open_store(db_path)
+
+
+def evaluate_chunk(
+    index: int,
+    first_id: str,
+    last_id: str,
+    start_date: str,
+    passing_marks: int,
+    store: Optional[EmployeeStore] = None,
+) -> ChunkResult:
+    """Applies the promotion rules to one chunk and writes the promotions.
+
+    Only "Interviewed" candidates are evaluated and only promotions are
+    written, so rerunning a chunk after a crash is a no-op for the part that
+    was already committed. Candidates not yet eligible are counted as held.
+
+    The chunk is scanned with one range read. Each promotion is then
+    applied again to the employee's latest version with
+    `EmployeeStore.update`. A candidate that a concurrent write made
+    ineligible, or that kept changing, is left alone and counted as
+    skipped.
+    """
+    store = store or _worker_store
+
+    # Whether the latest attempt of `promote` promoted its employee.
+    outcome = [False]
+
+    def promote(employee: Employee) -> bool:
+        outcome[0] = employee.status in OPEN_STATUSES and (
+            employee.apply_promotion_rules(start_date, passing_marks)
+        )
+        return outcome[0]
+
+    promoted = held = skipped = 0
+    employees = store.get_range(first_id, last_id)
+    for employee in employees:
+        if employee.status not in OPEN_STATUSES:
+            continue
+        if not employee.is_eligible_for_promotion(passing_marks):
+            held += 1
+            continue
+        outcome[0] = False
+        try:
+            store.update(employee.employee_id, promote)
+        except VersionConflict:
+            outcome[0] = False
+        if outcome[0]:
+            promoted += 1
+        else:
+            skipped += 1
+    return ChunkResult(index, len(employees), promoted, held, skipped)
+
+
+class Checkpoint:
+    """Chunk boundaries and completed chunk indices of a run, kept on disk."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.ranges: List[List[str]] = []
+        self.completed: set = set()
+        self.params: Dict[str, object] = {}
+
+    def load(self) -> bool:
+        """Loads an existing checkpoint; returns False if there is none."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.ranges = data["ranges"]
+        self.completed = set(data["completed"])
+        self.params = data["params"]
+        return True
+
+    def save(self) -> None:
+        """Atomically writes the checkpoint."""
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "params": self.params,
+                    "ranges": self.ranges,
+                    "completed": sorted(self.completed),
+                },
+                f,
+            )
+        os.replace(tmp, self.path)
+
+
+def run(
+    db_path: str,
+    start_date: str,
+    passing_marks: int = 60,
+    workers: Optional[int] = None,
+    chunk_size: int = 2000,
+    checkpoint_path: Optional[str] = None,
+) -> Dict[str, float]:
+    """Runs (or resumes) the batch promotion and returns run statistics."""
+    if db_path == ":memory:":
+        raise ValueError("The batch job needs a file-backed employee store.")
+    started = time.perf_counter()
+    checkpoint = Checkpoint(checkpoint_path)
+    params = {"start_date": start_date, "passing_marks": passing_marks}
+    if checkpoint.load():
+        if checkpoint.params != params:
+            raise ValueError(
+                f"Checkpoint {checkpoint_path} was written for {checkpoint.params}"
+            )
+        logger.info(
+            "Resuming: %i of %i chunks already done",
+            len(checkpoint.completed),
+            len(checkpoint.ranges),
+        )
+    else:
+        store = open_store(db_path)
+        checkpoint.ranges = [list(r) for r in store.id_ranges(chunk_size)]
+        checkpoint.params = params
+        store.close()
+        checkpoint.save()
+
+    totals = dict.fromkeys(
+        ("chunks", "scanned", "promoted", "held", "skipped"), 0
+    )
+    pending = [
+        (i, first, last)
+        for i, (first, last) in enumerate(checkpoint.ranges)
+        if i not in checkpoint.completed
+    ]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_open_worker_store,
+        initargs=(db_path,),
+    ) as pool:
+        futures = [
+            pool.submit(
+                evaluate_chunk, i, first, last, start_date, passing_marks
+            )
+            for i, first, last in pending
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            checkpoint.completed.add(result.index)
+            checkpoint.save()
+            totals["chunks"] += 1
+            totals["scanned"] += result.scanned
+            totals["promoted"] += result.promoted
+            totals["held"] += result.held
+            totals["skipped"] += result.skipped
+
+    elapsed = time.perf_counter() - started
+    totals["elapsed_secs"] = round(elapsed, 3)
+    totals["employees_per_sec"] = round(totals["scanned"] / elapsed, 1)
+    logger.info("Batch promotion finished: %s", totals)
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch candidate promotion")
+    parser.add_argument(
+        "--db",
+        default=Config().storage_settings.path,
+        help="Employee store file (defaults to the configured storage path)",
+    )
+    parser.add_argument(
+        "--start-date",
+        default=date.today().isoformat(),
+        help="Onboarding start date recorded for promoted candidates",
+    )
+    parser.add_argument("--passing-marks", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Checkpoint file; rerun with the same file to resume a run",
+    )
+    args = parser.parse_args()
+    print(
+        json.dumps(
+            run(
+                args.db,
+                args.start_date,
+                passing_marks=args.passing_marks,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                checkpoint_path=args.checkpoint,
+            ),
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
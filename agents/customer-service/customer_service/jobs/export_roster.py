@@ -0,0 +1,380 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streams the applicant and employee roster to CSV, JSONL or Parquet.
+
+Records are read from storage page by page and flow through a generator
+pipeline (read -> filter -> flatten -> write), so memory stays bounded by the
+page size and the Parquet row group size, not by the roster size:
+
+    python -m customer_service.jobs.export_roster --db roster.db \\
+        --format csv --status Interviewed --since 2025-01-01 -o roster.csv
+
+The default `employees` table has one summary row per employee. The
+`applications` and `interviews` tables have one row per job application or
+interview of the selected employees, keyed by `employee_id`:
+
+    python -m customer_service.jobs.export_roster --db roster.db \\
+        --table interviews --format parquet -o interviews.parquet
+
+Parquet output needs the optional `pyarrow` dependency.
+"""
+
+import argparse
+import csv
+import functools
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, IO, Iterable, Iterator, Optional, Tuple
+
+from ..config import Config
+from ..shared_libraries.storage import EmployeeStore, open_store
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl", "parquet")
+
+# Column order of the flattened export. Booleans stay booleans in JSONL and
+# Parquet; CSV writes them as True/False.
+COLUMNS = (
+    "employee_id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "status",
+    "role",
+    "application_date",
+    "application_status",
+    "applications",
+    "street",
+    "city",
+    "state",
+    "zip",
+    "interviews",
+    "interviews_passed",
+    "best_marks",
+    "last_interview_date",
+    "last_interview_result",
+    "onboarding_start_date",
+    "orientation_scheduled",
+    "benefits_package",
+    "system_access_granted",
+    "hr_questions_open",
+)
+APPLICATION_COLUMNS = (
+    "employee_id",
+    "application_number",
+    "job_id",
+    "position",
+    "application_date",
+    "status",
+)
+INTERVIEW_COLUMNS = (
+    "employee_id",
+    "interview_number",
+    "interview_date",
+    "interview_panel",
+    "result",
+    "marks",
+    "feedback",
+)
+TABLES = {
+    "employees": COLUMNS,
+    "applications": APPLICATION_COLUMNS,
+    "interviews": INTERVIEW_COLUMNS,
+}
+
+
+def flatten(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Flattens one stored employee into a single export row.
+
+    The latest job application and interview are exported as columns, the
+    rest are summarized as counts.
+    """
+    applications = record.get("job_applications") or []
+    interviews = record.get("interviews") or []
+    address = record.get("address") or {}
+    onboarding = record.get("onboarding") or {}
+    latest_application = applications[-1] if applications else {}
+    latest_interview = interviews[-1] if interviews else {}
+    marks = [i["marks"] for i in interviews if i.get("marks") is not None]
+    return {
+        "employee_id": record["employee_id"],
+        "first_name": record.get("first_name"),
+        "last_name": record.get("last_name"),
+        "email": record.get("email"),
+        "phone_number": record.get("phone_number"),
+        "status": record.get("status"),
+        "role": latest_application.get("position"),
+        "application_date": latest_application.get("application_date"),
+        "application_status": latest_application.get("status"),
+        "applications": len(applications),
+        "street": address.get("street"),
+        "city": address.get("city"),
+        "state": address.get("state"),
+        "zip": address.get("zip"),
+        "interviews": len(interviews),
+        "interviews_passed": sum(
+            1 for i in interviews if i.get("result") == "Passed"
+        ),
+        "best_marks": max(marks) if marks else None,
+        "last_interview_date": latest_interview.get("interview_date"),
+        "last_interview_result": latest_interview.get("result"),
+        "onboarding_start_date": onboarding.get("start_date"),
+        "orientation_scheduled": onboarding.get("orientation_scheduled"),
+        "benefits_package": onboarding.get("benefits_package"),
+        "system_access_granted": onboarding.get("system_access_granted"),
+        "hr_questions_open": sum(
+            1
+            for q in record.get("hr_questions") or []
+            if not q.get("answered")
+        ),
+    }
+
+
+def application_rows(record: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yields one row per job application of a stored employee."""
+    for number, application in enumerate(
+        record.get("job_applications") or [], 1
+    ):
+        yield {
+            "employee_id": record["employee_id"],
+            "application_number": number,
+            "job_id": application.get("job_id"),
+            "position": application.get("position"),
+            "application_date": application.get("application_date"),
+            "status": application.get("status"),
+        }
+
+
+def interview_rows(record: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yields one row per interview of a stored employee."""
+    for number, interview in enumerate(record.get("interviews") or [], 1):
+        yield {
+            "employee_id": record["employee_id"],
+            "interview_number": number,
+            "interview_date": interview.get("interview_date"),
+            "interview_panel": "; ".join(
+                interview.get("interview_panel") or []
+            ),
+            "result": interview.get("result"),
+            "marks": interview.get("marks"),
+            "feedback": interview.get("feedback"),
+        }
+
+
+def in_date_range(
+    row: Dict[str, Any], since: Optional[str], until: Optional[str]
+) -> bool:
+    """Checks the latest application date against an inclusive ISO range."""
+    if since is None and until is None:
+        return True
+    applied = row["application_date"]
+    if not applied:
+        return False
+    return (since is None or applied >= since) and (
+        until is None or applied <= until
+    )
+
+
+def export_rows(
+    store: EmployeeStore,
+    status: Optional[str] = None,
+    role: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    page_size: int = 1000,
+    table: str = "employees",
+) -> Iterator[Dict[str, Any]]:
+    """Yields the rows of `table` for the filtered employees, by employee id.
+
+    The filters select employees (the date range applies to their latest
+    application); the child tables then list all of their applications or
+    interviews.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table {table!r}, expected one of {TABLES}")
+    for record in store.iter_records(status, role, page_size):
+        row = flatten(record)
+        if not in_date_range(row, since, until):
+            continue
+        if table == "applications":
+            yield from application_rows(record)
+        elif table == "interviews":
+            yield from interview_rows(record)
+        else:
+            yield row
+
+
+def write_csv(
+    rows: Iterable[Dict[str, Any]],
+    out: IO[str],
+    columns: Tuple[str, ...] = COLUMNS,
+) -> int:
+    writer = csv.DictWriter(out, fieldnames=columns)
+    writer.writeheader()
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[Dict[str, Any]], out: IO[str]) -> int:
+    count = 0
+    for row in rows:
+        out.write(json.dumps(row))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_parquet(
+    rows: Iterable[Dict[str, Any]],
+    path: str,
+    row_group_size: int = 10000,
+    columns: Tuple[str, ...] = COLUMNS,
+) -> int:
+    """Writes rows as Parquet, one row group per `row_group_size` rows."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError(
+            "Parquet export needs pyarrow; install the `parquet` extra."
+        ) from e
+
+    integer_columns = {
+        "applications",
+        "interviews",
+        "interviews_passed",
+        "best_marks",
+        "hr_questions_open",
+        "application_number",
+        "interview_number",
+        "marks",
+    }
+    bool_columns = {
+        "orientation_scheduled",
+        "benefits_package",
+        "system_access_granted",
+    }
+    schema = pa.schema(
+        [
+            (
+                name,
+                pa.int64()
+                if name in integer_columns
+                else pa.bool_() if name in bool_columns else pa.string(),
+            )
+            for name in columns
+        ]
+    )
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == row_group_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch or count == 0:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def export(
+    store: EmployeeStore,
+    fmt: str,
+    output: Optional[str] = None,
+    status: Optional[str] = None,
+    role: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    page_size: int = 1000,
+    table: str = "employees",
+) -> Dict[str, float]:
+    """Exports the filtered roster and returns row count and throughput.
+
+    CSV and JSONL go to `output` or stdout; Parquet requires an output path.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+    started = time.perf_counter()
+    rows = export_rows(store, status, role, since, until, page_size, table)
+    columns = TABLES[table]
+    if fmt == "parquet":
+        if not output:
+            raise ValueError("Parquet export needs an output path.")
+        count = write_parquet(rows, output, columns=columns)
+    else:
+        write = (
+            functools.partial(write_csv, columns=columns)
+            if fmt == "csv"
+            else write_jsonl
+        )
+        if output:
+            with open(output, "w", encoding="utf-8", newline="") as out:
+                count = write(rows, out)
+        else:
+            count = write(rows, sys.stdout)
+    elapsed = time.perf_counter() - started
+    stats = {
+        "rows": count,
+        "elapsed_secs": round(elapsed, 3),
+        "rows_per_sec": round(count / elapsed, 1) if elapsed else 0.0,
+    }
+    logger.info("Exported roster: %s", stats)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the roster")
+    parser.add_argument("--db", default=Config().storage_settings.path)
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--table", choices=tuple(TABLES), default="employees")
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument("--status", default=None)
+    parser.add_argument("--role", default=None)
+    parser.add_argument(
+        "--since", default=None, help="Earliest application date (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--until", default=None, help="Latest application date (YYYY-MM-DD)"
+    )
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    stats = export(
+        open_store(args.db),
+        args.format,
+        args.output,
+        status=args.status,
+        role=args.role,
+        since=args.since,
+        until=args.until,
+        page_size=args.page_size,
+        table=args.table,
+    )
+    # Stats go to stderr so stdout can carry the export itself.
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generates a synthetic roster and onboarding conversations for scale tests.
+
+Every record is derived from `(seed, index)` alone, so output is
+reproducible, any index range can be generated on its own (split a large
+run across processes with `--start`), and records stream straight to disk:
+memory stays constant however many are generated.
+
+    python -m customer_service.jobs.generate_synthetic --employees 1000000 \\
+        --roster roster.jsonl --db roster.db \\
+        --conversations 500 --conversations-dir eval/synthetic
+
+Statuses follow the hiring funnel, and each record is consistent with its
+status: applicants have no interviews, agents passed three rounds with
+passing marks and have completed onboarding, and so on. Conversations are
+scripted from the record they belong to, in the `eval_data` test format
+(`query`, `expected_tool_use`, `reference` per turn), one file each.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..entities.customer import (
+    Address,
+    Employee,
+    HRQuestions,
+    Interview,
+    JobApplication,
+    Onboarding,
+)
+from ..shared_libraries.storage import open_store
+
+logger = logging.getLogger(__name__)
+
+# (status, share of the roster), in funnel order.
+STATUSES: List[Tuple[str, float]] = [
+    ("Applicant", 0.30),
+    ("Interview Scheduled", 0.15),
+    ("Interviewed", 0.20),
+    ("Hired", 0.08),
+    ("Onboarded", 0.12),
+    ("Agent", 0.12),
+    ("Terminated", 0.03),
+]
+ROLES: List[Tuple[str, float]] = [
+    ("Sales Associate", 0.30),
+    ("Cashier", 0.20),
+    ("Garden Center Specialist", 0.15),
+    ("Stock Associate", 0.15),
+    ("Customer Service Representative", 0.12),
+    ("Store Manager", 0.03),
+    ("Assistant Manager", 0.05),
+]
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael",
+    "Linda", "David", "Elizabeth", "William", "Barbara", "Richard", "Susan",
+    "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Karen", "Wei", "Priya",
+    "Ahmed", "Olga", "Kenji", "Fatima", "Diego", "Aisha", "Lucas", "Mei",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller",
+    "Davis", "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez",
+    "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Nguyen", "Patel", "Kim", "Chen", "Singh", "Khan", "Ivanova",
+]
+CITIES = [
+    ("Sacramento", "CA"), ("Fresno", "CA"), ("Portland", "OR"),
+    ("Seattle", "WA"), ("Phoenix", "AZ"), ("Denver", "CO"),
+    ("Austin", "TX"), ("Dallas", "TX"), ("Atlanta", "GA"),
+    ("Chicago", "IL"), ("Columbus", "OH"), ("Raleigh", "NC"),
+]
+STREETS = ["Elm", "Oak", "Maple", "Cedar", "Pine", "Main", "Park", "Lake"]
+PANELS = ["HR", "Hiring Manager", "Store Manager", "Regional Director"]
+FEEDBACK = {
+    True: [
+        "Strong communication skills.",
+        "Good product knowledge.",
+        "Handled the customer scenario well.",
+        "Reliable and well prepared.",
+    ],
+    False: [
+        "Needs more retail experience.",
+        "Struggled with the customer scenario.",
+        "Unclear availability.",
+    ],
+}
+# Question templates with the words that vary between askers.
+HR_QUESTIONS = [
+    "How many {days} days do I get in my first year?",
+    "When is the {pay} payday after I start?",
+    "Does the health plan cover {who}?",
+    "What is the policy for {leave} leave?",
+    "Can I pick up extra {shift} shifts?",
+    "Is there an employee discount on {item}?",
+]
+HR_WORDS = {
+    "days": ["vacation", "sick", "paid", "personal"],
+    "pay": ["first", "next"],
+    "who": ["my spouse", "my children", "dental care", "vision care"],
+    "leave": ["parental", "bereavement", "medical", "unpaid"],
+    "shift": ["weekend", "holiday", "evening"],
+    "item": ["plants", "tools", "garden furniture"],
+}
+HR_ANSWER = "Thanks for asking. HR has answered this in the employee handbook."
+PASSING_MARKS = 60
+# Applications are spread over this many days up to `end_date`.
+DATE_SPAN_DAYS = 3 * 365
+
+
+def _weighted(rng: random.Random, choices: List[Tuple[str, float]]) -> str:
+    return rng.choices(
+        [c for c, _ in choices], weights=[w for _, w in choices]
+    )[0]
+
+
+def _marks(rng: random.Random, passing: bool) -> int:
+    """Interview marks: roughly normal around 70, on the requested side."""
+    while True:
+        marks = min(100, max(0, round(rng.gauss(70, 14))))
+        if (marks >= PASSING_MARKS) == passing:
+            return marks
+
+
+class RosterGenerator:
+    """Derives one synthetic employee per index from a seed."""
+
+    def __init__(self, seed: int = 0, end_date: Optional[date] = None):
+        self.seed = seed
+        self.end_date = end_date or date(2025, 12, 31)
+
+    def rng(self, index: int) -> random.Random:
+        return random.Random(self.seed * 1_000_003 + index)
+
+    def employee_id(self, index: int) -> str:
+        return f"E{index:07d}"
+
+    def employee(self, index: int) -> Employee:
+        """Returns the employee at `index`, consistent with its status."""
+        rng = self.rng(index)
+        status = _weighted(rng, STATUSES)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        city, state = rng.choice(CITIES)
+        applied = self.end_date - timedelta(days=rng.randrange(DATE_SPAN_DAYS))
+        roles = [
+            _weighted(rng, ROLES)
+            for _ in range(rng.choices([1, 2, 3], weights=[80, 15, 5])[0])
+        ]
+
+        interviews = self._interviews(rng, status, applied)
+        day = applied + timedelta(days=7 * (len(interviews) + 1))
+        onboarding = None
+        if status in ("Onboarded", "Agent", "Terminated"):
+            onboarding = Onboarding(
+                start_date=day.isoformat(),
+                orientation_scheduled=True,
+                benefits_package=True,
+                system_access_granted=True,
+            )
+        elif status == "Hired" and rng.random() < 0.5:
+            onboarding = Onboarding(
+                start_date=day.isoformat(),
+                orientation_scheduled=rng.random() < 0.7,
+                benefits_package=rng.random() < 0.5,
+                system_access_granted=False,
+            )
+        return Employee(
+            employee_id=self.employee_id(index),
+            first_name=first,
+            last_name=last,
+            email=f"{first}.{last}.{index}@example.com".lower(),
+            phone_number=(
+                f"{rng.randrange(200, 1000)}-{rng.randrange(200, 1000)}-"
+                f"{rng.randrange(10000):04d}"
+            ),
+            job_applications=[
+                JobApplication(
+                    job_id=f"J{index:07d}{n}",
+                    position=role,
+                    application_date=(
+                        applied - timedelta(days=30 * (len(roles) - 1 - n))
+                    ).isoformat(),
+                    status=self._application_status(status, n, len(roles)),
+                    resume=f"resumes/{self.employee_id(index)}-{n}.pdf",
+                )
+                for n, role in enumerate(roles)
+            ],
+            interviews=interviews,
+            onboarding=onboarding,
+            hr_questions=self._hr_questions(rng, status, applied),
+            address=Address(
+                street=f"{rng.randrange(1, 9999)} {rng.choice(STREETS)} St",
+                city=city,
+                state=state,
+                zip=f"{rng.randrange(10000, 99999)}",
+            ),
+            status=status,
+        )
+
+    def employees(self, count: int, start: int = 0) -> Iterator[Employee]:
+        for index in range(start, start + count):
+            yield self.employee(index)
+
+    def _interviews(
+        self, rng: random.Random, status: str, applied: date
+    ) -> List[Interview]:
+        if status == "Applicant":
+            return []
+        hired = status in ("Hired", "Onboarded", "Agent", "Terminated")
+        rounds = 3 if hired else rng.randint(1, 3)
+        interviews = []
+        for n in range(rounds):
+            day = applied + timedelta(days=7 * (n + 1))
+            interview = Interview(
+                interview_date=day.isoformat(),
+                interview_panel=rng.sample(PANELS, rng.randint(1, 2)),
+            )
+            # A scheduled candidate's last round has not happened yet.
+            if status != "Interview Scheduled" or n < rounds - 1:
+                passed = hired or rng.random() < 0.7
+                interview.marks = _marks(rng, passed)
+                interview.result = "Passed" if passed else "Failed"
+                interview.feedback = rng.choice(FEEDBACK[passed])
+            interviews.append(interview)
+        return interviews
+
+    @staticmethod
+    def _application_status(status: str, n: int, count: int) -> str:
+        if n < count - 1:
+            return "Rejected"
+        return {
+            "Applicant": "Pending",
+            "Interview Scheduled": "Pending",
+            "Interviewed": "Interviewed",
+            "Terminated": "Hired",
+        }.get(status, "Hired")
+
+    @staticmethod
+    def _hr_questions(
+        rng: random.Random, status: str, applied: date
+    ) -> List[HRQuestions]:
+        asks = 0 if status == "Applicant" else 1
+        count = rng.choices([0, 1, 2, 3], weights=[55, 28, 12, 5])[0] * asks
+        questions = []
+        for n in range(count):
+            answered = rng.random() < 0.7
+            questions.append(
+                HRQuestions(
+                    question=_hr_question(rng),
+                    answered=answered,
+                    response=HR_ANSWER if answered else None,
+                    asked_at=(applied + timedelta(days=10 + 5 * n)).isoformat(),
+                )
+            )
+        return questions
+
+
+def _hr_question(rng: random.Random) -> str:
+    template = rng.choice(HR_QUESTIONS)
+    return template.format(**{k: rng.choice(v) for k, v in HR_WORDS.items()})
+
+
+def _turn(
+    text: str, reference: str, tool: Optional[str] = None, **tool_input: Any
+) -> Dict[str, Any]:
+    """One test turn; `tool_input` holds the expected tool's arguments."""
+    return {
+        "query": text,
+        "expected_tool_use": (
+            [{"tool_name": tool, "tool_input": tool_input}] if tool else []
+        ),
+        "reference": reference,
+    }
+
+
+def conversation(employee: Employee, seed: int = 0) -> List[Dict[str, Any]]:
+    """Scripts an onboarding conversation that leads to `employee`'s state.
+
+    The turns call the agent's tools with this employee's data: interviews
+    are scheduled and evaluated as recorded, passed candidates promoted and
+    onboarded, and the HR questions asked.
+    """
+    rng = random.Random(f"{seed}:{employee.employee_id}")
+    cid = employee.employee_id
+    name = f"{employee.first_name} {employee.last_name}"
+    role = employee.job_applications[-1].position
+    turns = [
+        _turn(
+            rng.choice(["hi", "hello", "good morning"]),
+            "Hi! I'm the Cymbal onboarding assistant. How can I help you?",
+        )
+    ]
+    if employee.status == "Applicant":
+        turns.append(
+            _turn(
+                f"I'd like to apply for the {role} role. I'm {name},"
+                f" {employee.email}.",
+                f"Thanks {employee.first_name}, your application for {role}"
+                " is in. Would you like to schedule an interview?",
+                "add_applicant_and_prompt_interview",
+                name=name,
+                email=employee.email,
+                role=role,
+            )
+        )
+    else:
+        turns.append(
+            _turn(
+                f"Can you look up {name}?",
+                f"I found {name} ({cid}), applying for {role}.",
+                "find_employee",
+                query=name,
+            )
+        )
+    for interview in employee.interviews:
+        turns.append(
+            _turn(
+                f"Schedule an interview for {cid} on"
+                f" {interview.interview_date} at 10:00 AM.",
+                f"The interview for {cid} is scheduled on"
+                f" {interview.interview_date} at 10:00 AM.",
+                "schedule_interview",
+                candidate_id=cid,
+                date=interview.interview_date,
+                time="10:00 AM",
+            )
+        )
+        if interview.marks is None:
+            continue
+        turns.append(
+            _turn(
+                f"{cid} scored {interview.marks}. Feedback:"
+                f" {interview.feedback}",
+                f"Recorded: {cid} {interview.result.lower()} this round"
+                f" with {interview.marks} marks.",
+                "evaluate_interview",
+                candidate_id=cid,
+                marks=interview.marks,
+                feedback=interview.feedback,
+            )
+        )
+    if employee.status in ("Hired", "Onboarded", "Agent", "Terminated"):
+        turns.append(
+            _turn(
+                f"{cid} passed all three rounds, please promote them.",
+                f"{cid} has been promoted to the next stage.",
+                "promote_employee",
+                candidate_id=cid,
+            )
+        )
+    if employee.onboarding is not None:
+        start = employee.onboarding.start_date
+        turns.append(
+            _turn(
+                f"Start onboarding for {cid} as {role} on {start}.",
+                f"Onboarding for {cid} has started; the first day is {start}.",
+                "start_onboarding",
+                candidate_id=cid,
+                role=role,
+                start_date=start,
+            )
+        )
+    for question in employee.hr_questions:
+        turns.append(
+            _turn(
+                f"I'm {cid}. {question.question}",
+                "I've logged your question with HR; they'll get back to you.",
+                "ask_hr_question",
+                candidate_id=cid,
+                question=question.question,
+            )
+        )
+    if employee.status in ("Interviewed", "Onboarded", "Agent", "Terminated"):
+        turns.append(
+            _turn(
+                f"Set the status of {cid} to {employee.status}.",
+                f"{cid} is now marked as {employee.status}.",
+                "update_employee_status",
+                candidate_id=cid,
+                status=employee.status,
+            )
+        )
+    turns.append(
+        _turn(
+            rng.choice(["thanks, that's all", "great, thank you", "bye"]),
+            "You're welcome. Have a great day!",
+        )
+    )
+    return turns
+
+
+def write_roster(
+    generator: RosterGenerator,
+    count: int,
+    start: int = 0,
+    jsonl: Optional[str] = None,
+    db: Optional[str] = None,
+    batch_size: int = 1000,
+) -> int:
+    """Streams `count` employees to a JSONL file and/or an employee store."""
+    out = None
+    if jsonl:
+        out = (
+            sys.stdout
+            if jsonl == "-"
+            else open(jsonl, "w", encoding="utf-8")
+        )
+    store = open_store(db) if db else None
+    written = 0
+    batch: List[Employee] = []
+    try:
+        for employee in generator.employees(count, start):
+            if out is not None:
+                out.write(employee.model_dump_json())
+                out.write("\n")
+            if store is not None:
+                batch.append(employee)
+                if len(batch) == batch_size:
+                    store.put_many(batch)
+                    batch = []
+            written += 1
+        if batch:
+            store.put_many(batch)
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+        if store is not None:
+            store.close()
+    return written
+
+
+def write_conversations(
+    generator: RosterGenerator, count: int, directory: str, start: int = 0
+) -> int:
+    """Writes one `eval_data`-format test file per employee."""
+    os.makedirs(directory, exist_ok=True)
+    for employee in generator.employees(count, start):
+        path = os.path.join(
+            directory, f"synthetic-{employee.employee_id}.test.json"
+        )
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump(conversation(employee, generator.seed), out, indent=2)
+    return count
+
+
+def generate(
+    employees: int,
+    seed: int = 0,
+    start: int = 0,
+    roster: Optional[str] = None,
+    db: Optional[str] = None,
+    conversations: int = 0,
+    conversations_dir: Optional[str] = None,
+    batch_size: int = 1000,
+) -> Dict[str, float]:
+    """Generates the requested outputs and returns counts and throughput."""
+    generator = RosterGenerator(seed)
+    started = time.perf_counter()
+    written = 0
+    if roster or db:
+        written = write_roster(
+            generator, employees, start, roster, db, batch_size
+        )
+    scripted = 0
+    if conversations and conversations_dir:
+        scripted = write_conversations(
+            generator, conversations, conversations_dir, start
+        )
+    elapsed = time.perf_counter() - started
+    stats = {
+        "employees": written,
+        "conversations": scripted,
+        "elapsed_secs": round(elapsed, 3),
+        "employees_per_sec": round(written / elapsed, 1) if elapsed else 0.0,
+    }
+    logger.info("Generated synthetic data: %s", stats)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic data")
+    parser.add_argument("--employees", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--start", type=int, default=0, help="First index to generate"
+    )
+    parser.add_argument(
+        "--roster", default=None, help="JSONL output path, '-' for stdout"
+    )
+    parser.add_argument("--db", default=None, help="Employee store to fill")
+    parser.add_argument("--conversations", type=int, default=0)
+    parser.add_argument("--conversations-dir", default=None)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    stats = generate(
+        args.employees,
+        seed=args.seed,
+        start=args.start,
+        roster=args.roster,
+        db=args.db,
+        conversations=args.conversations,
+        conversations_dir=args.conversations_dir,
+        batch_size=args.batch_size,
+    )
+    # Stats go to stderr so stdout can carry the roster itself.
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
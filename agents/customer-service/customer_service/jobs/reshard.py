@@ -0,0 +1,64 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Changes the number of shards of the employee roster while it serves.
+
+    python -m customer_service.jobs.reshard --db roster.db --shards 8
+
+Only employees whose shard changes are moved, in batches, and agents using
+the roster keep reading and writing throughout (see `sharded_storage`). An
+interrupted run leaves the roster usable; running it again with the same
+`--shards` finishes the move. Going back to one shard gathers the roster in
+`--db` again; the emptied shard files are left in place.
+"""
+
+import argparse
+import json
+import logging
+from typing import Any, Dict
+
+from ..config import Config
+from ..shared_libraries.sharded_storage import ShardedEmployeeStore
+
+logger = logging.getLogger(__name__)
+
+
+def reshard(db_path: str, shards: int, batch_size: int = 500) -> Dict[str, Any]:
+    """Reshards the roster at `db_path` to `shards` shards.
+
+    Returns:
+        Dict[str, Any]: Old and new shard counts, employees moved, elapsed
+            seconds and the resulting employees per shard.
+    """
+    store = ShardedEmployeeStore(db_path)
+    try:
+        stats = store.reshard(shards, batch_size)
+        stats["per_shard"] = store.shard_counts()
+    finally:
+        store.close()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Reshard the roster")
+    parser.add_argument("--db", default=Config().storage_settings.path)
+    parser.add_argument("--shards", type=int, required=True)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    print(json.dumps(reshard(args.db, args.shards, args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,475 @@
-import requests
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
 
-API_KEY = "b86200d0163cca23818fb666637cfbda33e3cbae"
-test_url = f"https://maps.googleapis.com/maps/api/geocode/json?address=New+York&key={API_KEY}"
-response = requests.get(test_url)
+"""Local HTTP front end that streams agent events over Server-Sent Events.
 
-print("Status Code:", response.status_code)
-print("Response:", response.json())
+    python -m customer_service.main --host 0.0.0.0 --port 8080
+
+Endpoints:
+
+    POST /chat      {"message": "...", "user_id": "...", "session_id": "..."}
+                    -> text/event-stream of `session`, `message`, `error`
+                       and a final `done` event
+    GET  /healthz   -> {"status": "ok" | "draining", "active_streams": n}
+
+Each chat runs the agent in a producer task that feeds a bounded per-client
+queue of `client_queue_size` events. While a slow client's queue is full,
+partial text deltas are merged into one pending event and complete events
+(final answers, tool calls) make the producer wait, so a lagging client gets
+fewer, larger events instead of an unbounded backlog. A client that accepts
+no data for `write_timeout_secs` is disconnected and its run cancelled. At
+most `max_concurrent_runs` chats run at once; further chats wait up to
+`admission_timeout_secs` for a slot and then get a 503. Connections are
+HTTP/1.1 keep-alive; SSE bodies use chunked encoding so a connection can
+carry several chats. On SIGINT/SIGTERM the server stops accepting, closes
+idle connections and lets running chats finish for up to
+`drain_timeout_secs`.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import signal
+from typing import Any, Dict, Optional, Set, Tuple
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.genai import types
+
+from .config import Config, ServerModel
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+_DONE = object()
+
+
+class BadRequest(Exception):
+    """Raised for requests the server cannot parse."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    """A parsed HTTP/1.x request."""
+
+    def __init__(
+        self, method: str, path: str, version: str, headers: Dict[str, str]
+    ):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = b""
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+def event_payload(event: Any) -> Dict[str, Any]:
+    """Converts an ADK event into the JSON sent to clients."""
+    parts = (event.content.parts or []) if event.content else []
+    return {
+        "id": event.id,
+        "author": event.author,
+        "partial": bool(event.partial),
+        "final": event.is_final_response(),
+        "text": "".join(p.text for p in parts if p.text),
+        "function_calls": [
+            {"name": p.function_call.name, "args": p.function_call.args}
+            for p in parts
+            if p.function_call
+        ],
+        "function_responses": [
+            {
+                "name": p.function_response.name,
+                "response": p.function_response.response,
+            }
+            for p in parts
+            if p.function_response
+        ],
+    }
+
+
+def _is_text_delta(payload: Dict[str, Any]) -> bool:
+    return (
+        payload["partial"]
+        and not payload["function_calls"]
+        and not payload["function_responses"]
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> bytes:
+    data = json.dumps(data, default=str)
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+def _chunk(data: bytes) -> bytes:
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+class ChatServer:
+    """Serves an ADK runner over HTTP with SSE streaming."""
+
+    def __init__(self, runner: Any, settings: Optional[ServerModel] = None):
+        self.runner = runner
+        self.settings = settings or Config().server_settings
+        self.active_streams = 0
+        self.draining = False
+        self._slots = asyncio.Semaphore(self.settings.max_concurrent_runs)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._idle: Set[asyncio.Task] = set()
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle_connection,
+            self.settings.host,
+            self.settings.port,
+            backlog=self.settings.backlog,
+        )
+        logger.info(
+            "Serving %s on http://%s:%s",
+            self.runner.app_name,
+            self.settings.host,
+            self.port,
+        )
+
+    async def serve(self) -> None:
+        """Serves until SIGINT or SIGTERM, then drains."""
+        await self.start()
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await stop.wait()
+        await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """Stops accepting, closes idle connections and drains chats."""
+        self.draining = True
+        self._server.close()
+        for task in list(self._idle):
+            task.cancel()
+        try:
+            await asyncio.wait_for(
+                self._drained.wait(), self.settings.drain_timeout_secs
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Cancelling %i chats still running after drain timeout",
+                self.active_streams,
+            )
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        logger.info("Server drained")
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            keep_alive = True
+            while keep_alive and not self.draining:
+                self._idle.add(task)
+                try:
+                    request = await asyncio.wait_for(
+                        self._read_request(reader),
+                        self.settings.keepalive_timeout_secs,
+                    )
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    break
+                except BadRequest as e:
+                    self._idle.discard(task)
+                    await self._respond(writer, e.status, {"error": str(e)})
+                    break
+                finally:
+                    self._idle.discard(task)
+                if request is None:
+                    break
+                keep_alive = request.keep_alive
+                keep_alive = await self._dispatch(request, writer, keep_alive)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Request]:
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, path, version = line.decode("latin-1").split()
+        except ValueError as e:
+            raise BadRequest(400, "Malformed request line") from e
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+            if len(headers) > 100:
+                raise BadRequest(400, "Too many headers")
+        request = Request(method.upper(), path, version, headers)
+        raw_length = headers.get("content-length") or "0"
+        # int() would also take signs, spaces and underscores.
+        if not (raw_length.isascii() and raw_length.isdigit()):
+            raise BadRequest(400, "Invalid Content-Length")
+        length = int(raw_length)
+        if length > self.settings.max_body_bytes:
+            raise BadRequest(413, "Request body too large")
+        if length:
+            request.body = await reader.readexactly(length)
+        return request
+
+    async def _dispatch(
+        self, request: Request, writer: asyncio.StreamWriter, keep_alive: bool
+    ) -> bool:
+        """Handles one request; returns whether to keep the connection."""
+        path = request.path.split("?", 1)[0]
+        if path == "/healthz":
+            return await self._respond(
+                writer,
+                200,
+                {
+                    "status": "draining" if self.draining else "ok",
+                    "active_streams": self.active_streams,
+                    "connections": len(self._connections),
+                },
+                keep_alive,
+            )
+        if path != "/chat":
+            return await self._respond(
+                writer, 404, {"error": "Not found"}, keep_alive
+            )
+        if request.method != "POST":
+            return await self._respond(
+                writer, 405, {"error": "Use POST"}, keep_alive
+            )
+        try:
+            payload = json.loads(request.body or b"{}")
+            message = payload["message"]
+        except (ValueError, KeyError, TypeError):
+            return await self._respond(
+                writer,
+                400,
+                {"error": 'Expected a JSON body with a "message" field'},
+                keep_alive,
+            )
+        return await self._stream_chat(writer, payload, message, keep_alive)
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: Dict[str, Any],
+        keep_alive: bool = False,
+        extra_headers: Tuple[str, ...] = (),
+    ) -> bool:
+        keep_alive = keep_alive and not self.draining
+        data = json.dumps(body).encode()
+        head = [
+            f"HTTP/1.1 {status} {_REASONS[status]}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(data)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            *extra_headers,
+        ]
+        writer.write("\r\n".join(head).encode() + b"\r\n\r\n" + data)
+        await self._drain(writer)
+        return keep_alive
+
+    async def _drain(self, writer: asyncio.StreamWriter) -> None:
+        try:
+            await asyncio.wait_for(
+                writer.drain(), self.settings.write_timeout_secs
+            )
+        except asyncio.TimeoutError as e:
+            raise ConnectionError("Client stopped reading") from e
+
+    async def _stream_chat(
+        self,
+        writer: asyncio.StreamWriter,
+        payload: Dict[str, Any],
+        message: str,
+        keep_alive: bool,
+    ) -> bool:
+        try:
+            await asyncio.wait_for(
+                self._slots.acquire(), self.settings.admission_timeout_secs
+            )
+        except asyncio.TimeoutError:
+            return await self._respond(
+                writer,
+                503,
+                {"error": "Too many concurrent chats"},
+                keep_alive,
+                ("Retry-After: 1",),
+            )
+        self.active_streams += 1
+        self._drained.clear()
+        producer = None
+        try:
+            user_id = str(payload.get("user_id") or "portal")
+            session_id = await self._session_id(
+                user_id, payload.get("session_id")
+            )
+            head = [
+                "HTTP/1.1 200 OK",
+                "Content-Type: text/event-stream",
+                "Cache-Control: no-cache",
+                "X-Accel-Buffering: no",
+                "Transfer-Encoding: chunked",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}",
+            ]
+            writer.write("\r\n".join(head).encode() + b"\r\n\r\n")
+            writer.write(_chunk(_sse("session", {"session_id": session_id})))
+            await self._drain(writer)
+
+            queue: asyncio.Queue = asyncio.Queue(
+                self.settings.client_queue_size
+            )
+            producer = asyncio.create_task(
+                self._produce(queue, user_id, session_id, message)
+            )
+            while True:
+                try:
+                    item = await asyncio.wait_for(
+                        queue.get(), self.settings.heartbeat_secs
+                    )
+                except asyncio.TimeoutError:
+                    # Comment lines keep proxies from closing idle streams.
+                    writer.write(_chunk(b": keep-alive\n\n"))
+                    await self._drain(writer)
+                    continue
+                if item is _DONE:
+                    break
+                writer.write(_chunk(_sse(*item)))
+                await self._drain(writer)
+            writer.write(b"0\r\n\r\n")
+            await self._drain(writer)
+            return keep_alive and not self.draining
+        finally:
+            if producer is not None and not producer.done():
+                # The client went away; stop the agent run.
+                producer.cancel()
+            self.active_streams -= 1
+            self._slots.release()
+            if self.active_streams == 0:
+                self._drained.set()
+
+    async def _session_id(self, user_id: str, session_id: Optional[str]) -> str:
+        service = self.runner.session_service
+        app_name = self.runner.app_name
+        if session_id and await service.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        ):
+            return session_id
+        session = await service.create_session(
+            app_name=app_name, user_id=user_id, session_id=session_id or None
+        )
+        return session.id
+
+    async def _produce(
+        self, queue: asyncio.Queue, user_id: str, session_id: str, message: str
+    ) -> None:
+        # Partial text received while the client's queue is full.
+        pending: Optional[Dict[str, Any]] = None
+        try:
+            async for event in self.runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=types.Content(
+                    role="user", parts=[types.Part(text=message)]
+                ),
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+            ):
+                payload = event_payload(event)
+                if _is_text_delta(payload):
+                    if pending is None:
+                        pending = payload
+                    else:
+                        pending["text"] += payload["text"]
+                    if not queue.full():
+                        queue.put_nowait(("message", pending))
+                        pending = None
+                    continue
+                if pending is not None:
+                    await queue.put(("message", pending))
+                    pending = None
+                await queue.put(("message", payload))
+            if pending is not None:
+                await queue.put(("message", pending))
+            await queue.put(("done", {"session_id": session_id}))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # surfaced to the client as an event
+            logger.exception("Agent run failed for session %s", session_id)
+            await queue.put(("error", {"message": str(e)}))
+        await queue.put(_DONE)
+
+
+def main() -> None:
+    from google.adk.runners import InMemoryRunner
+
+    from .agent import root_agent
+
+    configs = Config()
+    parser = argparse.ArgumentParser(description="Serve the agent over SSE")
+    parser.add_argument("--host", default=configs.server_settings.host)
+    parser.add_argument(
+        "--port", type=int, default=configs.server_settings.port
+    )
+    args = parser.parse_args()
+    settings = configs.server_settings.model_copy(
+        update={"host": args.host, "port": args.port}
+    )
+    runner = InMemoryRunner(agent=root_agent, app_name=configs.app_name)
+    asyncio.run(ChatServer(runner, settings).serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,25 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """ includes all shared libraries for the agent."""
+from .callbacks import prune_history_callback
+from .callbacks import response_cache_lookup
+from .callbacks import response_cache_store
+from .callbacks import route_model_callback
 from .callbacks import rate_limit_callback
+from .callbacks import record_route_latency
 from .callbacks import before_tool
+from .callbacks import after_tool
 from .callbacks import before_agent
 
 
-__all__ = ["rate_limit_callback", "before_tool", "before_agent"]
+__all__ = [
+    "prune_history_callback",
+    "response_cache_lookup",
+    "response_cache_store",
+    "route_model_callback",
+    "rate_limit_callback",
+    "record_route_latency",
+    "before_tool",
+    "after_tool",
+    "before_agent",
+]
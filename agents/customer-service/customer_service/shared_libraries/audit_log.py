@@ -0,0 +1,427 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Append-only audit log of compliance-relevant tool calls.
+
+The tool path only puts a record on an in-memory queue. A writer thread
+drains the queue in blocks: each block is a zlib-compressed run of
+length-prefixed JSON records, appended to the active segment file:
+
+    segment-000001.log   [u32 compressed length][u32 record count][zlib ...]
+    segment-000001.idx   sorted (candidate key, timestamp, block, slot)
+
+Segments rotate once they reach `max_segment_bytes`. A sealed segment gets
+a sidecar index sorted by candidate key and timestamp, and `query` binary
+searches it through `mmap`. Only the blocks that hold matching records are
+read and decompressed. The active segment's index stays in memory; after a
+crash it is rebuilt from the segment on open.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from ..config import Config
+from .storage import normalize_id
+
+logger = logging.getLogger(__name__)
+
+AUDITED_TOOLS = frozenset(
+    {"update_employee_status", "promote_employee", "evaluate_interview"}
+)
+
+_BLOCK_HEADER = struct.Struct("<II")
+_RECORD_LENGTH = struct.Struct("<I")
+# candidate key, timestamp, block offset, record slot in the block
+_INDEX_ENTRY = struct.Struct("<QdQI")
+
+IndexEntry = Tuple[int, float, int, int]
+
+
+def candidate_key(candidate_id: str) -> int:
+    """Hashes a candidate id to the 64-bit key used by the index."""
+    digest = hashlib.blake2b(
+        normalize_id(candidate_id).encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+class _Segment:
+    """One segment file; tracks index entries while it is active."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path[: -len(".log")] + ".idx"
+        self.entries: List[IndexEntry] = []
+
+    @property
+    def sealed(self) -> bool:
+        return os.path.exists(self.index_path)
+
+    def recover(self) -> None:
+        """Rebuilds the in-memory index, dropping a torn trailing block."""
+        offset = 0
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            while offset + _BLOCK_HEADER.size <= size:
+                f.seek(offset)
+                header = f.read(_BLOCK_HEADER.size)
+                length, _ = _BLOCK_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length:
+                    break
+                for slot, record in enumerate(_decode_block(payload)):
+                    self.entries.append(
+                        (
+                            candidate_key(record["candidate_id"]),
+                            record["ts"],
+                            offset,
+                            slot,
+                        )
+                    )
+                offset += _BLOCK_HEADER.size + length
+        if offset < size:
+            logger.warning("Truncating torn audit block in %s", self.path)
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def seal(self) -> None:
+        """Writes the sorted sidecar index of a full segment."""
+        entries = sorted(self.entries)
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"".join(_INDEX_ENTRY.pack(*e) for e in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+        self.entries = []
+
+
+def _encode_block(records: List[Dict[str, Any]]) -> bytes:
+    parts = []
+    for record in records:
+        data = json.dumps(record, separators=(",", ":")).encode()
+        parts.append(_RECORD_LENGTH.pack(len(data)))
+        parts.append(data)
+    payload = zlib.compress(b"".join(parts), 1)
+    return _BLOCK_HEADER.pack(len(payload), len(records)) + payload
+
+
+def _decode_block(payload: bytes) -> List[Dict[str, Any]]:
+    raw = zlib.decompress(payload)
+    records, offset = [], 0
+    while offset < len(raw):
+        (length,) = _RECORD_LENGTH.unpack_from(raw, offset)
+        offset += _RECORD_LENGTH.size
+        records.append(json.loads(raw[offset : offset + length]))
+        offset += length
+    return records
+
+
+def _read_records(
+    f: BinaryIO, offset: int, slots: List[int]
+) -> List[Dict[str, Any]]:
+    """Decompresses one block and parses only the records at `slots`."""
+    f.seek(offset)
+    length, _ = _BLOCK_HEADER.unpack(f.read(_BLOCK_HEADER.size))
+    raw = zlib.decompress(f.read(length))
+    wanted, records, position = set(slots), [], 0
+    for slot in range(max(slots) + 1):
+        (size,) = _RECORD_LENGTH.unpack_from(raw, position)
+        position += _RECORD_LENGTH.size
+        if slot in wanted:
+            records.append(json.loads(raw[position : position + size]))
+        position += size
+    return records
+
+
+def _search_index(
+    path: str, key: int, since: float, until: float
+) -> List[Tuple[int, int]]:
+    """Binary searches a sealed index for (block offset, slot) pairs."""
+    if os.path.getsize(path) == 0:
+        return []
+    size = _INDEX_ENTRY.size
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as index:
+        lo, hi = 0, len(index) // size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _INDEX_ENTRY.unpack_from(index, mid * size)[:2] < (key, since):
+                lo = mid + 1
+            else:
+                hi = mid
+        hits = []
+        for i in range(lo, len(index) // size):
+            entry_key, ts, offset, slot = _INDEX_ENTRY.unpack_from(
+                index, i * size
+            )
+            if entry_key != key or ts > until:
+                break
+            hits.append((offset, slot))
+    return hits
+
+
+class AuditLog:
+    """Rotating, compressed, indexed audit log with a non-blocking writer."""
+
+    def __init__(
+        self,
+        directory: str,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        block_records: int = 1024,
+        flush_interval_secs: float = 0.2,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.block_records = block_records
+        self.flush_interval_secs = flush_interval_secs
+        self.written = 0
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._segments = [
+            _Segment(p)
+            for p in sorted(
+                glob.glob(os.path.join(directory, "segment-*.log"))
+            )
+        ]
+        if self._segments and not self._segments[-1].sealed:
+            self._segments[-1].recover()
+        else:
+            self._rotate()
+        self._file = open(self._active.path, "ab")
+        self._writer = threading.Thread(
+            target=self._run, name="audit-log-writer", daemon=True
+        )
+        self._writer.start()
+
+    @property
+    def _active(self) -> _Segment:
+        return self._segments[-1]
+
+    def record(
+        self,
+        tool: str,
+        candidate_id: str,
+        phase: str,
+        payload: Dict[str, Any],
+        **context: Any,
+    ) -> None:
+        """Queues one audit record; never blocks on I/O."""
+        self._queue.put(
+            {
+                "ts": time.time(),
+                "tool": tool,
+                "candidate_id": normalize_id(candidate_id or ""),
+                "phase": phase,
+                "payload": payload,
+                **context,
+            }
+        )
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Waits until every record queued so far is written."""
+        done = threading.Event()
+        self._queue.put(done)
+        if not done.wait(timeout):
+            raise TimeoutError("Audit log writer did not flush in time")
+
+    def close(self) -> None:
+        """Flushes, seals the active segment and stops the writer."""
+        self.flush()
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._close_active()
+
+    def query(
+        self,
+        candidate_id: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Returns a candidate's records in timestamp order.
+
+        Records still queued are flushed first, so the result includes every
+        call made before `query`.
+        """
+        self.flush()
+        key = candidate_key(candidate_id)
+        since = float("-inf") if since is None else since
+        until = float("inf") if until is None else until
+        wanted = normalize_id(candidate_id)
+        with self._lock:
+            plan = [
+                (
+                    segment.path,
+                    _search_index(segment.index_path, key, since, until)
+                    if segment.sealed
+                    else [
+                        (offset, slot)
+                        for k, ts, offset, slot in segment.entries
+                        if k == key and since <= ts <= until
+                    ],
+                )
+                for segment in self._segments
+            ]
+        results = []
+        for path, hits in plan:
+            if not hits:
+                continue
+            slots_by_block: Dict[int, List[int]] = {}
+            for offset, slot in hits:
+                slots_by_block.setdefault(offset, []).append(slot)
+            with open(path, "rb") as f:
+                for offset, slots in slots_by_block.items():
+                    results.extend(
+                        r
+                        for r in _read_records(f, offset, slots)
+                        if r["candidate_id"] == wanted  # hash collisions
+                    )
+        results.sort(key=lambda r: r["ts"])
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """Returns segment count, bytes on disk and records written."""
+        return {
+            "segments": len(self._segments),
+            "bytes": sum(os.path.getsize(s.path) for s in self._segments),
+            "records_written": self.written,
+            "queued": self._queue.qsize(),
+        }
+
+    def _rotate(self) -> None:
+        number = len(self._segments) + 1
+        self._segments.append(
+            _Segment(
+                os.path.join(self.directory, f"segment-{number:06d}.log")
+            )
+        )
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        waiters: List[threading.Event] = []
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self.flush_interval_secs)
+            except queue.Empty:
+                item = False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                elif item is not False:
+                    batch.append(item)
+                if len(batch) >= self.block_records or stop:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write_block(batch)
+                except OSError:
+                    logger.exception("Failed to write audit block")
+                batch = []
+            # The queue is FIFO: every record queued before a waiter has
+            # been written by now.
+            if waiters:
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+
+    def _write_block(self, records: List[Dict[str, Any]]) -> None:
+        block = _encode_block(records)
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(block)
+            self._file.flush()
+            self._active.entries.extend(
+                (candidate_key(r["candidate_id"]), r["ts"], offset, slot)
+                for slot, r in enumerate(records)
+            )
+            self.written += len(records)
+            if offset + len(block) >= self.max_segment_bytes:
+                self._close_active()
+                self._rotate()
+                self._file = open(self._active.path, "ab")
+
+    def _close_active(self) -> None:
+        """Syncs the active segment to disk, then seals it."""
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._active.seal()
+
+
+_audit_log: Optional[AuditLog] = None
+_audit_lock = threading.Lock()
+
+
+# Where the log goes when neither it nor the roster has a directory.
+FALLBACK_DIRECTORY = os.path.join("~", ".customer_service", "audit")
+
+
+def default_directory() -> str:
+    """The configured audit directory, else one next to the storage file.
+
+    An in-memory roster has no directory, but the audit log must outlive
+    the process: it then goes to `FALLBACK_DIRECTORY`, the same on every
+    start.
+    """
+    configs = Config()
+    if configs.audit_settings.directory:
+        return configs.audit_settings.directory
+    path = configs.storage_settings.path
+    if path == ":memory:":
+        return os.path.expanduser(FALLBACK_DIRECTORY)
+    return os.path.join(os.path.dirname(os.path.abspath(path)), "audit")
+
+
+def get_audit_log() -> AuditLog:
+    """Returns the process-wide audit log, opening it on first use."""
+    global _audit_log
+    if _audit_log is None:
+        with _audit_lock:
+            if _audit_log is None:
+                settings = Config().audit_settings
+                directory = default_directory()
+                logger.info("Writing the audit log to %s", directory)
+                _audit_log = AuditLog(
+                    directory,
+                    max_segment_bytes=settings.max_segment_bytes,
+                    block_records=settings.block_records,
+                    flush_interval_secs=settings.flush_interval_secs,
+                )
+    return _audit_log
+
+
+def set_audit_log(audit_log: Optional[AuditLog]) -> None:
+    """Replaces the process-wide audit log (used by tests)."""
+    global _audit_log
+    with _audit_lock:
+        _audit_log = audit_log
@@ -14,33 +14,159 @@
 
 """Callback functions for FOMC Research Agent."""
 
+import asyncio
 import logging
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from google.adk.agents.callback_context import CallbackContext
-from google.adk.models import LlmRequest
+from google.adk.models import LlmRequest, LlmResponse
 from google.adk.tools import BaseTool
+from google.genai import types
 from google.adk.agents.invocation_context import InvocationContext
+from ..config import Config
 from ..entities.customer import Employee
+from . import deadlines
+from .audit_log import AUDITED_TOOLS, get_audit_log
+from .history import HistoryPruner
+from .model_router import ModelRouter
+from .model_scheduler import BUSY_MESSAGE, ModelScheduler
+from .profile_cache import get_profile_cache
+from .response_cache import ResponseCache, is_cacheable
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 RATE_LIMIT_SECS = 60
+# Profile loaded into new sessions until sessions carry the user's id.
+DEFAULT_PROFILE_ID = "E001"
 RPM_QUOTA = 10
 
+_configs = Config()
+_history_settings = _configs.history_settings
+history_pruner = HistoryPruner(
+    token_budget=_history_settings.token_budget,
+    keep_recent_turns=_history_settings.keep_recent_turns,
+    summary_max_tokens=_history_settings.summary_max_tokens,
+)
 
-def rate_limit_callback(
+_cache_settings = _configs.response_cache_settings
+response_cache = ResponseCache(
+    max_entries=_cache_settings.max_entries,
+    ttl_seconds=_cache_settings.ttl_seconds,
+    history_window=_cache_settings.history_window,
+    disk_path=_cache_settings.disk_path,
+)
+
+_agent_settings = _configs.agent_settings
+model_router = ModelRouter(
+    fast_model=_agent_settings.fast_model,
+    capable_model=_agent_settings.model,
+    max_words=_agent_settings.fast_turn_max_words,
+)
+
+_deadline_settings = _configs.deadline_settings
+_scheduler_settings = _configs.model_scheduler_settings
+model_scheduler = ModelScheduler(_scheduler_settings)
+
+_ROUTE_TIER = "temp:model_route_tier"
+_ROUTE_STARTED = "temp:model_route_started"
+
+_CACHE_KEY = "temp:response_cache_key"
+_CACHE_STARTED = "temp:response_cache_started"
+
+
+def response_cache_lookup(
     callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Callback function that answers repeated turns from the cache."""
+    if not _cache_settings.enabled:
+        return None
+    key, cached = response_cache.lookup(llm_request)
+    if cached is not None:
+        logger.debug("response_cache_lookup [hit: %s]", key[:12])
+        callback_context.state[_CACHE_KEY] = None
+        return cached
+    callback_context.state[_CACHE_KEY] = key
+    callback_context.state[_CACHE_STARTED] = time.time()
+    return None
+
+
+def response_cache_store(
+    callback_context: CallbackContext, llm_response: LlmResponse
 ) -> None:
-    """Callback function that implements a query rate limit."""
+    """Callback function that caches the model response of a missed turn."""
+    key = callback_context.state.get(_CACHE_KEY)
+    if not key or not is_cacheable(llm_response):
+        return None
+    callback_context.state[_CACHE_KEY] = None
+    started = callback_context.state.get(_CACHE_STARTED) or time.time()
+    response_cache.put(key, llm_response, time.time() - started)
+    return None
+
+
+def route_model_callback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> None:
+    """Callback function that sends the call to the fast or capable model."""
+    tier = model_router.route(llm_request)
+    logger.debug(
+        "route_model_callback [tier: %s, model: %s]", tier, llm_request.model
+    )
+    callback_context.state[_ROUTE_TIER] = tier
+    callback_context.state[_ROUTE_STARTED] = time.time()
+
+
+def record_route_latency(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> None:
+    """Callback function that records the model latency of the routed tier."""
+    tier = callback_context.state.get(_ROUTE_TIER)
+    if not tier or llm_response.partial:
+        return None
+    callback_context.state[_ROUTE_TIER] = None
+    started = callback_context.state.get(_ROUTE_STARTED) or time.time()
+    model_router.record(tier, time.time() - started)
+    return None
+
+
+def prune_history_callback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> None:
+    """Callback function that keeps the prompt history within budget."""
+    llm_request.contents = history_pruner.prune(
+        llm_request.contents,
+        (callback_context.session.id, callback_context.agent_name),
+    )
+
+
+def _try_again_response() -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(
+            role="model", parts=[types.Part(text=deadlines.TRY_AGAIN_MESSAGE)]
+        )
+    )
+
+
+async def rate_limit_callback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Callback function that implements a query rate limit.
+
+    The wait for the quota window never runs past the turn's deadline: a
+    call that would is answered with a "try again" message instead.
+    """
 
     for content in llm_request.contents:
         for part in content.parts:
             if part.text == "":
                 part.text = " "
 
+    deadline = deadlines.get_deadline(callback_context.state)
+    if deadlines.expired(deadline):
+        logger.warning("rate_limit_callback [turn deadline passed]")
+        return _try_again_response()
+
     now = time.time()
     if "timer_start" not in callback_context.state:
         callback_context.state["timer_start"] = now
@@ -64,14 +190,42 @@ def rate_limit_callback(
     if request_count > RPM_QUOTA:
         delay = RATE_LIMIT_SECS - elapsed_secs + 1
         if delay > 0:
+            if delay > deadlines.bounded(delay, deadline):
+                logger.warning(
+                    "rate_limit_callback [%is wait exceeds turn deadline]",
+                    delay,
+                )
+                return _try_again_response()
             logger.debug("Sleeping for %i seconds", delay)
-            time.sleep(delay)
+            await asyncio.sleep(delay)
         callback_context.state["timer_start"] = time.time()
         callback_context.state["request_count"] = 1
     else:
         callback_context.state["request_count"] = request_count
 
 
+async def schedule_model_call(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Callback function that waits for a turn on the shared model quota."""
+    if not _scheduler_settings.enabled:
+        return None
+    cls = model_scheduler.classify(callback_context.agent_name, llm_request)
+    timeout = deadlines.remaining(
+        deadlines.get_deadline(callback_context.state)
+    )
+    if await model_scheduler.acquire(cls, timeout):
+        return None
+    logger.debug("schedule_model_call [shed: %s]", cls)
+    # Keep the busy answer out of the response cache.
+    callback_context.state[_CACHE_KEY] = None
+    return LlmResponse(
+        content=types.Content(
+            role="model", parts=[types.Part(text=BUSY_MESSAGE)]
+        )
+    )
+
+
 def lowercase_value(value: Any) -> Any:
     """Recursively lowercases all string values in a nested structure."""
     if isinstance(value, dict):
@@ -97,10 +251,21 @@ def before_tool(tool: BaseTool, args: Dict[str, Any], tool_context: CallbackCont
 
     args.update(lowercase_value(args))
 
-    # Onboarding-specific logic
+    # Tools check the deadline themselves as well; they read it from here.
+    deadline = deadlines.get_deadline(tool_context.state)
+    deadlines.bind(deadline)
+    if deadlines.expired(deadline):
+        logger.warning("Skipping %s: turn deadline passed", tool.name)
+        return deadlines.try_again(tool.name)
+
+    if tool.name in AUDITED_TOOLS:
+        _audit(tool, args, tool_context, "call", dict(args))
+
+    # Onboarding-specific logic: remember who is being onboarded, then let
+    # the tool start the background workflow.
     if tool.name == "start_onboarding":
-        employee_id = args.get("employee_id")
-        start_date = args.get("start_date", "TBD")
+        employee_id = args.get("candidate_id")
+        start_date = args.get("start_date") or "TBD"
 
         logger.info(f"✅ Initiating onboarding for employee {employee_id}, start date: {start_date}")
 
@@ -109,17 +274,75 @@ def before_tool(tool: BaseTool, args: Dict[str, Any], tool_context: CallbackCont
         tool_context.state["onboarding_employee_id"] = employee_id
         tool_context.state["onboarding_start_date"] = start_date
 
-        return {
-            "result": f"📦 Onboarding process started for employee `{employee_id}` with start date `{start_date}`."
-        }
+    return None
+
+
+def _audit(tool, args, tool_context, phase, payload) -> None:
+    get_audit_log().record(
+        tool.name,
+        args.get("candidate_id", ""),
+        phase,
+        payload,
+        invocation_id=getattr(tool_context, "invocation_id", None),
+        agent=getattr(tool_context, "agent_name", None),
+    )
+
+
+def after_tool(
+    tool: BaseTool,
+    args: Dict[str, Any],
+    tool_context: CallbackContext,
+    tool_response: Any,
+) -> Optional[Dict[str, Any]]:
+    """Records the outcome of audited tool calls; never alters the response."""
+    if tool.name in AUDITED_TOOLS:
+        payload = (
+            tool_response
+            if isinstance(tool_response, dict)
+            else {"result": str(tool_response)}
+        )
+        _audit(tool, args, tool_context, "result", payload)
+    return None
+
 
+def on_tool_error(
+    tool: BaseTool,
+    args: Dict[str, Any],
+    tool_context: CallbackContext,
+    error: Exception,
+) -> Optional[Dict[str, Any]]:
+    """Records audited tool calls that raised; the error still propagates."""
+    if tool.name in AUDITED_TOOLS:
+        _audit(
+            tool,
+            args,
+            tool_context,
+            "error",
+            {"error": f"{type(error).__name__}: {error}"},
+        )
     return None
 
 
+def _session_profile(employee_id: str) -> str:
+    """Returns the profile JSON stored in a new session's state."""
+    if _configs.profile_cache_settings.enabled:
+        profile = get_profile_cache().get(employee_id)
+        if profile is not None:
+            return profile.json
+    return Employee.get_customer(employee_id).to_json()
+
+
 def before_agent(callback_context: InvocationContext):
     """Callback before the agent starts."""
+    if _deadline_settings.enabled:
+        deadlines.start_turn(
+            callback_context.state, _deadline_settings.turn_budget_secs
+        )
+
     if "customer_profile" not in callback_context.state:
-        callback_context.state["customer_profile"] = Employee.get_customer("E001").to_json()
+        callback_context.state["customer_profile"] = _session_profile(
+            DEFAULT_PROFILE_ID
+        )
 
     # Onboarding context load (optional pre-check)
     if "onboarding_started" in callback_context.state:
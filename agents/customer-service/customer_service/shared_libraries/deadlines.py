@@ -0,0 +1,93 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-turn deadlines shared by callbacks and tools.
+
+When the first agent of a turn starts, `start_turn` stores an absolute
+deadline in the turn-scoped (`temp:`) session state, so sub-agents the
+router transfers to inherit it. Callbacks read it from their context.
+Tools take no context, so `before_tool` binds the deadline to a context
+variable that `expired` and `remaining` read inside the tool, including
+on the tool executor's threads, which run with a copy of the caller's
+context.
+
+Cancellation is cooperative: nothing is interrupted mid-write. Callbacks
+and tools check the deadline before they start work that could outlive it
+and answer with `try_again` (tools) or `TRY_AGAIN_MESSAGE` (model calls)
+instead of blocking the turn.
+"""
+
+import contextvars
+import time
+from typing import Any, Dict, MutableMapping, Optional
+
+DEADLINE_KEY = "temp:turn_deadline"
+TRY_AGAIN_MESSAGE = (
+    "This is taking longer than expected, so I stopped here. Please try"
+    " again in a moment."
+)
+
+_current: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "turn_deadline", default=None
+)
+
+
+def start_turn(state: MutableMapping[str, Any], budget_secs: float) -> float:
+    """Sets the turn's deadline unless an earlier agent already did."""
+    deadline = state.get(DEADLINE_KEY)
+    if deadline is None:
+        deadline = time.time() + budget_secs
+        state[DEADLINE_KEY] = deadline
+    return deadline
+
+
+def get_deadline(state: MutableMapping[str, Any]) -> Optional[float]:
+    """Returns the deadline stored in a context's state, if any."""
+    return state.get(DEADLINE_KEY)
+
+
+def bind(deadline: Optional[float]) -> None:
+    """Makes `deadline` the one `remaining` and `expired` default to."""
+    _current.set(deadline)
+
+
+def remaining(deadline: Optional[float] = None) -> Optional[float]:
+    """Returns the seconds left, or None when there is no deadline."""
+    if deadline is None:
+        deadline = _current.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.time())
+
+
+def expired(deadline: Optional[float] = None) -> bool:
+    left = remaining(deadline)
+    return left is not None and left <= 0
+
+
+def bounded(timeout: float, deadline: Optional[float] = None) -> float:
+    """Returns `timeout`, cut short to the time left before the deadline."""
+    left = remaining(deadline)
+    return timeout if left is None else min(timeout, left)
+
+
+def try_again(action: str) -> Dict[str, str]:
+    """The degraded result a tool returns once the deadline has passed."""
+    return {
+        "status": "try_again",
+        "message": (
+            f"{action} was not done because this turn ran out of time."
+            " Nothing was changed; please try again."
+        ),
+    }
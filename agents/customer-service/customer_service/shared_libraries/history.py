@@ -0,0 +1,264 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Token-budgeted pruning of the conversation history sent to the model."""
+
+import hashlib
+import json
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+_SUMMARY_HEADER = "Summary of the earlier conversation:"
+_SNIPPET_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates the token count of `text` (about 4 characters a token)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def _part_text(part: types.Part) -> str:
+    if part.text:
+        return part.text
+    if part.function_call:
+        return f"{part.function_call.name}({json.dumps(part.function_call.args, default=str)})"
+    if part.function_response:
+        return json.dumps(part.function_response.response, default=str)
+    return ""
+
+
+def content_tokens(content: types.Content) -> int:
+    """Approximates the tokens a content contributes to the prompt."""
+    return sum(estimate_tokens(_part_text(p)) for p in content.parts or [])
+
+
+def _measure(content: types.Content) -> Tuple[int, bytes]:
+    """Returns a content's token estimate and a digest of its text."""
+    texts = [_part_text(p) for p in content.parts or []]
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update((content.role or "").encode())
+    for text in texts:
+        digest.update(b"\0" + text.encode())
+    return sum(estimate_tokens(t) for t in texts), digest.digest()
+
+
+class _History:
+    """What the pruner remembers about one session's history for an agent."""
+
+    __slots__ = ("counts", "digests", "summary_turns", "summary_lines")
+
+    def __init__(self):
+        self.counts: List[int] = []
+        self.digests: List[bytes] = []
+        self.summary_turns = 0
+        self.summary_lines: List[str] = []
+
+
+def _is_user_message(content: types.Content) -> bool:
+    return content.role == "user" and any(
+        p.text for p in content.parts or []
+    )
+
+
+def _has_tool_result(content: types.Content) -> bool:
+    return any(p.function_response for p in content.parts or [])
+
+
+def _has_tool_call(content: types.Content) -> bool:
+    return any(p.function_call for p in content.parts or [])
+
+
+def _snippet(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= _SNIPPET_CHARS:
+        return text
+    return text[: _SNIPPET_CHARS - 3] + "..."
+
+
+def summarize_turn(turn: List[types.Content]) -> str:
+    """Extracts a one-line summary of a turn: the ask, tools used, reply."""
+    asked, tools, replied = "", [], ""
+    for content in turn:
+        for part in content.parts or []:
+            if part.function_call:
+                tools.append(part.function_call.name)
+            elif part.text and content.role == "user" and not asked:
+                asked = part.text
+            elif part.text and content.role == "model":
+                replied = part.text
+    line = f"- User: {_snippet(asked)}"
+    if tools:
+        line += f" | Tools: {', '.join(tools)}"
+    if replied:
+        line += f" | Assistant: {_snippet(replied)}"
+    return line
+
+
+class HistoryPruner:
+    """Keeps the prompt history within a token budget.
+
+    Contents are grouped into turns, each starting at a user message. When the
+    history exceeds `token_budget`, the oldest turns are replaced by a short
+    extractive summary while the last `keep_recent_turns` turns are sent
+    verbatim. If the latest tool result falls in a summarized turn, that
+    result and its function call are kept verbatim after the summary; the
+    rest of their turn is summarized like any other.
+
+    Per-content token counts and the summary are cached in process, per
+    `key` (a session and agent: sub-agents see differently rewritten
+    contents), for the `max_histories` most recently used keys. Each model
+    call then only counts and summarizes what was appended since the
+    previous one. The cached prefix is reused only while the digests of its
+    first and last contents still match.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 6000,
+        keep_recent_turns: int = 4,
+        summary_max_tokens: int = 600,
+        max_histories: int = 1024,
+    ):
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.summary_max_tokens = summary_max_tokens
+        self.max_histories = max_histories
+        self._histories: "OrderedDict[Hashable, _History]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _history(self, key: Optional[Hashable]) -> _History:
+        if key is None:
+            return _History()
+        with self._lock:
+            history = self._histories.pop(key, None) or _History()
+            self._histories[key] = history
+            while len(self._histories) > self.max_histories:
+                self._histories.popitem(last=False)
+        return history
+
+    def count(
+        self, contents: List[types.Content], history: _History
+    ) -> List[int]:
+        """Returns per-content token counts, reusing the cached prefix."""
+        done = len(history.counts)
+        if done and (
+            done > len(contents)
+            or _measure(contents[0])[1] != history.digests[0]
+            or _measure(contents[done - 1])[1] != history.digests[done - 1]
+        ):
+            history.__init__()
+            done = 0
+        for content in contents[done:]:
+            tokens, digest = _measure(content)
+            history.counts.append(tokens)
+            history.digests.append(digest)
+        return history.counts
+
+    def prune(
+        self, contents: List[types.Content], key: Optional[Hashable] = None
+    ) -> List[types.Content]:
+        """Returns the contents to send, summarizing old turns if needed.
+
+        Args:
+            contents: The history about to be sent.
+            key: Identifies the history across calls, e.g. (session id,
+                agent name); None disables caching.
+        """
+        history = self._history(key)
+        counts = self.count(contents, history)
+        total = sum(counts)
+        if total <= self.token_budget:
+            return contents
+
+        starts = [i for i, c in enumerate(contents) if _is_user_message(c)]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        # Never cut into the recent turns; cutting only at turn starts keeps
+        # calls paired with their results.
+        max_cut = len(starts) - self.keep_recent_turns
+        if max_cut <= 0:
+            return contents
+        # The latest tool result and the call it answers survive the cut.
+        pinned: List[int] = []
+        last_tool = next(
+            (
+                i
+                for i in range(len(contents) - 1, -1, -1)
+                if _has_tool_result(contents[i])
+            ),
+            None,
+        )
+        if last_tool is not None:
+            call = next(
+                (
+                    i
+                    for i in range(last_tool - 1, -1, -1)
+                    if _has_tool_call(contents[i])
+                ),
+                None,
+            )
+            pinned = [i for i in (call, last_tool) if i is not None]
+
+        # Leave room for the summary that replaces the dropped turns.
+        budget = self.token_budget - self.summary_max_tokens
+        cut = 0
+        while cut < max_cut and total > budget:
+            end = starts[cut + 1]
+            total -= sum(
+                counts[i] for i in range(starts[cut], end) if i not in pinned
+            )
+            cut += 1
+        summary = self._summary(contents, starts, cut, history)
+        logger.debug(
+            "history pruned [turns_summarized: %i, tokens_kept: %i]",
+            cut,
+            total + estimate_tokens(summary),
+        )
+
+        header = types.Part(text=f"{_SUMMARY_HEADER}\n{summary}")
+        kept = list(contents[starts[cut] :])
+        pinned = [i for i in pinned if i < starts[cut]]
+        if pinned:
+            return (
+                [types.Content(role="user", parts=[header])]
+                + [contents[i] for i in pinned]
+                + kept
+            )
+        first = kept[0]
+        merged = types.Content(
+            role=first.role, parts=[header] + list(first.parts or [])
+        )
+        return [merged] + kept[1:]
+
+    def _summary(self, contents, starts, turns, history: _History) -> str:
+        lines = history.summary_lines
+        if history.summary_turns > turns:
+            lines.clear()
+            history.summary_turns = 0
+        for t in range(history.summary_turns, turns):
+            lines.append(summarize_turn(contents[starts[t] : starts[t + 1]]))
+        while (
+            len(lines) > 1
+            and estimate_tokens("\n".join(lines)) > self.summary_max_tokens
+        ):
+            lines.pop(0)
+        history.summary_turns = turns
+        return "\n".join(lines)
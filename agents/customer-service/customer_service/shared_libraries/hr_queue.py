@@ -0,0 +1,388 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Queue of HR questions, clustered so one answer resolves many questions.
+
+Questions are reduced to a MinHash signature of their word trigrams and
+matched against cluster representatives through banded LSH. Only the
+representatives are indexed, so bucket sizes grow with the number of
+distinct questions, not with the number asked, and inserts and lookups stay
+sub-millisecond at millions of questions. HR staff pick clusters by
+priority (volume weighted by the age of the oldest question) and answer
+each cluster once; the answer is written to every affected `HRQuestions`
+record. Questions are persisted before they are queued, and every write
+to an employee is version-checked, so answers and new questions from
+concurrent tool calls never overwrite each other.
+"""
+
+import heapq
+import logging
+import random
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from ..entities.customer import Employee, HRQuestions
+from .storage import EmployeeStore, get_store, normalize_id
+
+logger = logging.getLogger(__name__)
+
+_MASK64 = (1 << 64) - 1
+_EMPTY_BIN = 1 << 64
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str) -> Set[int]:
+    """Hashes the padded character trigrams of each word in `text`.
+
+    Trigrams taken within words ignore word order and punctuation and
+    tolerate typos, so rephrasings of the same question share most shingles.
+    """
+    grams = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(zlib.crc32(padded[i : i + 3].encode()))
+    return grams
+
+
+class MinHasher:
+    """One-permutation MinHash with `num_perm` bins.
+
+    Each shingle is hashed once and kept as the minimum of the bin its hash
+    falls in, so a signature costs O(shingles) rather than
+    O(shingles * num_perm). An empty bin borrows the value of the first
+    non-empty bin along its own random probe sequence ("optimal
+    densification"), so the empty bins of a band borrow from independent
+    bins and a single shared shingle cannot fill a whole band.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        # Multiplying by an odd constant permutes 64-bit integers.
+        self._multiplier = rng.randrange(1 << 63) | 1
+        self._offset = rng.randrange(1 << 64)
+        self._probes = []
+        for i in range(num_perm):
+            others = [j for j in range(num_perm) if j != i]
+            rng.shuffle(others)
+            self._probes.append(others)
+
+    def signature(self, hashes: Set[int]) -> Tuple[int, ...]:
+        bins = self.num_perm
+        values = [_EMPTY_BIN] * bins
+        multiplier, offset = self._multiplier, self._offset
+        for x in hashes:
+            h = (x * multiplier + offset) & _MASK64
+            slot = h % bins
+            if h < values[slot]:
+                values[slot] = h
+        if _EMPTY_BIN in values and len(hashes):
+            filled = list(values)
+            for i, value in enumerate(values):
+                if value == _EMPTY_BIN:
+                    for j in self._probes[i]:
+                        if values[j] != _EMPTY_BIN:
+                            filled[i] = values[j]
+                            break
+            values = filled
+        return tuple(values)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimates the Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class QuestionRef(NamedTuple):
+    """Where a queued question lives: employee and `hr_questions` index."""
+
+    employee_id: str
+    index: int
+    asked_at: float
+
+
+def _answer_questions(
+    employee: Employee, indexes: List[int], response: str
+) -> bool:
+    """Answers the given `hr_questions` of an employee; False if none exist."""
+    changed = False
+    for i in indexes:
+        if 0 <= i < len(employee.hr_questions):
+            employee.hr_questions[i].answered = True
+            employee.hr_questions[i].response = response
+            changed = True
+    return changed
+
+
+class Cluster:
+    """Near-duplicate questions that share one answer."""
+
+    __slots__ = ("id", "text", "signature", "questions", "answer")
+
+    def __init__(self, cluster_id: int, text: str, signature: Tuple[int, ...]):
+        self.id = cluster_id
+        self.text = text
+        self.signature = signature
+        self.questions: List[QuestionRef] = []
+        self.answer: Optional[str] = None
+
+    def priority(self, now: float) -> float:
+        """Volume weighted by age: +100% for every day the oldest has waited."""
+        oldest = self.questions[0].asked_at if self.questions else now
+        return len(self.questions) * (1 + (now - oldest) / 86400)
+
+    def summary(self, now: float) -> Dict:
+        return {
+            "cluster_id": self.id,
+            "question": self.text,
+            "open_questions": len(self.questions),
+            "oldest_asked_at": (
+                self.questions[0].asked_at if self.questions else None
+            ),
+            "priority": round(self.priority(now), 2),
+        }
+
+
+class HRQuestionQueue:
+    """Clusters incoming questions and resolves clusters in bulk."""
+
+    def __init__(
+        self,
+        store: Optional[EmployeeStore] = None,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = 0.5,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self._store = store
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.clusters: Dict[int, Cluster] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+        self._lock = threading.Lock()
+
+    @property
+    def store(self) -> EmployeeStore:
+        return self._store or get_store()
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows : (band + 1) * self.rows]
+
+    def _match(self, signature: Tuple[int, ...]) -> Optional[Cluster]:
+        best, best_score = None, self.threshold
+        seen: Set[int] = set()
+        for band, key in self._band_keys(signature):
+            for cluster_id in self._buckets[band].get(key, ()):
+                if cluster_id in seen:
+                    continue
+                seen.add(cluster_id)
+                cluster = self.clusters[cluster_id]
+                score = similarity(signature, cluster.signature)
+                if score >= best_score:
+                    best, best_score = cluster, score
+        return best
+
+    def find(self, question: str) -> Optional[Cluster]:
+        """Returns the cluster a question would join, if any."""
+        signature = self.hasher.signature(shingles(question))
+        with self._lock:
+            return self._match(signature)
+
+    def add(
+        self,
+        employee_id: str,
+        index: int,
+        question: str,
+        asked_at: Optional[float] = None,
+    ) -> Cluster:
+        """Queues a question and returns the cluster it joined or started."""
+        signature = self.hasher.signature(shingles(question))
+        ref = QuestionRef(
+            normalize_id(employee_id),
+            index,
+            time.time() if asked_at is None else asked_at,
+        )
+        with self._lock:
+            cluster = self._match(signature)
+            if cluster is None:
+                cluster = Cluster(len(self.clusters) + 1, question, signature)
+                self.clusters[cluster.id] = cluster
+                for band, key in self._band_keys(signature):
+                    self._buckets[band][key].append(cluster.id)
+            if cluster.answer is None:
+                cluster.questions.append(ref)
+            return cluster
+
+    def _add_answered(self, question: str, response: str) -> Cluster:
+        """Restores an answered cluster without queueing the question."""
+        signature = self.hasher.signature(shingles(question))
+        with self._lock:
+            cluster = self._match(signature)
+            if cluster is None:
+                cluster = Cluster(len(self.clusters) + 1, question, signature)
+                self.clusters[cluster.id] = cluster
+                for band, key in self._band_keys(signature):
+                    self._buckets[band][key].append(cluster.id)
+            if cluster.answer is None:
+                cluster.answer = response
+            return cluster
+
+    def top(self, limit: int = 10) -> List[Dict]:
+        """Returns the open clusters with the highest priority."""
+        now = time.time()
+        with self._lock:
+            open_clusters = [
+                c for c in self.clusters.values() if c.questions and not c.answer
+            ]
+            best = heapq.nlargest(
+                limit, open_clusters, key=lambda c: c.priority(now)
+            )
+            return [c.summary(now) for c in best]
+
+    def answer(self, cluster_id: int, response: str) -> int:
+        """Answers every question of a cluster; returns how many were updated.
+
+        The answer is also kept on the cluster, so later near-duplicates are
+        answered as soon as they are asked.
+        """
+        with self._lock:
+            cluster = self.clusters[cluster_id]
+            refs, cluster.questions = cluster.questions, []
+            cluster.answer = response
+        by_employee: Dict[str, List[int]] = defaultdict(list)
+        for ref in refs:
+            by_employee[ref.employee_id].append(ref.index)
+        for employee_id, indexes in by_employee.items():
+            self.store.update(
+                employee_id,
+                lambda e, indexes=indexes: _answer_questions(
+                    e, indexes, response
+                ),
+            )
+        logger.info(
+            "Answered HR cluster %s: %i questions, %i employees",
+            cluster_id,
+            len(refs),
+            len(by_employee),
+        )
+        return len(refs)
+
+    def rebuild(self) -> int:
+        """Restores the clusters of the questions found in storage.
+
+        Answered questions bring back their clusters' answers first, so
+        near-duplicates asked later are still answered on the spot. Open
+        questions are then queued; any that match an answered cluster are
+        answered right away, as `ask` would have. Returns how many
+        questions were queued.
+        """
+        pending = []
+        for record in self.store.iter_records():
+            for i, question in enumerate(record.get("hr_questions") or []):
+                if question.get("answered") and question.get("response"):
+                    self._add_answered(
+                        question["question"], question["response"]
+                    )
+                elif not question.get("answered"):
+                    pending.append((record["employee_id"], i, question))
+        count = 0
+        for employee_id, i, question in pending:
+            asked_at = question.get("asked_at")
+            cluster = self.add(
+                employee_id,
+                i,
+                question["question"],
+                (
+                    datetime.fromisoformat(asked_at).timestamp()
+                    if asked_at
+                    else None
+                ),
+            )
+            if cluster.answer is None:
+                count += 1
+            else:
+                self.store.update(
+                    employee_id,
+                    lambda e, i=i, answer=cluster.answer: _answer_questions(
+                        e, [i], answer
+                    ),
+                )
+        return count
+
+
+def ask(candidate_id: str, question: str) -> Tuple[Cluster, HRQuestions]:
+    """Records a question on the employee and queues it.
+
+    Questions that match an already answered cluster are answered on the
+    spot. The question is stored before it is queued, so an answer given
+    in between always finds it.
+
+    Raises:
+        ValueError: If the candidate does not exist.
+    """
+    queue = get_hr_queue()
+    store = queue.store
+    asked: List[int] = []
+
+    def record_question(employee: Employee) -> bool:
+        employee.ask_hr_question(question)
+        asked[:] = [len(employee.hr_questions) - 1]
+        return True
+
+    employee = store.update(candidate_id, record_question)
+    if employee is None:
+        raise ValueError(f"Candidate {candidate_id} not found.")
+    index = asked[0]
+    cluster = queue.add(employee.employee_id, index, question)
+    if cluster.answer is not None:
+        employee = store.update(
+            employee.employee_id,
+            lambda e: _answer_questions(e, [index], cluster.answer),
+        )
+    return cluster, employee.hr_questions[index]
+
+
+_queue: Optional[HRQuestionQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_hr_queue() -> HRQuestionQueue:
+    """Returns the process-wide queue, rebuilt from storage on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                queue = HRQuestionQueue()
+                logger.debug("Queued %i stored HR questions", queue.rebuild())
+                _queue = queue
+    return _queue
+
+
+def set_hr_queue(queue: Optional[HRQuestionQueue]) -> None:
+    """Replaces the process-wide queue (used by tests)."""
+    global _queue
+    with _queue_lock:
+        _queue = queue
@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Routes each model call to a fast or a capable model tier."""
+
+import re
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+FAST = "fast"
+CAPABLE = "capable"
+# Latency percentiles are computed over the most recent calls per tier.
+_LATENCY_SAMPLES = 1024
+
+_SMALL_TALK_RE = re.compile(
+    r"^(hi|hello|hey|good (morning|afternoon|evening)|thanks?|thank you|"
+    r"yes|yeah|yep|no|nope|ok|okay|sure|great|perfect|cool|bye|goodbye|"
+    r"sounds good|got it|that'?s all|please)\b"
+)
+_ACTION_RE = re.compile(
+    r"\b(schedul|interview|evaluat|mark|score|promot|onboard|status|hire|"
+    r"hiring|terminat|appl|candidate|employee|benefit|polic|salary|leave|"
+    r"start date|find|search|role)\w*"
+)
+
+
+def _latest_user_text(contents: List[types.Content]) -> Optional[str]:
+    for content in reversed(contents):
+        if content.role != "user":
+            continue
+        texts = [p.text for p in content.parts or [] if p.text]
+        if texts:
+            return " ".join(texts)
+        return None  # a function response, not a user message
+    return None
+
+
+def classify_turn(llm_request: LlmRequest, max_words: int = 8) -> str:
+    """Classifies a model call as FAST or CAPABLE with cheap local checks.
+
+    A call is routed to the fast tier only when the latest content is a short
+    user message that reads as small talk or a confirmation and names no
+    onboarding action. Calls that continue after a tool result, carry pending
+    tool calls, or ask for anything substantive go to the capable tier.
+    """
+    if not llm_request.contents:
+        return CAPABLE
+    last = llm_request.contents[-1]
+    if any(p.function_call or p.function_response for p in last.parts or []):
+        return CAPABLE
+    text = _latest_user_text(llm_request.contents[-1:])
+    if text is None:
+        return CAPABLE
+    text = " ".join(text.lower().split())
+    if len(text.split()) > max_words or _ACTION_RE.search(text):
+        return CAPABLE
+    return FAST if _SMALL_TALK_RE.match(text) else CAPABLE
+
+
+class ModelRouter:
+    """Picks the model tier per call and keeps per-tier traffic statistics."""
+
+    def __init__(
+        self,
+        fast_model: Optional[str],
+        capable_model: str,
+        max_words: int = 8,
+    ):
+        self.models = {FAST: fast_model or capable_model, CAPABLE: capable_model}
+        self.max_words = max_words
+        self._lock = threading.Lock()
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._latencies: Dict[str, Deque[float]] = defaultdict(
+            lambda: deque(maxlen=_LATENCY_SAMPLES)
+        )
+
+    def route(self, llm_request: LlmRequest) -> str:
+        """Sets `llm_request.model` to the chosen tier's model."""
+        tier = classify_turn(llm_request, self.max_words)
+        llm_request.model = self.models[tier]
+        return tier
+
+    def record(self, tier: str, latency: float) -> None:
+        """Records the observed model latency of a routed call."""
+        with self._lock:
+            self._calls[tier] += 1
+            self._latencies[tier].append(latency)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Returns call count, traffic share and recent latency per tier."""
+        with self._lock:
+            calls = dict(self._calls)
+            latencies = {t: sorted(v) for t, v in self._latencies.items()}
+        total = sum(calls.values())
+        report = {}
+        for tier in (FAST, CAPABLE):
+            values = latencies.get(tier, [])
+            report[tier] = {
+                "model": self.models[tier],
+                "calls": calls.get(tier, 0),
+                "share": calls.get(tier, 0) / total if total else 0.0,
+                "avg_latency_secs": sum(values) / len(values) if values else 0.0,
+                "p95_latency_secs": (
+                    values[min(len(values) - 1, int(len(values) * 0.95))]
+                    if values
+                    else 0.0
+                ),
+            }
+        return report
+
+    def reset(self) -> None:
+        """Clears the collected statistics."""
+        with self._lock:
+            self._calls.clear()
+            self._latencies.clear()
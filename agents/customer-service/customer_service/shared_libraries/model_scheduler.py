@@ -0,0 +1,249 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Schedules model calls of all sessions onto one shared request quota.
+
+Every model call takes a token from a bucket refilled at
+`requests_per_minute` and holding up to `burst` tokens. While tokens are
+left, calls go straight through. Once the quota is exhausted, calls queue
+per priority class and are released by weighted fair queuing: each class
+gets a share of the quota proportional to its weight, so a burst of HR FAQ
+chats cannot starve interview scheduling, and the FAQ chats still move.
+
+A call's class comes from the agent making it (a specialist's tools tell
+what it is about to do) or, for the router, from the intent words of the
+user's message. Admission control keeps the queue bounded:
+
+* at `max_queue_depth`, a new call displaces the newest queued call of a
+  lower-weight class, or is shed itself when there is none;
+* a call that waits longer than its class's `max_wait_secs` is shed.
+
+A shed call is answered with `BUSY_MESSAGE` instead of reaching the model.
+`stats()` reports queueing delay, admissions and sheds per class.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import re
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from google.adk.models import LlmRequest
+
+from ..config import Config, ModelSchedulerModel
+from .model_router import _latest_user_text
+
+logger = logging.getLogger(__name__)
+
+BUSY_MESSAGE = (
+    "We're handling a lot of requests right now. Please ask again in a"
+    " minute."
+)
+_DELAY_SAMPLES = 1024
+_WORD_RE = re.compile(r"[a-z]+")
+
+
+class _Waiter:
+    __slots__ = ("cls", "future", "enqueued", "removed")
+
+    def __init__(self, cls: str, future: asyncio.Future, enqueued: float):
+        self.cls = cls
+        self.future = future
+        self.enqueued = enqueued
+        self.removed = False
+
+
+class _ClassStats:
+    __slots__ = ("admitted", "queued", "shed", "delays")
+
+    def __init__(self):
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.delays: Deque[float] = deque(maxlen=_DELAY_SAMPLES)
+
+
+class ModelScheduler:
+    """Token bucket quota with weighted fair queuing across classes."""
+
+    def __init__(
+        self,
+        settings: Optional[ModelSchedulerModel] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.settings = settings or Config().model_scheduler_settings
+        self._clock = clock
+        self._rate = self.settings.requests_per_minute / 60
+        self._tokens = float(self.settings.burst)
+        self._refilled = clock()
+        self._heap: List[Tuple[float, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._queued = 0
+        # Virtual time: the finish tag of the last released call.
+        self._virtual = 0.0
+        self._finish: Dict[str, float] = {}
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._stats: Dict[str, _ClassStats] = defaultdict(_ClassStats)
+
+    def classify(self, agent_name: str, llm_request: LlmRequest) -> str:
+        """Returns the priority class of a model call."""
+        cls = self.settings.agent_classes.get(agent_name)
+        if cls:
+            return cls
+        text = _latest_user_text(llm_request.contents or [])
+        if text:
+            words = _WORD_RE.findall(text.lower())
+            matched = [
+                cls
+                for cls, keywords in self.settings.intent_keywords.items()
+                if any(w.startswith(k) for w in words for k in keywords)
+            ]
+            if matched:
+                return max(matched, key=self.weight)
+        return self.settings.default_class
+
+    def weight(self, cls: str) -> float:
+        return self.settings.weights.get(cls, 1.0)
+
+    async def acquire(self, cls: str, timeout: Optional[float] = None) -> bool:
+        """Waits for a quota token; returns False if the call is shed.
+
+        `timeout` further bounds the class's `max_wait_secs`, e.g. to the
+        time left in the turn.
+        """
+        self._refill()
+        if not self._queued and self._tokens >= 1:
+            self._tokens -= 1
+            self._admit(cls, 0.0)
+            return True
+        if self._queued >= self.settings.max_queue_depth:
+            if not self._shed_lower_than(cls):
+                self._stats[cls].shed += 1
+                return False
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(cls, loop.create_future(), self._clock())
+        finish = max(self._virtual, self._finish.get(cls, 0.0))
+        finish += 1 / self.weight(cls)
+        self._finish[cls] = finish
+        heapq.heappush(self._heap, (finish, next(self._seq), waiter))
+        self._queued += 1
+        self._stats[cls].queued += 1
+        self._schedule(loop)
+        max_wait = self.settings.max_wait_secs.get(
+            cls, self.settings.default_max_wait_secs
+        )
+        if timeout is not None:
+            max_wait = min(max_wait, timeout)
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(waiter.future), max_wait
+            )
+        except asyncio.TimeoutError:
+            if waiter.future.done():
+                return waiter.future.result()
+            self._remove(waiter)
+            logger.info("Shed %s model call after %.1fs", cls, max_wait)
+            return False
+        except asyncio.CancelledError:
+            if not waiter.future.done():
+                self._remove(waiter, shed=False)
+            raise
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns admissions, sheds and queueing delay per class."""
+        report = {}
+        for cls, stats in sorted(self._stats.items()):
+            delays = sorted(stats.delays)
+            pick = lambda q: delays[min(len(delays) - 1, int(len(delays) * q))]
+            report[cls] = {
+                "weight": self.weight(cls),
+                "admitted": stats.admitted,
+                "queued": stats.queued,
+                "shed": stats.shed,
+                "waiting": sum(
+                    1
+                    for _, _, w in self._heap
+                    if w.cls == cls and not w.removed
+                ),
+                "delay_p50_ms": round(pick(0.5) * 1000, 1) if delays else 0.0,
+                "delay_p95_ms": round(pick(0.95) * 1000, 1) if delays else 0.0,
+                "delay_max_ms": round(delays[-1] * 1000, 1) if delays else 0.0,
+            }
+        return report
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            float(self.settings.burst),
+            self._tokens + (now - self._refilled) * self._rate,
+        )
+        self._refilled = now
+
+    def _admit(self, cls: str, delay: float) -> None:
+        stats = self._stats[cls]
+        stats.admitted += 1
+        stats.delays.append(delay)
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._wakeup is not None or not self._queued:
+            return
+        delay = max(0.0, (1 - self._tokens) / self._rate)
+        self._wakeup = loop.call_later(delay, self._release, loop)
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Hands the available tokens to the queued calls with least tags."""
+        self._wakeup = None
+        self._refill()
+        while self._heap and self._tokens >= 1:
+            finish, _, waiter = heapq.heappop(self._heap)
+            if waiter.removed:
+                continue
+            waiter.removed = True
+            self._queued -= 1
+            self._virtual = finish
+            self._tokens -= 1
+            self._admit(waiter.cls, self._clock() - waiter.enqueued)
+            waiter.future.set_result(True)
+        if not self._queued:
+            self._heap.clear()
+            self._finish.clear()
+        self._schedule(loop)
+
+    def _remove(self, waiter: _Waiter, shed: bool = True) -> None:
+        waiter.removed = True
+        self._queued -= 1
+        if shed:
+            self._stats[waiter.cls].shed += 1
+        if not waiter.future.done():
+            waiter.future.set_result(False)
+
+    def _shed_lower_than(self, cls: str) -> bool:
+        """Sheds the newest queued call of the lowest class below `cls`."""
+        candidates = [
+            (self.weight(w.cls), -finish, w)
+            for finish, _, w in self._heap
+            if not w.removed and self.weight(w.cls) < self.weight(cls)
+        ]
+        if not candidates:
+            return False
+        victim = min(candidates, key=lambda c: c[:2])[2]
+        self._remove(victim)
+        logger.info("Shed queued %s model call for a %s call", victim.cls, cls)
+        return True
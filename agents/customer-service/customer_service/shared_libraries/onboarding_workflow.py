@@ -0,0 +1,456 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Runs onboarding as a DAG of provisioning steps in the background.
+
+Each step (account creation, system access, benefits, orientation) is an
+async provisioner with declared dependencies. Steps whose dependencies are
+done run concurrently; failures are retried with exponential backoff. The
+state of every workflow is persisted after each step transition, so
+`start_onboarding` returns immediately, status can be polled, and unfinished
+workflows resume after a restart.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from ..config import Config
+from ..entities.customer import Employee, canonical_status
+from .storage import EmployeeStore, get_store
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# provisioner(employee_id, role, start_date)
+Provisioner = Callable[[str, str, str], Awaitable[None]]
+
+
+class Step(NamedTuple):
+    """One provisioning step and the steps it waits for."""
+
+    name: str
+    provisioner: Provisioner
+    depends_on: Tuple[str, ...] = ()
+
+
+def simulated_provisioner(
+    seconds: float, failure_rate: float = 0.0
+) -> Provisioner:
+    """Returns a local stand-in provisioner that sleeps and sometimes fails."""
+
+    async def provision(employee_id: str, role: str, start_date: str) -> None:
+        await asyncio.sleep(seconds)
+        if random.random() < failure_rate:
+            raise RuntimeError("provisioning backend unavailable")
+
+    return provision
+
+
+# Onboarding flag set on the employee record when a step completes.
+STEP_FLAGS = {
+    "grant_system_access": "system_access_granted",
+    "enroll_benefits": "benefits_package",
+    "schedule_orientation": "orientation_scheduled",
+}
+
+
+def default_steps() -> List[Step]:
+    """The onboarding DAG with local stand-ins for the real backends."""
+    return [
+        Step("create_accounts", simulated_provisioner(1.0)),
+        Step(
+            "grant_system_access",
+            simulated_provisioner(2.0),
+            ("create_accounts",),
+        ),
+        Step("enroll_benefits", simulated_provisioner(1.5)),
+        Step(
+            "schedule_orientation",
+            simulated_provisioner(0.5),
+            ("create_accounts",),
+        ),
+    ]
+
+
+def validate_dag(steps: List[Step]) -> None:
+    """Raises ValueError on unknown dependencies or cycles."""
+    names = {s.name for s in steps}
+    deps = {s.name: set(s.depends_on) for s in steps}
+    for name, required in deps.items():
+        unknown = required - names
+        if unknown:
+            raise ValueError(
+                f"Step {name} depends on unknown steps {sorted(unknown)}"
+            )
+    resolved: set = set()
+    while len(resolved) < len(deps):
+        ready = {
+            n for n, d in deps.items() if n not in resolved and d <= resolved
+        }
+        if not ready:
+            raise ValueError("Onboarding steps contain a dependency cycle")
+        resolved |= ready
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS onboarding_workflows (
+    workflow_id TEXT PRIMARY KEY,
+    employee_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    status TEXT NOT NULL,
+    steps TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class WorkflowStore:
+    """Persists workflow and per-step state in SQLite."""
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=60
+        )
+        self._conn.execute(_SCHEMA)
+
+    def create(
+        self,
+        employee_id: str,
+        role: str,
+        start_date: str,
+        step_names: List[str],
+    ) -> str:
+        workflow_id = uuid.uuid4().hex
+        steps = {
+            n: {"state": PENDING, "attempts": 0, "error": None}
+            for n in step_names
+        }
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO onboarding_workflows "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    workflow_id,
+                    employee_id,
+                    role,
+                    start_date,
+                    PENDING,
+                    json.dumps(steps),
+                    now,
+                    now,
+                ),
+            )
+        return workflow_id
+
+    def save(self, workflow_id: str, status: str, steps: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE onboarding_workflows SET status = ?, steps = ?, "
+                "updated_at = ? WHERE workflow_id = ?",
+                (status, json.dumps(steps), time.time(), workflow_id),
+            )
+
+    def get(self, workflow_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT workflow_id, employee_id, role, start_date, status, "
+                "steps, created_at, updated_at FROM onboarding_workflows "
+                "WHERE workflow_id = ?",
+                (workflow_id,),
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def latest_for(self, employee_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT workflow_id, employee_id, role, start_date, status, "
+                "steps, created_at, updated_at FROM onboarding_workflows "
+                "WHERE employee_id = ? ORDER BY created_at DESC LIMIT 1",
+                (employee_id,),
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def unfinished(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT workflow_id FROM onboarding_workflows "
+                "WHERE status IN (?, ?)",
+                (PENDING, RUNNING),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        keys = (
+            "workflow_id",
+            "employee_id",
+            "role",
+            "start_date",
+            "status",
+            "steps",
+            "created_at",
+            "updated_at",
+        )
+        record = dict(zip(keys, row))
+        record["steps"] = json.loads(record["steps"])
+        return record
+
+
+class OnboardingEngine:
+    """Executes onboarding workflows on a background event loop.
+
+    `start` persists a new workflow and returns its id right away; the DAG
+    runs on the engine's own loop thread, so callers (sync tools, async
+    callbacks) never block on provisioning.
+    """
+
+    def __init__(
+        self,
+        workflows: WorkflowStore,
+        employees: Optional[EmployeeStore] = None,
+        steps: Optional[List[Step]] = None,
+        max_attempts: int = 3,
+        backoff_base_secs: float = 0.5,
+        backoff_max_secs: float = 8.0,
+        step_timeout_secs: float = 30.0,
+    ):
+        self.steps = steps if steps is not None else default_steps()
+        validate_dag(self.steps)
+        self.workflows = workflows
+        self._employees = employees
+        self.max_attempts = max_attempts
+        self.backoff_base_secs = backoff_base_secs
+        self.backoff_max_secs = backoff_max_secs
+        self.step_timeout_secs = step_timeout_secs
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._futures: Dict[str, "asyncio.Future"] = {}
+
+    @property
+    def employees(self) -> EmployeeStore:
+        return self._employees or get_store()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="onboarding-workflows",
+                    daemon=True,
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def start(self, employee_id: str, role: str, start_date: str) -> str:
+        """Persists a workflow, schedules it and returns its id.
+
+        Raises:
+            ValueError: If the employee does not exist or is not hired.
+        """
+        employee = self.employees.get(employee_id)
+        if employee is None:
+            raise ValueError(f"Employee {employee_id} not found.")
+        if canonical_status(employee.status) != "Hired":
+            raise ValueError("Employee must be hired before onboarding.")
+        workflow_id = self.workflows.create(
+            employee.employee_id,
+            role,
+            start_date,
+            [s.name for s in self.steps],
+        )
+        self._submit(workflow_id)
+        return workflow_id
+
+    def resume_unfinished(self) -> List[str]:
+        """Reschedules workflows left pending or running by a previous run."""
+        workflow_ids = [
+            w for w in self.workflows.unfinished() if w not in self._futures
+        ]
+        for workflow_id in workflow_ids:
+            self._submit(workflow_id)
+        return workflow_ids
+
+    def _submit(self, workflow_id: str) -> None:
+        self._futures[workflow_id] = asyncio.run_coroutine_threadsafe(
+            self.run(workflow_id), self._ensure_loop()
+        )
+
+    def wait(self, workflow_id: str, timeout: Optional[float] = None) -> Dict:
+        """Blocks until a scheduled workflow finishes; returns its record."""
+        future = self._futures.get(workflow_id)
+        if future is not None:
+            future.result(timeout)
+        return self.workflows.get(workflow_id)
+
+    def status(self, workflow_id: str) -> Optional[Dict]:
+        """Returns the persisted record of a workflow."""
+        return self.workflows.get(workflow_id)
+
+    async def run(self, workflow_id: str) -> str:
+        """Runs a workflow to completion, skipping steps already done."""
+        record = self.workflows.get(workflow_id)
+        steps = record["steps"]
+        for state in steps.values():
+            if state["state"] == RUNNING:
+                state["state"] = PENDING  # interrupted by a restart
+        self.workflows.save(workflow_id, RUNNING, steps)
+        by_name = {s.name: s for s in self.steps}
+        running: Dict[str, asyncio.Task] = {}
+
+        while True:
+            for step in self.steps:
+                state = steps[step.name]
+                if state["state"] != PENDING:
+                    continue
+                dep_states = {steps[d]["state"] for d in step.depends_on}
+                if dep_states & {FAILED, SKIPPED}:
+                    state["state"] = SKIPPED
+                    self.workflows.save(workflow_id, RUNNING, steps)
+                elif dep_states <= {DONE}:
+                    state["state"] = RUNNING
+                    self.workflows.save(workflow_id, RUNNING, steps)
+                    running[step.name] = asyncio.create_task(
+                        self._run_step(step, record, state)
+                    )
+            if not running:
+                break
+            finished, _ = await asyncio.wait(
+                running.values(), return_when=asyncio.FIRST_COMPLETED
+            )
+            for name in [n for n, t in running.items() if t in finished]:
+                running.pop(name)
+                self.workflows.save(workflow_id, RUNNING, steps)
+                self._apply_step(record, by_name[name], steps[name])
+
+        status = (
+            DONE if all(s["state"] == DONE for s in steps.values()) else FAILED
+        )
+        self.workflows.save(workflow_id, status, steps)
+        if status == DONE:
+            self._complete(record)
+        logger.info(
+            "Onboarding %s for %s: %s",
+            workflow_id,
+            record["employee_id"],
+            status,
+        )
+        return status
+
+    async def _run_step(self, step: Step, record: Dict, state: Dict) -> None:
+        while True:
+            state["attempts"] += 1
+            try:
+                await asyncio.wait_for(
+                    step.provisioner(
+                        record["employee_id"],
+                        record["role"],
+                        record["start_date"],
+                    ),
+                    self.step_timeout_secs,
+                )
+                state["state"], state["error"] = DONE, None
+                return
+            except Exception as e:  # provisioners may raise anything
+                state["error"] = f"{type(e).__name__}: {e}"
+                if state["attempts"] >= self.max_attempts:
+                    state["state"] = FAILED
+                    logger.warning(
+                        "Step %s failed for %s: %s",
+                        step.name,
+                        record["employee_id"],
+                        state["error"],
+                    )
+                    return
+                delay = min(
+                    self.backoff_max_secs,
+                    self.backoff_base_secs * 2 ** (state["attempts"] - 1),
+                )
+                # Full jitter keeps retries of many workflows from aligning.
+                await asyncio.sleep(random.uniform(0, delay))
+
+    def _apply_step(self, record: Dict, step: Step, state: Dict) -> None:
+        flag = STEP_FLAGS.get(step.name)
+        if flag is None or state["state"] != DONE:
+            return
+
+        def set_flag(employee: Employee) -> bool:
+            employee.begin_onboarding(record["start_date"])
+            setattr(employee.onboarding, flag, True)
+            return True
+
+        # Tools write the same employee from other threads meanwhile.
+        self.employees.update(record["employee_id"], set_flag)
+
+    def _complete(self, record: Dict) -> None:
+        def onboard(employee: Employee) -> bool:
+            try:
+                employee.onboard_employee(record["start_date"])
+            except ValueError:
+                logger.warning(
+                    "Not onboarding %s: status changed to %s",
+                    employee.employee_id,
+                    employee.status,
+                )
+                return False
+            return True
+
+        self.employees.update(record["employee_id"], onboard)
+
+
+_engine: Optional[OnboardingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_onboarding_engine() -> OnboardingEngine:
+    """Returns the process-wide engine, resuming unfinished workflows."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                configs = Config()
+                settings = configs.onboarding_settings
+                engine = OnboardingEngine(
+                    WorkflowStore(configs.storage_settings.path),
+                    max_attempts=settings.max_attempts,
+                    backoff_base_secs=settings.backoff_base_secs,
+                    backoff_max_secs=settings.backoff_max_secs,
+                    step_timeout_secs=settings.step_timeout_secs,
+                )
+                engine.resume_unfinished()
+                _engine = engine
+    return _engine
+
+
+def set_onboarding_engine(engine: Optional[OnboardingEngine]) -> None:
+    """Replaces the process-wide engine (used by tests)."""
+    global _engine
+    with _engine_lock:
+        _engine = engine
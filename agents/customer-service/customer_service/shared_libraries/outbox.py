@@ -0,0 +1,453 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Notification outbox: tools enqueue, a background worker delivers.
+
+Tools write a notification row into SQLite and return; they never talk to
+SMTP. `OutboxWorker` claims due rows in batches, delivers them concurrently
+over a small pool of reused SMTP connections, and retries failures with
+backoff. A unique dedup key per notification makes repeated tool calls and
+re-delivered batches send each email once.
+"""
+
+import asyncio
+import hashlib
+import logging
+import queue
+import smtplib
+import sqlite3
+import threading
+import time
+from email.message import EmailMessage
+from typing import Dict, List, NamedTuple, Optional
+
+from ..config import Config
+from .storage import get_store
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedup_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    error TEXT
+)
+"""
+_INDEX = """
+CREATE INDEX IF NOT EXISTS notifications_due
+ON notifications (status, next_attempt_at)
+"""
+
+
+class Notification(NamedTuple):
+    """A claimed notification ready for delivery."""
+
+    id: int
+    dedup_key: str
+    kind: str
+    recipient: str
+    subject: str
+    body: str
+    attempts: int
+
+
+class Outbox:
+    """Durable notification queue in SQLite."""
+
+    def __init__(self, path: str = ":memory:", lease_secs: float = 60.0):
+        self.lease_secs = lease_secs
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=60
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_INDEX)
+
+    def enqueue(
+        self,
+        kind: str,
+        recipient: str,
+        subject: str,
+        body: str,
+        dedup_key: str,
+    ) -> bool:
+        """Queues a notification; returns False if `dedup_key` was seen."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO notifications (dedup_key, kind, "
+                "recipient, subject, body, status, next_attempt_at, "
+                "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (dedup_key, kind, recipient, subject, body, PENDING, now, now),
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, limit: int) -> List[Notification]:
+        """Leases up to `limit` due notifications to the caller.
+
+        Claimed rows stay pending but are not due again until the lease
+        expires, so a worker that dies mid-batch has them re-delivered.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, dedup_key, kind, recipient, subject, body, "
+                    "attempts FROM notifications WHERE status = ? AND "
+                    "next_attempt_at <= ? ORDER BY next_attempt_at, id "
+                    "LIMIT ?",
+                    (PENDING, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE notifications SET next_attempt_at = ? "
+                    "WHERE id = ?",
+                    [(now + self.lease_secs, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [Notification(*row) for row in rows]
+
+    def mark_sent(self, ids: List[int]) -> None:
+        """Marks delivered notifications in one transaction."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE notifications SET status = ?, sent_at = ?, "
+                    "attempts = attempts + 1, error = NULL WHERE id = ?",
+                    [(SENT, now, i) for i in ids],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def mark_failed(
+        self, notification_id: int, error: str, retry_at: Optional[float]
+    ) -> None:
+        """Records a failed attempt; gives up when `retry_at` is None."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE notifications SET status = ?, attempts = attempts + 1, "
+                "error = ?, next_attempt_at = ? WHERE id = ?",
+                (
+                    PENDING if retry_at is not None else FAILED,
+                    error,
+                    retry_at if retry_at is not None else time.time(),
+                    notification_id,
+                ),
+            )
+
+    def depth(self) -> int:
+        """Returns the number of notifications waiting for delivery."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM notifications WHERE status = ?",
+                (PENDING,),
+            ).fetchone()[0]
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of notifications per status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM notifications GROUP BY status"
+            ).fetchall()
+        return {PENDING: 0, SENT: 0, FAILED: 0, **dict(rows)}
+
+
+class SmtpPool:
+    """A fixed-size pool of reusable SMTP connections."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        size: int = 4,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = False,
+        timeout: float = 10.0,
+    ):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle: "queue.Queue[Optional[smtplib.SMTP]]" = queue.Queue()
+        for _ in range(size):
+            self._idle.put(None)  # connected lazily
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password or "")
+        self.connections_opened += 1
+        return smtp
+
+    def send(self, message: EmailMessage) -> None:
+        """Sends one message on a pooled connection (blocking)."""
+        smtp = self._idle.get()
+        try:
+            if smtp is None:
+                smtp = self._connect()
+            try:
+                smtp.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                smtp = self._connect()
+                smtp.send_message(message)
+        except Exception:
+            if smtp is not None:
+                try:
+                    smtp.close()
+                finally:
+                    smtp = None
+            raise
+        finally:
+            self._idle.put(smtp)
+
+    def close(self) -> None:
+        """Closes every idle connection."""
+        for _ in range(self.size):
+            smtp = self._idle.get()
+            if smtp is not None:
+                try:
+                    smtp.quit()
+                except smtplib.SMTPException:
+                    smtp.close()
+            self._idle.put(None)
+
+
+class OutboxWorker:
+    """Delivers outbox notifications in batches over an `SmtpPool`."""
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        pool: SmtpPool,
+        sender: str,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        backoff_base_secs: float = 2.0,
+        backoff_max_secs: float = 300.0,
+        poll_interval_secs: float = 0.5,
+    ):
+        self.outbox = outbox
+        self.pool = pool
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base_secs = backoff_base_secs
+        self.backoff_max_secs = backoff_max_secs
+        self.poll_interval_secs = poll_interval_secs
+        self.delivered = 0
+        self._busy_secs = 0.0
+        self._stop: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _message(self, notification: Notification) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = notification.recipient
+        message["Subject"] = notification.subject
+        # A stable Message-ID lets receivers drop duplicate deliveries too.
+        digest = hashlib.sha1(notification.dedup_key.encode()).hexdigest()
+        message["Message-ID"] = f"<{digest}@onboarding>"
+        message.set_content(notification.body)
+        return message
+
+    async def _deliver(self, notification: Notification) -> bool:
+        try:
+            await asyncio.to_thread(
+                self.pool.send, self._message(notification)
+            )
+            return True
+        except (smtplib.SMTPException, OSError) as e:
+            attempts = notification.attempts + 1
+            retry_at = None
+            if attempts < self.max_attempts:
+                retry_at = time.time() + min(
+                    self.backoff_max_secs,
+                    self.backoff_base_secs * 2 ** (attempts - 1),
+                )
+            logger.warning(
+                "Notification %s attempt %i failed: %s",
+                notification.dedup_key,
+                attempts,
+                e,
+            )
+            self.outbox.mark_failed(
+                notification.id, f"{type(e).__name__}: {e}", retry_at
+            )
+            return False
+
+    async def run_once(self) -> int:
+        """Delivers one batch of due notifications; returns how many sent."""
+        batch = self.outbox.claim(self.batch_size)
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._deliver(n) for n in batch))
+        sent = [n.id for n, ok in zip(batch, results) if ok]
+        if sent:
+            self.outbox.mark_sent(sent)
+        self.delivered += len(sent)
+        self._busy_secs += time.perf_counter() - started
+        return len(sent)
+
+    async def run(self) -> None:
+        """Delivers until `stop` is called, idling when nothing is due.
+
+        A batch that fails outside delivery (e.g. the database is locked) is
+        logged and retried after a growing delay; its leased rows come due
+        again when the lease expires.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        errors = 0
+        while not self._stop.is_set():
+            delay = 0.0
+            try:
+                if await self.run_once() == 0:
+                    delay = self.poll_interval_secs
+                errors = 0
+            except Exception:
+                errors += 1
+                delay = min(
+                    self.backoff_max_secs,
+                    self.poll_interval_secs * 2 ** (errors - 1),
+                )
+                logger.exception(
+                    "Outbox batch failed; retrying in %.1fs", delay
+                )
+            if delay:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        self.pool.close()
+
+    def stop(self) -> None:
+        """Asks `run` to return after the current batch.
+
+        Safe to call from any thread: the event is set on the worker's loop.
+        """
+        if self._stop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        except RuntimeError:
+            pass  # run has already returned and its loop is closed
+
+    def stats(self) -> Dict[str, float]:
+        """Returns queue depth, status counts and delivery throughput."""
+        return {
+            "queue_depth": self.outbox.depth(),
+            **self.outbox.counts(),
+            "delivered": self.delivered,
+            "smtp_connections_opened": self.pool.connections_opened,
+            "delivered_per_sec": (
+                self.delivered / self._busy_secs if self._busy_secs else 0.0
+            ),
+        }
+
+
+_outbox: Optional[Outbox] = None
+_worker: Optional[OutboxWorker] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    """Returns the process-wide outbox, starting its worker if enabled."""
+    global _outbox, _worker
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                configs = Config()
+                settings = configs.notification_settings
+                outbox = Outbox(configs.storage_settings.path)
+                if settings.deliver:
+                    _worker = OutboxWorker(
+                        outbox,
+                        SmtpPool(
+                            settings.smtp_host,
+                            settings.smtp_port,
+                            size=settings.pool_size,
+                            username=settings.smtp_username,
+                            password=settings.smtp_password,
+                            starttls=settings.starttls,
+                        ),
+                        settings.sender,
+                        batch_size=settings.batch_size,
+                        max_attempts=settings.max_attempts,
+                    )
+                    threading.Thread(
+                        target=asyncio.run,
+                        args=(_worker.run(),),
+                        name="notification-outbox",
+                        daemon=True,
+                    ).start()
+                _outbox = outbox
+    return _outbox
+
+
+def set_outbox(outbox: Optional[Outbox]) -> None:
+    """Replaces the process-wide outbox (used by tests)."""
+    global _outbox
+    with _outbox_lock:
+        _outbox = outbox
+
+
+def get_worker() -> Optional[OutboxWorker]:
+    """Returns the background worker, if delivery is enabled."""
+    return _worker
+
+
+def notify(
+    kind: str, candidate_id: str, subject: str, body: str, dedup_key: str
+) -> bool:
+    """Queues an email to a candidate; returns False if nothing was queued.
+
+    Candidates without an email on record are skipped, as are dedup keys
+    that were already queued.
+    """
+    employee = get_store().get(candidate_id)
+    if employee is None or not employee.email:
+        logger.debug("No email for %s, skipping %s", candidate_id, kind)
+        return False
+    return get_outbox().enqueue(
+        kind, employee.email, subject, body, f"{kind}:{dedup_key}"
+    )
@@ -0,0 +1,167 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide cache of parsed and serialized employee profiles.
+
+Session start needs the profile as JSON for the session state; loading it
+means a storage read, a parse and a re-serialization. The cache keeps both
+forms per employee, tagged with the storage write version:
+
+* writes made in this process reach the cache through a store listener,
+  which drops the entry of exactly the employee written;
+* writes from other processes (batch jobs) bump the row version, which is
+  compared on every lookup with an indexed read that skips the JSON.
+
+Entries are evicted least recently used once their total size exceeds
+`max_bytes`. An entry is sized as its two JSON forms, which tracks the
+parsed object's footprint closely enough for a budget.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from ..config import Config
+from ..entities.customer import Employee
+from .storage import EmployeeStore, get_store, normalize_id
+
+logger = logging.getLogger(__name__)
+
+
+class CachedProfile(NamedTuple):
+    """A cached employee: parsed, serialized, and the version they match.
+
+    `employee` is shared by every reader; copy it before mutating.
+    """
+
+    employee: Employee
+    json: str
+    version: int
+    size: int
+
+
+class ProfileCache:
+    """Versioned LRU cache of employee profiles, bounded by bytes."""
+
+    def __init__(self, store: EmployeeStore, max_bytes: int = 16 * 1024**2):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, CachedProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+        self._hit_secs = 0.0
+        self._miss_secs = 0.0
+        store.add_listener(self.invalidate)
+
+    def get(self, employee_id: str) -> Optional[CachedProfile]:
+        """Returns the current profile, reloading it if missing or stale."""
+        started = time.perf_counter()
+        key = normalize_id(employee_id)
+        version = self.store.get_version(key)
+        if version is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                self._hit_secs += time.perf_counter() - started
+                return entry
+        record = self.store.get_record(key)
+        if record is None:
+            return None
+        version, data = record
+        employee = Employee.model_validate_json(data)
+        serialized = employee.to_json()
+        entry = CachedProfile(
+            employee, serialized, version, len(data) + len(serialized)
+        )
+        with self._lock:
+            self._misses += 1
+            self._miss_secs += time.perf_counter() - started
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.size
+            if entry.size <= self.max_bytes:
+                self._entries[key] = entry
+                self.bytes += entry.size
+                while self.bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.bytes -= evicted.size
+                    self._evictions += 1
+        return entry
+
+    def invalidate(self, employee: Employee) -> None:
+        """Drops the entry of an employee that was just written."""
+        with self._lock:
+            entry = self._entries.pop(normalize_id(employee.employee_id), None)
+            if entry is not None:
+                self.bytes -= entry.size
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Returns hit rate, evictions and the lookup time saved by hits."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            avg_hit = self._hit_secs / self._hits if self._hits else 0.0
+            avg_miss = self._miss_secs / self._misses if self._misses else 0.0
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "evictions": self._evictions,
+                "avg_hit_ms": round(avg_hit * 1000, 4),
+                "avg_miss_ms": round(avg_miss * 1000, 4),
+                # Every hit would otherwise have cost an average miss.
+                "saved_ms": round(
+                    self._hits * max(avg_miss - avg_hit, 0.0) * 1000, 2
+                ),
+            }
+
+
+_cache: Optional[ProfileCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> ProfileCache:
+    """Returns the process-wide cache over the process-wide store."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ProfileCache(
+                    get_store(), Config().profile_cache_settings.max_bytes
+                )
+    return _cache
+
+
+def set_profile_cache(cache: Optional[ProfileCache]) -> None:
+    """Replaces the process-wide cache (used by tests)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
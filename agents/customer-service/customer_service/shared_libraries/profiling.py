@@ -0,0 +1,355 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""On-demand profiling of single sessions, single tools or sampled traffic.
+
+Profiling is switched on with `profiling_settings` in `Config`. With
+`enabled` off, `instrument` leaves the callback pipeline untouched, so the
+disabled path costs nothing. With it on, a run is profiled when:
+
+* its session id is listed in `sessions`, or the session state carries
+  `profiling: true` (set it from a test harness or an admin tool),
+* the tool being called is listed in `tools`, or
+* it falls in the `sample_rate` fraction of invocations.
+
+A session run covers one agent turn, a tool run one tool call. Each run
+writes its reports to `<directory>/<session id>/`:
+
+    <stamp>-<label>.prof         cProfile stats (`mode: cprofile`)
+    <stamp>-<label>.folded       collapsed stacks (`mode: sampling`)
+    <stamp>-<label>.txt          top functions, human readable
+    <stamp>-<label>.alloc.txt    tracemalloc top-N diff (`tracemalloc: true`)
+
+`.prof` files open in snakeviz or `python -m pstats`; `.folded` files feed
+flamegraph.pl or speedscope.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import Config, ProfilingModel
+
+logger = logging.getLogger(__name__)
+
+PROFILING_STATE_KEY = "profiling"
+_ABANDONED_RUN_SECS = 600
+
+# Only one cProfile profiler can be active per thread, and every session
+# shares the event loop thread, so cProfile runs never overlap.
+_cprofile_lock = threading.Lock()
+# tracemalloc is process wide; it runs while any run needs it.
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+class _Sampler(threading.Thread):
+    """Samples the stack of one thread at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval_secs: float):
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval_secs = interval_secs
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval_secs):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} "
+                    f"({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class ProfileRun:
+    """One profiled turn or tool call."""
+
+    def __init__(self, settings: ProfilingModel, session_id: str, label: str):
+        self.settings = settings
+        self.session_id = session_id
+        self.label = label
+        self.started = time.time()
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[_Sampler] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def start(self) -> bool:
+        """Starts profiling; returns False when another cProfile run is on."""
+        if self.settings.mode == "sampling":
+            self._sampler = _Sampler(
+                threading.get_ident(), self.settings.sampling_interval_secs
+            )
+            self._sampler.start()
+        else:
+            if not _cprofile_lock.acquire(blocking=False):
+                logger.debug("Skipping %s: cProfile already active", self.label)
+                return False
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        if self.settings.tracemalloc:
+            _start_tracemalloc()
+            self._snapshot = tracemalloc.take_snapshot()
+        return True
+
+    def stop(self) -> List[str]:
+        """Stops profiling and writes the reports; returns their paths."""
+        elapsed = time.time() - self.started
+        if self._profiler is not None:
+            self._profiler.disable()
+            _cprofile_lock.release()
+        if self._sampler is not None:
+            self._sampler.stop()
+        allocations = None
+        if self._snapshot is not None:
+            allocations = tracemalloc.take_snapshot().compare_to(
+                self._snapshot, "lineno"
+            )
+            _stop_tracemalloc()
+
+        directory = os.path.join(
+            output_directory(self.settings),
+            self.session_id.replace(os.sep, "_"),
+        )
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(self.started))
+        millis = int(self.started * 1000) % 1000
+        prefix = os.path.join(directory, f"{stamp}.{millis:03d}-{self.label}")
+        top_n = self.settings.top_n
+        paths = []
+        summary = io.StringIO()
+        summary.write(
+            f"session {self.session_id} {self.label}: "
+            f"{elapsed * 1000:.1f} ms\n\n"
+        )
+        if self._profiler is not None:
+            self._profiler.dump_stats(f"{prefix}.prof")
+            paths.append(f"{prefix}.prof")
+            stats = pstats.Stats(self._profiler, stream=summary)
+            stats.sort_stats("cumulative").print_stats(top_n)
+        if self._sampler is not None:
+            with open(f"{prefix}.folded", "w", encoding="utf-8") as f:
+                for stack, count in self._sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(f"{prefix}.folded")
+            leaves: Counter = Counter()
+            for stack, count in self._sampler.stacks.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            total = sum(leaves.values()) or 1
+            summary.write(f"{total} samples, top frames:\n")
+            for frame, count in leaves.most_common(top_n):
+                summary.write(f"{count / total:7.1%}  {frame}\n")
+        with open(f"{prefix}.txt", "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        paths.append(f"{prefix}.txt")
+        if allocations is not None:
+            with open(f"{prefix}.alloc.txt", "w", encoding="utf-8") as f:
+                for stat in allocations[:top_n]:
+                    f.write(f"{stat}\n")
+            paths.append(f"{prefix}.alloc.txt")
+        logger.info("Profiled %s %s -> %s", self.session_id, self.label, prefix)
+        return paths
+
+
+def output_directory(settings: ProfilingModel) -> str:
+    return settings.directory or os.path.join(
+        tempfile.gettempdir(), "customer_service_profiles"
+    )
+
+
+class Profiling:
+    """Decides which runs to profile and tracks the ones in flight."""
+
+    def __init__(self, settings: ProfilingModel):
+        self.settings = settings
+        self._sessions = frozenset(settings.sessions)
+        self._tools = frozenset(settings.tools)
+        self._runs: Dict[Any, ProfileRun] = {}
+        # Sampling is decided once per invocation so a sampled turn also
+        # profiles its tools.
+        self._sampled: Dict[str, bool] = {}
+
+    def _wanted(self, context: Any) -> bool:
+        if context.session.id in self._sessions:
+            return True
+        if context.state.get(PROFILING_STATE_KEY):
+            return True
+        if self.settings.sample_rate <= 0:
+            return False
+        invocation_id = context.invocation_id
+        if invocation_id not in self._sampled:
+            if len(self._sampled) > 10000:
+                self._sampled.clear()
+            self._sampled[invocation_id] = (
+                random.random() < self.settings.sample_rate
+            )
+        return self._sampled[invocation_id]
+
+    def _start(self, key: Any, context: Any, label: str) -> None:
+        if key in self._runs:
+            return
+        # Turns that end without an after-agent callback (errors, ended
+        # invocations) are closed once they are clearly abandoned.
+        cutoff = time.time() - _ABANDONED_RUN_SECS
+        for stale in [k for k, r in self._runs.items() if r.started < cutoff]:
+            self._stop(stale)
+        run = ProfileRun(self.settings, context.session.id, label)
+        if run.start():
+            self._runs[key] = run
+
+    def _stop(self, key: Any) -> None:
+        run = self._runs.pop(key, None)
+        if run is not None:
+            try:
+                run.stop()
+            except OSError:
+                logger.exception("Failed to write profile for %s", run.label)
+
+    def before_agent(self, callback_context: Any) -> None:
+        """Starts a turn profile for the first agent of a wanted invocation."""
+        if self._wanted(callback_context):
+            self._start(
+                callback_context.invocation_id,
+                callback_context,
+                f"turn-{callback_context.agent_name}",
+            )
+        return None
+
+    def after_agent(self, callback_context: Any) -> None:
+        """Ends the turn profile.
+
+        After a transfer only the agent that finishes the invocation gets an
+        after-agent callback, so the first one seen ends the turn.
+        """
+        self._stop(callback_context.invocation_id)
+        self._sampled.pop(callback_context.invocation_id, None)
+        return None
+
+    def before_tool(
+        self, tool: Any, args: Dict[str, Any], tool_context: Any
+    ) -> None:
+        """Starts a tool profile unless the whole turn is already profiled."""
+        if tool.name in self._tools or (
+            tool_context.invocation_id not in self._runs
+            and self._wanted(tool_context)
+        ):
+            self._start(
+                (tool_context.invocation_id, tool.name),
+                tool_context,
+                f"tool-{tool.name}",
+            )
+        return None
+
+    def after_tool(
+        self,
+        tool: Any,
+        args: Dict[str, Any],
+        tool_context: Any,
+        tool_response: Any,
+    ) -> None:
+        self._stop((tool_context.invocation_id, tool.name))
+        return None
+
+    def on_tool_error(
+        self,
+        tool: Any,
+        args: Dict[str, Any],
+        tool_context: Any,
+        error: Exception,
+    ) -> None:
+        self._stop((tool_context.invocation_id, tool.name))
+        return None
+
+
+def _as_list(callback: Any) -> List[Callable]:
+    if callback is None:
+        return []
+    return list(callback) if isinstance(callback, list) else [callback]
+
+
+def instrument(
+    callbacks: Dict[str, Any], settings: Optional[ProfilingModel] = None
+) -> Dict[str, Any]:
+    """Adds the profiling hooks to an agent callback dict when enabled.
+
+    Start hooks run after the existing callbacks and stop hooks before them,
+    so profiles measure the agent and tool work rather than the bookkeeping
+    around it. The existing callbacks return None before every agent and
+    tool that actually runs (only a tool skipped for a passed turn deadline
+    is answered early), so the added hooks are reached for all real work.
+    """
+    settings = settings or Config().profiling_settings
+    if not settings.enabled:
+        return callbacks
+    profiling = Profiling(settings)
+    instrumented = dict(callbacks)
+    instrumented["before_agent_callback"] = _as_list(
+        callbacks.get("before_agent_callback")
+    ) + [profiling.before_agent]
+    instrumented["after_agent_callback"] = [profiling.after_agent] + _as_list(
+        callbacks.get("after_agent_callback")
+    )
+    instrumented["before_tool_callback"] = _as_list(
+        callbacks.get("before_tool_callback")
+    ) + [profiling.before_tool]
+    instrumented["after_tool_callback"] = [profiling.after_tool] + _as_list(
+        callbacks.get("after_tool_callback")
+    )
+    instrumented["on_tool_error_callback"] = [
+        profiling.on_tool_error
+    ] + _as_list(callbacks.get("on_tool_error_callback"))
+    logger.info(
+        "Profiling enabled (%s) for sessions=%s tools=%s sample_rate=%s",
+        settings.mode,
+        settings.sessions,
+        settings.tools,
+        settings.sample_rate,
+    )
+    return instrumented
@@ -0,0 +1,105 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Assembles agent instructions from templates and the registered tools."""
+
+import functools
+import inspect
+import string
+from typing import Callable, Dict, NamedTuple, Sequence, Tuple
+
+from .history import estimate_tokens
+
+_SECTION_PREFIX = "## "
+
+
+def tool_signature(tool: Callable) -> str:
+    """Renders a tool as `name(arg: type, ...)` from its real signature."""
+    params = []
+    for name, param in inspect.signature(tool).parameters.items():
+        if name == "tool_context":
+            continue  # injected by ADK, never supplied by the model
+        annotation = param.annotation
+        if annotation is inspect.Parameter.empty:
+            params.append(name)
+        else:
+            type_name = getattr(annotation, "__name__", str(annotation))
+            params.append(f"{name}: {type_name}")
+    return f"{tool.__name__}({', '.join(params)})"
+
+
+def tool_summary(tool: Callable) -> str:
+    """Returns the first line of a tool's docstring."""
+    doc = inspect.getdoc(tool) or ""
+    return doc.strip().splitlines()[0] if doc.strip() else ""
+
+
+def render_tool_section(tools: Sequence[Callable]) -> str:
+    """Renders one bullet per tool with its signature and summary."""
+    lines = []
+    for tool in tools:
+        summary = tool_summary(tool)
+        line = f"* `{tool_signature(tool)}`"
+        lines.append(f"{line}: {summary}" if summary else line)
+    return "\n".join(lines)
+
+
+class AssembledPrompt(NamedTuple):
+    """A rendered instruction with its per-section token accounting."""
+
+    name: str
+    text: str
+    section_tokens: Dict[str, int]
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.section_tokens.values())
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(template: str) -> string.Template:
+    return string.Template(template)
+
+
+def count_sections(text: str) -> Dict[str, int]:
+    """Estimates tokens per `## ` section; leading text counts as "preamble"."""
+    counts: Dict[str, int] = {}
+    title, lines = "preamble", []
+    for line in text.splitlines():
+        if line.startswith(_SECTION_PREFIX):
+            tokens = estimate_tokens("\n".join(lines))
+            counts[title] = counts.get(title, 0) + tokens
+            title, lines = line[len(_SECTION_PREFIX) :].strip(), []
+        lines.append(line)
+    counts[title] = counts.get(title, 0) + estimate_tokens("\n".join(lines))
+    return counts
+
+
+@functools.lru_cache(maxsize=None)
+def _assemble(
+    name: str, template: str, tools: Tuple[Callable, ...]
+) -> AssembledPrompt:
+    text = _compile(template).substitute(tools=render_tool_section(tools))
+    return AssembledPrompt(name, text, count_sections(text))
+
+
+def assemble(
+    name: str, template: str, tools: Sequence[Callable] = ()
+) -> AssembledPrompt:
+    """Renders `template`, filling `$tools` from the tools' signatures.
+
+    Templates are compiled once and each (template, tools) rendering is
+    cached, so agents and benchmarks can call this freely.
+    """
+    return _assemble(name, template, tuple(tools))
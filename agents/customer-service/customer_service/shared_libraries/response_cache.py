@@ -0,0 +1,246 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""LRU + TTL cache of model responses for repeated, tool-free turns."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases and strips punctuation so "Hi!" and "hi," share a key."""
+    return " ".join(_NON_WORD_RE.sub(" ", text.lower()).split())
+
+
+def _instruction_text(llm_request: LlmRequest) -> str:
+    config = llm_request.config
+    instruction = config.system_instruction if config else None
+    if instruction is None:
+        return ""
+    if isinstance(instruction, str):
+        return instruction
+    if isinstance(instruction, types.Content):
+        return "".join(p.text or "" for p in instruction.parts or [])
+    return str(instruction)
+
+
+def _tool_names(llm_request: LlmRequest) -> list:
+    if llm_request.tools_dict:
+        return sorted(llm_request.tools_dict)
+    names = []
+    config = llm_request.config
+    for tool in (config.tools if config else None) or []:
+        for declaration in getattr(tool, "function_declarations", None) or []:
+            names.append(declaration.name)
+    return sorted(names)
+
+
+def has_tool_parts(content: types.Content) -> bool:
+    """Returns True if the content carries a function call or response."""
+    return any(
+        p.function_call or p.function_response for p in content.parts or []
+    )
+
+
+class _Entry(NamedTuple):
+    response: LlmResponse
+    created: float
+    latency: float
+
+
+class ResponseCache:
+    """Caches model responses keyed on a canonical hash of the request.
+
+    The key covers the model, the system instruction, the tool set and the
+    normalized text of the last `history_window` contents. Turns whose window
+    contains function calls or responses bypass the cache, since their answer
+    depends on live tool output. Entries expire after `ttl_seconds` and the
+    least recently used entry is evicted past `max_entries`. With `disk_path`
+    set, entries are also written there as JSON and survive restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        history_window: int = 2,
+        disk_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.history_window = history_window
+        self.disk_path = disk_path
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.latency_saved = 0.0
+
+    def key(self, llm_request: LlmRequest) -> Optional[str]:
+        """Returns the cache key, or None if the request must bypass."""
+        window = llm_request.contents[-self.history_window :]
+        if not window or any(has_tool_parts(c) for c in window):
+            return None
+        payload = {
+            "model": llm_request.model,
+            "instruction": _instruction_text(llm_request),
+            "tools": _tool_names(llm_request),
+            "history": [
+                [
+                    c.role,
+                    normalize_text(
+                        " ".join(p.text or "" for p in c.parts or [])
+                    ),
+                ]
+                for c in window
+            ],
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def lookup(
+        self, llm_request: LlmRequest
+    ) -> Tuple[Optional[str], Optional[LlmResponse]]:
+        """Returns the request's key and cached response, if any.
+
+        The key is None when the request bypasses the cache.
+        """
+        key = self.key(llm_request)
+        if key is None:
+            with self._lock:
+                self.bypasses += 1
+            return None, None
+        return key, self.get(key)
+
+    def get(self, key: str) -> Optional[LlmResponse]:
+        """Returns a fresh cached response and records the hit or miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is not None and now - entry.created > self.ttl_seconds:
+            self._forget(key)
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.latency_saved += entry.latency
+        return entry.response.model_copy(deep=True)
+
+    def put(self, key: str, response: LlmResponse, latency: float) -> None:
+        """Stores a response along with the model latency it took."""
+        entry = _Entry(response.model_copy(deep=True), time.time(), latency)
+        self._remember(key, entry)
+        if self.disk_path:
+            record = {
+                "created": entry.created,
+                "latency": entry.latency,
+                "response": json.loads(
+                    response.model_dump_json(exclude_none=True)
+                ),
+            }
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp, self._path(key))
+
+    def stats(self) -> Dict[str, float]:
+        """Returns hit/miss/bypass counters, hit rate and latency saved."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "entries": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "latency_saved_secs": round(self.latency_saved, 3),
+            }
+
+    def clear(self) -> None:
+        """Drops all in-memory entries and counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.bypasses = 0
+            self.latency_saved = 0.0
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk_path:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_path, f"{key}.json")
+
+    def _load(self, key: str) -> Optional[_Entry]:
+        if not self.disk_path:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                record = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return _Entry(
+            LlmResponse.model_validate(record["response"]),
+            record["created"],
+            record["latency"],
+        )
+
+
+def is_cacheable(llm_response: LlmResponse) -> bool:
+    """Only complete, error-free, text-only responses are cached."""
+    content = llm_response.content
+    return bool(
+        content
+        and content.parts
+        and not llm_response.partial
+        and not llm_response.error_code
+        and not has_tool_parts(content)
+        and any(p.text for p in content.parts)
+    )
@@ -0,0 +1,208 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-memory trigram index for fuzzy employee lookup."""
+
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+
+from ..entities.customer import Employee
+from .storage import EmployeeStore, employee_role, get_store, normalize_id
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Splits text into padded word trigrams ("jon" -> "  j", " jo", ...)."""
+    grams = set()
+    for token in _TOKEN_RE.findall(text.lower()):
+        padded = f"  {token} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class EmployeeMatch(NamedTuple):
+    """A ranked search result."""
+
+    employee_id: str
+    name: str
+    email: str
+    role: str
+    status: str
+    score: float
+
+
+class TrigramIndex:
+    """Trigram index over employee name, email and role.
+
+    Results are ranked by the share of query trigrams found in the employee
+    (containment), with the Dice coefficient as a tie-breaker so that
+    shorter, closer records win. Candidates are generated with prefix
+    filtering: an employee that reaches `min_score` must contain at least one
+    of the query's rarest `len(q) - ceil(min_score * len(q)) + 1` trigrams,
+    so the frequent trigrams ("  j", "er ") never have their posting lists
+    walked. Matches scoring below `relative_cutoff` times the best match are
+    dropped, which lets a strong hit skip the expensive low-threshold passes.
+    """
+
+    def __init__(self, min_score: float = 0.3, relative_cutoff: float = 0.6):
+        self.min_score = min_score
+        self.relative_cutoff = relative_cutoff
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._grams: Dict[str, FrozenSet[str]] = {}
+        self._docs: Dict[str, EmployeeMatch] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, employee: Employee) -> None:
+        """Indexes an employee, replacing any previous version of it."""
+        name = f"{employee.first_name} {employee.last_name}".strip()
+        role = employee_role(employee)
+        doc = EmployeeMatch(
+            employee_id=normalize_id(employee.employee_id),
+            name=name,
+            email=employee.email,
+            role=role,
+            status=employee.status,
+            score=0.0,
+        )
+        grams = trigrams(f"{name} {employee.email} {role}")
+        with self._lock:
+            old = self._grams.get(doc.employee_id)
+            if old != grams:
+                if old is not None:
+                    self._unlink(doc.employee_id, old - grams)
+                for gram in grams if old is None else grams - old:
+                    self._postings[gram].add(doc.employee_id)
+                self._grams[doc.employee_id] = grams
+            self._docs[doc.employee_id] = doc
+
+    def add_many(self, employees: Iterable[Employee]) -> None:
+        """Indexes several employees."""
+        for employee in employees:
+            self.add(employee)
+
+    def remove(self, employee_id: str) -> None:
+        """Drops an employee from the index."""
+        employee_id = normalize_id(employee_id)
+        with self._lock:
+            grams = self._grams.pop(employee_id, None)
+            self._docs.pop(employee_id, None)
+            if grams:
+                self._unlink(employee_id, grams)
+
+    def _unlink(self, employee_id: str, grams: Iterable[str]) -> None:
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(employee_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def search(
+        self, query: str, limit: int = 5, min_score: Optional[float] = None
+    ) -> List[EmployeeMatch]:
+        """Returns up to `limit` employees ranked by similarity to `query`."""
+        query_grams = trigrams(query)
+        if not query_grams or limit <= 0:
+            return []
+        min_score = self.min_score if min_score is None else min_score
+        with self._lock:
+            by_rarity = sorted(
+                (len(self._postings.get(g, ())), g) for g in query_grams
+            )
+            # Strong matches only need the few rarest trigrams to be found.
+            # If they already fill `limit`, nothing below that threshold can
+            # outrank them, so the weaker (and far more expensive) passes
+            # are skipped.
+            best, floor, previous = [], min_score, None
+            for threshold in self._thresholds(min_score):
+                threshold = max(threshold, floor)
+                if previous is not None and threshold >= previous:
+                    break
+                best = self._search_above(
+                    query_grams, by_rarity, threshold, limit
+                )
+                if len(best) >= limit:
+                    break
+                if best:
+                    floor = max(floor, best[0][0] * self.relative_cutoff)
+                previous = threshold
+            return [
+                self._docs[employee_id]._replace(score=round(containment, 3))
+                for containment, _, employee_id in best
+            ]
+
+    @staticmethod
+    def _thresholds(min_score: float) -> List[float]:
+        return [t for t in (0.9, 0.7, 0.5) if t > min_score] + [min_score]
+
+    def _search_above(self, query_grams, by_rarity, threshold, limit):
+        min_overlap = max(1, math.ceil(threshold * len(query_grams)))
+        prefix = len(query_grams) - min_overlap + 1
+        candidates = set()
+        for size, gram in by_rarity[:prefix]:
+            if size:
+                candidates.update(self._postings[gram])
+
+        scored = []
+        for employee_id in candidates:
+            grams = self._grams[employee_id]
+            overlap = len(query_grams & grams)
+            if overlap < min_overlap:
+                continue
+            containment = overlap / len(query_grams)
+            dice = 2 * overlap / (len(query_grams) + len(grams))
+            scored.append((containment, dice, employee_id))
+        return heapq.nlargest(limit, scored)
+
+
+_index: Optional[TrigramIndex] = None
+# The store `_index` listens to, so a reset can unsubscribe it.
+_index_store: Optional[EmployeeStore] = None
+_index_lock = threading.Lock()
+
+
+def build_index(store: EmployeeStore) -> TrigramIndex:
+    """Builds an index from the roster and keeps it in sync with writes."""
+    index = TrigramIndex()
+    store.add_listener(index.add)
+    index.add_many(store.iter_employees())
+    return index
+
+
+def get_employee_index() -> TrigramIndex:
+    """Returns the process-wide index over the default employee store."""
+    global _index, _index_store
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index_store = get_store()
+                _index = build_index(_index_store)
+    return _index
+
+
+def reset_employee_index() -> None:
+    """Forgets the process-wide index so it is rebuilt on next use."""
+    global _index, _index_store
+    with _index_lock:
+        if _index is not None and _index_store is not None:
+            _index_store.remove_listener(_index.add)
+        _index, _index_store = None, None
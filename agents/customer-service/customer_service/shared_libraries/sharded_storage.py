@@ -0,0 +1,529 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Employee roster split over several SQLite files by a hash of the id.
+
+A SQLite file takes one writer at a time, so with a single roster file every
+`evaluate_interview`, `update_employee_status` and `start_onboarding` of a
+busy hiring day waits on the same lock. `ShardedEmployeeStore` spreads the
+employees over N `EmployeeStore` files by a jump consistent hash of the
+normalized id, behind the same interface, so tools, caches and jobs use it
+unchanged:
+
+* reads and writes of one employee go to its shard only, and writes to
+  different shards run in parallel;
+* roster-wide queries (`count`, `status_counts`, `iter_employees`,
+  `id_ranges`, ...) scatter to every shard and gather the results, merged
+  in id order.
+
+Shard 0 is the storage file itself, so an unsharded roster is a one-shard
+layout and `reshard` takes it to N shards. Shard i > 0 lives next to it,
+e.g. `roster.shard3.db`. The layout is recorded in the storage file.
+
+`reshard` changes N while the store keeps serving. Jump hashing moves only
+the employees whose shard changes (1 - N/M of them when growing from N to
+M). Meanwhile reads and writes route by the new layout and fall back to the
+old shard for employees not moved yet, and a write to such an employee
+moves it first, keeping its version. Moves copy before they delete, so an
+employee is never missing. Other processes notice a new layout within
+`layout_refresh_secs`; `reshard` waits twice that before moving anything.
+"""
+
+import contextlib
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from operator import attrgetter, itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from ..config import Config, StorageModel
+from ..entities.customer import Employee
+from .storage import EmployeeListener, EmployeeStore, normalize_id
+
+logger = logging.getLogger(__name__)
+
+Layout = Tuple[int, Optional[int]]
+
+_LAYOUT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS employee_layout (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    shards INTEGER NOT NULL,
+    target INTEGER
+)
+"""
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """Jump consistent hash (Lamping & Veach) of a 64-bit key."""
+    bucket, jump = -1, 0
+    while jump < buckets:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_of(employee_id: str, shards: int) -> int:
+    """Returns the shard of an employee in a layout of `shards` shards."""
+    digest = hashlib.blake2b(
+        normalize_id(employee_id).encode(), digest_size=8
+    ).digest()
+    return jump_hash(int.from_bytes(digest, "big"), shards)
+
+
+def shard_path(path: str, index: int) -> str:
+    """Returns the file of shard `index`; shard 0 is `path` itself."""
+    if index == 0 or path == ":memory:":
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{index}{ext}"
+
+
+def read_layout(path: str) -> Optional[Layout]:
+    """Returns the recorded (shards, target) of a roster, if any."""
+    if path == ":memory:" or not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path, timeout=60)
+    try:
+        rows = conn.execute(
+            "SELECT shards, target FROM employee_layout"
+        ).fetchall()
+        return rows[0] if rows else None
+    except sqlite3.OperationalError:  # no table: never sharded
+        return None
+    finally:
+        conn.close()
+
+
+def _unique(items: Iterable[Any], key: Callable[[Any], str]) -> Iterator[Any]:
+    """Drops repeats of an id from id-ordered items.
+
+    An employee being moved is briefly in two shards.
+    """
+    last = None
+    for item in items:
+        item_id = key(item)
+        if item_id != last:
+            yield item
+        last = item_id
+
+
+class ShardedEmployeeStore:
+    """An `EmployeeStore` split over shard files by employee id."""
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        shards: int = 1,
+        settings: Optional[StorageModel] = None,
+    ):
+        self.path = path
+        self.settings = settings or Config().storage_settings
+        self._stores: Dict[int, EmployeeStore] = {}
+        self._stores_lock = threading.Lock()
+        self._listeners: List[EmployeeListener] = []
+        # Serializes moves against roster-wide counts, which would see a
+        # moving employee twice.
+        self._move_lock = threading.Lock()
+        self._reshard_lock = threading.Lock()
+        # Reads and writes register under the layout epoch they route by,
+        # so a reshard can wait for those still using the old layout.
+        self._gate = threading.Condition()
+        self._epoch = 0
+        self._active: Dict[int, int] = defaultdict(int)
+        self._meta: Optional[sqlite3.Connection] = None
+        # Every thread shares the layout connection; a write while another
+        # thread's read is open on it fails at once with "locked".
+        self._meta_lock = threading.Lock()
+        if path != ":memory:":
+            self._meta = sqlite3.connect(
+                path, check_same_thread=False, isolation_level=None, timeout=60
+            )
+            self._meta.execute("PRAGMA journal_mode=WAL")
+            self._meta.execute(_LAYOUT_SCHEMA)
+        self._shards, self._target = 1, None
+        self._checked = time.monotonic()
+        layout = self._read_layout()
+        if layout is not None:
+            self._shards, self._target = layout
+        elif shards > 1:
+            if self._shard(0).count():
+                logger.warning(
+                    "%s holds an unsharded roster; run jobs.reshard to split"
+                    " it into %i shards",
+                    path,
+                    shards,
+                )
+            else:
+                self._shards = shards
+            self._save_layout()
+
+    @property
+    def shards(self) -> int:
+        """The number of shards, or the target while resharding."""
+        return self._target or self._shards
+
+    @property
+    def layout(self) -> Layout:
+        return self._shards, self._target
+
+    def add_listener(self, listener: EmployeeListener) -> None:
+        """Registers a callable invoked after each employee write."""
+        self._listeners.append(listener)
+        for store in list(self._stores.values()):
+            store.add_listener(listener)
+
+    def remove_listener(self, listener: EmployeeListener) -> None:
+        """Unregisters a listener added with `add_listener`, if present."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+        for store in list(self._stores.values()):
+            store.remove_listener(listener)
+
+    def get(self, employee_id: str) -> Optional[Employee]:
+        """Loads a single employee, or None if it does not exist."""
+        return self._read(employee_id, EmployeeStore.get)
+
+    def get_record(self, employee_id: str) -> Optional[Tuple[int, str]]:
+        """Returns the write version and raw JSON of an employee."""
+        return self._read(employee_id, EmployeeStore.get_record)
+
+    def get_version(self, employee_id: str) -> Optional[int]:
+        """Returns the write version of an employee without parsing it."""
+        return self._read(employee_id, EmployeeStore.get_version)
+
+    def put(self, employee: Employee) -> None:
+        """Inserts or replaces one employee."""
+        self.put_many([employee])
+
+    def put_many(self, employees: Iterable[Employee]) -> int:
+        """Writes employees, in one transaction per shard.
+
+        Returns:
+            int: The number of employees written.
+        """
+        employees = list(employees)
+        with self._routing():
+            groups: Dict[int, List[Employee]] = defaultdict(list)
+            moves: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+            for employee in employees:
+                employee.employee_id = normalize_id(employee.employee_id)
+                owner, previous = self._route(employee.employee_id)
+                groups[owner].append(employee)
+                if previous is not None:
+                    moves[previous, owner].append(employee.employee_id)
+            for (source, dest), employee_ids in moves.items():
+                self._move(employee_ids, source, dest)
+            for index, group in groups.items():
+                self._shard(index).put_many(group)
+        return len(employees)
+
+    def put_if_version(self, employee: Employee, version: int) -> bool:
+        """Replaces an employee only if it is still at `version`."""
+        employee.employee_id = normalize_id(employee.employee_id)
+        with self._routing():
+            owner, previous = self._route(employee.employee_id)
+            if previous is not None:
+                # Moving keeps the version, so the check still holds.
+                self._move([employee.employee_id], previous, owner)
+            return self._shard(owner).put_if_version(employee, version)
+
+    # The same reload-and-retry loop, over the routed reads and writes.
+    update = EmployeeStore.update
+
+    def iter_employees(
+        self,
+        status: Optional[str] = None,
+        role: Optional[str] = None,
+        page_size: int = 500,
+    ) -> Iterator[Employee]:
+        """Yields employees ordered by id, merged from every shard."""
+        return _unique(
+            heapq.merge(
+                *(
+                    s.iter_employees(status, role, page_size)
+                    for s in self._all_stores()
+                ),
+                key=attrgetter("employee_id"),
+            ),
+            attrgetter("employee_id"),
+        )
+
+    def iter_records(
+        self,
+        status: Optional[str] = None,
+        role: Optional[str] = None,
+        page_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """Like `iter_employees`, but yields plain dicts without validation."""
+        return _unique(
+            heapq.merge(
+                *(
+                    s.iter_records(status, role, page_size)
+                    for s in self._all_stores()
+                ),
+                key=itemgetter("employee_id"),
+            ),
+            itemgetter("employee_id"),
+        )
+
+    def iter_ids(self, page_size: int = 1000) -> Iterator[str]:
+        """Yields every employee id in order, merged from every shard."""
+        return _unique(
+            heapq.merge(*(s.iter_ids(page_size) for s in self._all_stores())),
+            str,
+        )
+
+    def id_ranges(self, chunk_size: int) -> List[Tuple[str, str]]:
+        """Splits the roster into inclusive (first_id, last_id) chunks."""
+        ids = self.iter_ids()
+        ranges = []
+        while True:
+            chunk = list(itertools.islice(ids, chunk_size))
+            if not chunk:
+                return ranges
+            ranges.append((chunk[0], chunk[-1]))
+
+    def get_range(self, first_id: str, last_id: str) -> List[Employee]:
+        """Loads the employees with ids in [first_id, last_id]."""
+        return list(
+            _unique(
+                heapq.merge(
+                    *(
+                        s.get_range(first_id, last_id)
+                        for s in self._all_stores()
+                    ),
+                    key=attrgetter("employee_id"),
+                ),
+                attrgetter("employee_id"),
+            )
+        )
+
+    def count(self) -> int:
+        """Returns the number of stored employees, summed over shards."""
+        with self._move_lock:
+            return sum(s.count() for s in self._all_stores())
+
+    def status_counts(self) -> Dict[str, int]:
+        """Returns the number of employees per status, over all shards."""
+        totals: Counter = Counter()
+        with self._move_lock:
+            for store in self._all_stores():
+                totals.update(store.status_counts())
+        return dict(totals)
+
+    def shard_counts(self) -> List[int]:
+        """Returns the number of employees in each shard."""
+        with self._move_lock:
+            return [s.count() for s in self._all_stores()]
+
+    def reshard(self, shards: int, batch_size: int = 500) -> Dict[str, Any]:
+        """Moves employees to a layout of `shards` shards while serving.
+
+        Resumes an interrupted reshard to the same number of shards.
+
+        Returns:
+            Dict[str, Any]: The old and new shard counts, the number of
+                employees moved and the elapsed seconds.
+
+        Raises:
+            ValueError: If `shards` is below 1, or another reshard to a
+                different number of shards is under way.
+        """
+        if shards < 1:
+            raise ValueError(f"Cannot reshard to {shards} shards")
+        with self._reshard_lock:
+            started = time.perf_counter()
+            self._refresh(force=True)
+            if self._target is not None and self._target != shards:
+                raise ValueError(
+                    f"{self.path} is being resharded to {self._target} shards"
+                )
+            old = self._shards
+            if self._target is None and shards == old:
+                return {"from": old, "to": shards, "moved": 0}
+            with self._gate:
+                self._target = shards
+                self._epoch += 1
+                self._save_layout()
+                epoch = self._epoch
+                self._gate.wait_for(
+                    lambda: all(e >= epoch for e in self._active)
+                )
+            if self._meta is not None:
+                time.sleep(2 * self.settings.layout_refresh_secs)
+            moved = sum(
+                self._migrate(index, shards, batch_size)
+                for index in range(old)
+            )
+            with self._gate:
+                self._shards, self._target = shards, None
+                self._epoch += 1
+                self._save_layout()
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Resharded %s from %i to %i shards: moved %i employees in"
+                " %.1fs",
+                self.path,
+                old,
+                shards,
+                moved,
+                elapsed,
+            )
+            return {
+                "from": old,
+                "to": shards,
+                "moved": moved,
+                "elapsed_secs": round(elapsed, 3),
+            }
+
+    def close(self) -> None:
+        """Closes every shard and the layout connection."""
+        with self._stores_lock:
+            for store in self._stores.values():
+                store.close()
+            self._stores.clear()
+        if self._meta is not None:
+            with self._meta_lock:
+                self._meta.close()
+
+    def _route(self, employee_id: str) -> Tuple[int, Optional[int]]:
+        """Returns an employee's shard and, while resharding, its old one."""
+        if self._target is None:
+            return shard_of(employee_id, self._shards), None
+        owner = shard_of(employee_id, self._target)
+        previous = shard_of(employee_id, self._shards)
+        return owner, previous if previous != owner else None
+
+    def _read(
+        self, employee_id: str, method: Callable[[EmployeeStore, str], Any]
+    ) -> Any:
+        employee_id = normalize_id(employee_id)
+        with self._routing():
+            owner, previous = self._route(employee_id)
+            found = method(self._shard(owner), employee_id)
+            if found is None and previous is not None:
+                found = method(self._shard(previous), employee_id)
+                if found is None:
+                    # Moved between the two reads: now in its new shard.
+                    found = method(self._shard(owner), employee_id)
+        return found
+
+    def _move(self, employee_ids: List[str], source: int, dest: int) -> int:
+        """Copies employees to `dest`, then deletes them from `source`."""
+        with self._move_lock:
+            rows = self._shard(source).get_rows(employee_ids)
+            if rows:
+                self._shard(dest).insert_rows(rows)
+                self._shard(source).delete_many([row[0] for row in rows])
+        return len(rows)
+
+    def _migrate(self, index: int, shards: int, batch_size: int) -> int:
+        """Moves the employees of shard `index` that `shards` puts elsewhere."""
+        ids = self._shard(index).iter_ids(batch_size)
+        moved = 0
+        while True:
+            batch = list(itertools.islice(ids, batch_size))
+            if not batch:
+                return moved
+            moves: Dict[int, List[str]] = defaultdict(list)
+            for employee_id in batch:
+                dest = shard_of(employee_id, shards)
+                if dest != index:
+                    moves[dest].append(employee_id)
+            for dest, employee_ids in moves.items():
+                moved += self._move(employee_ids, index, dest)
+
+    def _shard(self, index: int) -> EmployeeStore:
+        store = self._stores.get(index)
+        if store is None:
+            with self._stores_lock:
+                store = self._stores.get(index)
+                if store is None:
+                    store = EmployeeStore(shard_path(self.path, index))
+                    for listener in self._listeners:
+                        store.add_listener(listener)
+                    self._stores[index] = store
+        return store
+
+    def _all_stores(self) -> List[EmployeeStore]:
+        self._refresh()
+        return [
+            self._shard(i) for i in range(max(self._shards, self.shards))
+        ]
+
+    @contextlib.contextmanager
+    def _routing(self) -> Iterator[None]:
+        self._refresh()
+        with self._gate:
+            epoch = self._epoch
+            self._active[epoch] += 1
+        try:
+            yield
+        finally:
+            with self._gate:
+                self._active[epoch] -= 1
+                if not self._active[epoch]:
+                    del self._active[epoch]
+                    self._gate.notify_all()
+
+    def _refresh(self, force: bool = False) -> None:
+        """Picks up a layout written by another process."""
+        if self._meta is None:
+            return
+        now = time.monotonic()
+        interval = self.settings.layout_refresh_secs
+        if not force and now - self._checked < interval:
+            return
+        self._checked = now
+        layout = self._read_layout()
+        if layout is not None and layout != self.layout:
+            with self._gate:
+                self._shards, self._target = layout
+                self._epoch += 1
+
+    def _read_layout(self) -> Optional[Layout]:
+        if self._meta is None:
+            return None
+        with self._meta_lock:
+            rows = self._meta.execute(
+                "SELECT shards, target FROM employee_layout"
+            ).fetchall()
+        return rows[0] if rows else None
+
+    def _save_layout(self) -> None:
+        if self._meta is None:
+            return
+        with self._meta_lock:
+            self._meta.execute(
+                "INSERT INTO employee_layout (id, shards, target) "
+                "VALUES (0, ?, ?) ON CONFLICT(id) DO UPDATE SET "
+                "shards = excluded.shards, target = excluded.target",
+                (self._shards, self._target),
+            )
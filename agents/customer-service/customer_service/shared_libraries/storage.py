@@ -0,0 +1,449 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""SQLite-backed employee roster used by the onboarding tools."""
+
+import json
+import logging
+import sqlite3
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from ..config import Config
+from ..entities.customer import Employee, canonical_status
+
+logger = logging.getLogger(__name__)
+
+EmployeeListener = Callable[[Employee], None]
+# change(employee) -> whether it modified the employee and needs a write.
+EmployeeChange = Callable[[Employee], bool]
+
+
+class VersionConflict(RuntimeError):
+    """Raised when an employee keeps changing under a version-checked write."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS employees (
+    employee_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT '',
+    version INTEGER NOT NULL DEFAULT 1,
+    data TEXT NOT NULL
+)
+"""
+# Stays below SQLite's default limit of host parameters per statement.
+_MAX_PARAMS = 500
+
+
+def normalize_id(employee_id: str) -> str:
+    """Returns the canonical form of an employee / candidate id.
+
+    `before_tool` lowercases every string argument, so ids reach the tools
+    as e.g. "app-2025..." while they are generated as "APP-2025...".
+    """
+    return employee_id.strip().upper()
+
+
+def employee_role(employee: Employee) -> str:
+    """Returns the role of the employee's most recent job application."""
+    if not employee.job_applications:
+        return ""
+    return employee.job_applications[-1].position
+
+
+class EmployeeStore:
+    """Persists `Employee` records as JSON rows in a single SQLite file.
+
+    Listeners registered with `add_listener` are called with every employee
+    written through `put` / `put_many`, which lets derived structures
+    (search indexes, caches) update incrementally instead of rescanning.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.RLock()
+        # Batch jobs write from several processes; wait for the file lock
+        # instead of failing with "database is locked".
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=60
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._listeners: List[EmployeeListener] = []
+
+    def add_listener(self, listener: EmployeeListener) -> None:
+        """Registers a callable invoked after each employee write."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: EmployeeListener) -> None:
+        """Unregisters a listener added with `add_listener`, if present."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def get(self, employee_id: str) -> Optional[Employee]:
+        """Loads a single employee, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM employees WHERE employee_id = ?",
+                (normalize_id(employee_id),),
+            ).fetchone()
+        return Employee.model_validate_json(row[0]) if row else None
+
+    def get_record(self, employee_id: str) -> Optional[Tuple[int, str]]:
+        """Returns the write version and raw JSON of an employee."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT version, data FROM employees WHERE employee_id = ?",
+                (normalize_id(employee_id),),
+            ).fetchone()
+
+    def get_version(self, employee_id: str) -> Optional[int]:
+        """Returns the write version of an employee without parsing it."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM employees WHERE employee_id = ?",
+                (normalize_id(employee_id),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, employee: Employee) -> None:
+        """Inserts or replaces one employee."""
+        self.put_many([employee])
+
+    def put_many(self, employees: Iterable[Employee]) -> int:
+        """Writes employees in a single transaction.
+
+        Returns:
+            int: The number of employees written.
+        """
+        employees = list(employees)
+        for employee in employees:
+            employee.employee_id = normalize_id(employee.employee_id)
+            employee.status = canonical_status(employee.status)
+        rows = [
+            (
+                e.employee_id,
+                e.status,
+                employee_role(e),
+                e.model_dump_json(),
+            )
+            for e in employees
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO employees (employee_id, status, role, data) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(employee_id) DO UPDATE SET "
+                    "status = excluded.status, role = excluded.role, "
+                    "data = excluded.data, version = version + 1",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        for employee in employees:
+            for listener in self._listeners:
+                listener(employee)
+        return len(rows)
+
+    def put_if_version(self, employee: Employee, version: int) -> bool:
+        """Replaces an employee only if it is still at `version`.
+
+        Returns:
+            bool: False if another write got in first (nothing is written).
+        """
+        employee.employee_id = normalize_id(employee.employee_id)
+        employee.status = canonical_status(employee.status)
+        with self._lock:
+            written = self._conn.execute(
+                "UPDATE employees SET status = ?, role = ?, data = ?, "
+                "version = version + 1 "
+                "WHERE employee_id = ? AND version = ?",
+                (
+                    employee.status,
+                    employee_role(employee),
+                    employee.model_dump_json(),
+                    employee.employee_id,
+                    version,
+                ),
+            ).rowcount
+        if written:
+            for listener in self._listeners:
+                listener(employee)
+        return bool(written)
+
+    def update(
+        self, employee_id: str, change: EmployeeChange, attempts: int = 10
+    ) -> Optional[Employee]:
+        """Applies `change` to an employee with a version-checked write.
+
+        Read-modify-write through `get` / `put` loses updates when two
+        writers interleave. Here the write only lands on the version that
+        was read; on a conflict the employee is reloaded and `change` runs
+        again, so it must only depend on the employee it is given.
+
+        Returns:
+            Optional[Employee]: The employee as stored afterwards, or None if
+                it does not exist.
+
+        Raises:
+            VersionConflict: If every attempt lost to another writer.
+        """
+        for _ in range(attempts):
+            record = self.get_record(employee_id)
+            if record is None:
+                return None
+            version, data = record
+            employee = Employee.model_validate_json(data)
+            if not change(employee):
+                return employee
+            if self.put_if_version(employee, version):
+                return employee
+        raise VersionConflict(
+            f"Employee {employee_id} changed during {attempts} attempts"
+        )
+
+    def iter_employees(
+        self,
+        status: Optional[str] = None,
+        role: Optional[str] = None,
+        page_size: int = 500,
+    ) -> Iterator[Employee]:
+        """Yields employees ordered by id, reading `page_size` rows at a time.
+
+        Pages are fetched with keyset pagination, so memory stays bounded by
+        the page size regardless of roster size. `role` matches regardless of
+        case, as tool arguments arrive lowercased.
+        """
+        for data in self._iter_data(status, role, page_size):
+            yield Employee.model_validate_json(data)
+
+    def iter_records(
+        self,
+        status: Optional[str] = None,
+        role: Optional[str] = None,
+        page_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """Like `iter_employees`, but yields plain dicts without validation.
+
+        Bulk readers such as exports only need the raw fields and skip the
+        cost of building pydantic models.
+        """
+        for data in self._iter_data(status, role, page_size):
+            yield json.loads(data)
+
+    def _iter_data(
+        self, status: Optional[str], role: Optional[str], page_size: int
+    ) -> Iterator[str]:
+        clauses, params = ["employee_id > ?"], []
+        if status is not None:
+            clauses.append("status = ? COLLATE NOCASE")
+            params.append(canonical_status(status))
+        if role is not None:
+            clauses.append("role = ? COLLATE NOCASE")
+            params.append(role)
+        query = (
+            f"SELECT employee_id, data FROM employees "
+            f"WHERE {' AND '.join(clauses)} ORDER BY employee_id LIMIT ?"
+        )
+        last_id = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    query, (last_id, *params, page_size)
+                ).fetchall()
+            if not rows:
+                return
+            for _, data in rows:
+                yield data
+            last_id = rows[-1][0]
+
+    def id_ranges(self, chunk_size: int) -> List[Tuple[str, str]]:
+        """Splits the roster into inclusive (first_id, last_id) chunks.
+
+        Boundaries come from index-only seeks, so computing them does not read
+        any employee data.
+        """
+        ranges, last_id = [], ""
+        while True:
+            with self._lock:
+                first = self._conn.execute(
+                    "SELECT employee_id FROM employees WHERE employee_id > ? "
+                    "ORDER BY employee_id LIMIT 1",
+                    (last_id,),
+                ).fetchone()
+                if first is None:
+                    return ranges
+                last = self._conn.execute(
+                    "SELECT employee_id FROM employees WHERE employee_id >= ? "
+                    "ORDER BY employee_id LIMIT 1 OFFSET ?",
+                    (first[0], chunk_size - 1),
+                ).fetchone()
+                if last is None:
+                    last = self._conn.execute(
+                        "SELECT MAX(employee_id) FROM employees"
+                    ).fetchone()
+            ranges.append((first[0], last[0]))
+            last_id = last[0]
+
+    def get_range(self, first_id: str, last_id: str) -> List[Employee]:
+        """Loads the employees with ids in [first_id, last_id]."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM employees "
+                "WHERE employee_id BETWEEN ? AND ? ORDER BY employee_id",
+                (first_id, last_id),
+            ).fetchall()
+        return [Employee.model_validate_json(data) for (data,) in rows]
+
+    def count(self) -> int:
+        """Returns the number of stored employees."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM employees"
+            ).fetchone()[0]
+
+    def status_counts(self) -> Dict[str, int]:
+        """Returns the number of stored employees per status."""
+        with self._lock:
+            return dict(
+                self._conn.execute(
+                    "SELECT status, COUNT(*) FROM employees GROUP BY status"
+                ).fetchall()
+            )
+
+    def iter_ids(self, page_size: int = 1000) -> Iterator[str]:
+        """Yields every employee id in order, from the primary key only."""
+        last_id = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT employee_id FROM employees WHERE employee_id > ? "
+                    "ORDER BY employee_id LIMIT ?",
+                    (last_id, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for (employee_id,) in rows:
+                yield employee_id
+            last_id = rows[-1][0]
+
+    def get_rows(self, employee_ids: List[str]) -> List[Tuple[Any, ...]]:
+        """Returns the raw rows of employees, version included.
+
+        Together with `insert_rows` and `delete_many` this moves employees
+        between stores without parsing them or bumping their version.
+        """
+        rows = []
+        for start in range(0, len(employee_ids), _MAX_PARAMS):
+            chunk = employee_ids[start : start + _MAX_PARAMS]
+            with self._lock:
+                rows += self._conn.execute(
+                    "SELECT employee_id, status, role, version, data "
+                    "FROM employees WHERE employee_id IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+        return rows
+
+    def insert_rows(self, rows: List[Tuple[Any, ...]]) -> None:
+        """Inserts rows from `get_rows`, keeping any row already stored."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO employees "
+                    "(employee_id, status, role, version, data) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(employee_id) DO NOTHING",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_many(self, employee_ids: List[str]) -> None:
+        """Deletes employees in a single transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM employees WHERE employee_id = ?",
+                    [(employee_id,) for employee_id in employee_ids],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        """Closes the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def open_store(path: str, shards: Optional[int] = None) -> EmployeeStore:
+    """Opens the roster at `path`, sharded if it is or should be.
+
+    A roster already split into shards opens with its recorded layout;
+    `shards` (default: `StorageModel.shards`) only applies to a new one.
+
+    Returns:
+        EmployeeStore: A plain store for a one-shard roster, otherwise a
+            `ShardedEmployeeStore` with the same interface.
+    """
+    from .sharded_storage import ShardedEmployeeStore, read_layout
+
+    shards = shards or Config().storage_settings.shards
+    if read_layout(path) in (None, (1, None)) and shards <= 1:
+        return EmployeeStore(path)
+    return ShardedEmployeeStore(path, shards)
+
+
+_store: Optional[EmployeeStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> EmployeeStore:
+    """Returns the process-wide store, creating and seeding it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = open_store(Config().storage_settings.path)
+                if store.count() == 0:
+                    store.put(Employee.get_customer("E001"))
+                logger.debug("Opened employee store at %s", store.path)
+                _store = store
+    return _store
+
+
+def set_store(store: Optional[EmployeeStore]) -> None:
+    """Replaces the process-wide store (used by jobs and tests)."""
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,187 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Concurrent execution of the function calls of one model turn.
+
+ADK starts one task per function call of a model response and merges the
+responses back in call order, but the tools here are synchronous, so each
+call holds the event loop until it returns and the calls of a turn run one
+after another. `parallelize` wraps each tool in a coroutine that runs it on
+a thread pool instead, with:
+
+* per-candidate ordering: calls naming the same candidate (the first
+  argument of `key_args` present) run one at a time, in the order they
+  were issued, so "schedule, then evaluate, then promote C042" stays
+  correct; calls for other candidates, or without one, run alongside;
+* per-call timeouts: a call that outlives `timeout_secs` (or its entry in
+  `timeouts`) answers the model with an error. Python cannot stop the
+  thread, so the call keeps its candidate's place in line until it really
+  returns and a later call for that candidate never overtakes it. The
+  timeout is cut short to the time left in the turn (see `deadlines`), and
+  a call whose turn ran out while it waited for its candidate answers
+  `deadlines.try_again` without running.
+
+Calls take their place in line when their task first runs, before they
+suspend, so the order is the order ADK starts the calls: the order of the
+model response.
+
+Ordering only holds within a turn and an agent: calls from other turns or
+sessions for the same candidate run concurrently. The tools therefore
+write employees with version-checked updates (`EmployeeStore.update`),
+never a plain get -> modify -> put.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import Config, ToolExecutorModel
+from . import deadlines
+from .storage import normalize_id
+
+logger = logging.getLogger(__name__)
+
+
+class ToolExecutor:
+    """Runs synchronous tools on a thread pool, ordered per candidate."""
+
+    def __init__(self, settings: Optional[ToolExecutorModel] = None):
+        self.settings = settings or Config().tool_executor_settings
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.settings.max_workers,
+            thread_name_prefix="tool",
+        )
+        # Per key, the future that completes when its last queued call has
+        # finished; a new call waits on it and takes its place.
+        self._tails: Dict[str, asyncio.Future] = {}
+        # One wrapper per tool, so agents sharing a tool share its object.
+        self._wrapped: Dict[Callable[..., Any], Callable[..., Any]] = {}
+        self._wrapped_lock = threading.Lock()
+        self.timeouts = 0
+
+    def key(self, args: Dict[str, Any]) -> Optional[str]:
+        """Returns the candidate a call targets, if any."""
+        for name in self.settings.key_args:
+            if args.get(name):
+                return normalize_id(str(args[name]))
+        return None
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Returns an async tool with `func`'s name, signature and docs.
+
+        Wrapping the same function again returns the same wrapper.
+        """
+        with self._wrapped_lock:
+            wrapped = self._wrapped.get(func)
+            if wrapped is None:
+
+                @functools.wraps(func)
+                async def wrapped(**kwargs: Any) -> Any:
+                    return await self.call(func, kwargs)
+
+                self._wrapped[func] = wrapped
+            return wrapped
+
+    async def call(self, func: Callable[..., Any], args: Dict[str, Any]) -> Any:
+        """Runs `func(**args)` after earlier calls for the same candidate."""
+        loop = asyncio.get_running_loop()
+        key = self.key(args)
+        done = loop.create_future()
+        previous = None
+        if key is not None:
+            previous = self._tails.get(key)
+            if previous is not None and previous.get_loop() is not loop:
+                previous = None
+            self._tails[key] = done
+        release = functools.partial(self._release, key, done)
+        if previous is not None:
+            try:
+                await asyncio.shield(previous)
+            except asyncio.CancelledError:
+                previous.add_done_callback(release)
+                raise
+        if deadlines.expired():
+            release(None)
+            return deadlines.try_again(func.__name__)
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(
+            self._pool, functools.partial(context.run, func, **args)
+        )
+        future.add_done_callback(release)
+        timeout = deadlines.bounded(
+            self.settings.timeouts.get(
+                func.__name__, self.settings.timeout_secs
+            )
+        )
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(
+                "Tool %s timed out after %.1fs (candidate %s)",
+                func.__name__,
+                timeout,
+                key,
+            )
+            return {
+                "status": "error",
+                "message": (
+                    f"{func.__name__} did not finish within {timeout:g}s."
+                    " It may still complete; check before retrying."
+                ),
+            }
+
+    def _release(self, key: Optional[str], done: asyncio.Future, _) -> None:
+        if not done.done():
+            done.set_result(None)
+        if key is not None and self._tails.get(key) is done:
+            del self._tails[key]
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+
+def parallelize(
+    tools: List[Callable[..., Any]], executor: Optional["ToolExecutor"] = None
+) -> List[Callable[..., Any]]:
+    """Wraps an agent's tools for concurrent execution when enabled."""
+    executor = executor or get_tool_executor()
+    if not executor.settings.enabled:
+        return list(tools)
+    return [executor.wrap(tool) for tool in tools]
+
+
+_executor: Optional[ToolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ToolExecutor:
+    """Returns the process-wide executor, shared by every agent."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ToolExecutor()
+    return _executor
+
+
+def set_tool_executor(executor: Optional[ToolExecutor]) -> None:
+    """Replaces the process-wide executor (used by tests)."""
+    global _executor
+    with _executor_lock:
+        _executor = executor
@@ -4,6 +4,13 @@ import logging
 import uuid
 from datetime import datetime
 
+from ..entities.customer import Address, Employee, JobApplication
+from ..shared_libraries import deadlines, hr_queue
+from ..shared_libraries.onboarding_workflow import get_onboarding_engine
+from ..shared_libraries.outbox import notify
+from ..shared_libraries.search_index import get_employee_index
+from ..shared_libraries.storage import get_store, normalize_id
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,8 +26,19 @@ def schedule_interview(candidate_id: str, date: str, time: str) -> dict:
     Returns:
         dict: A dictionary with interview schedule details.
     """
+    if deadlines.expired():
+        return deadlines.try_again("Scheduling the interview")
+
     logger.info("Scheduling interview for %s on %s at %s", candidate_id, date, time)
 
+    notify(
+        "interview_invite",
+        candidate_id,
+        "Your interview with Cymbal Home & Garden",
+        f"Your interview is scheduled for {date} at {time}.",
+        dedup_key=f"{normalize_id(candidate_id)}:{date}:{time}",
+    )
+
     return {
         "status": "scheduled",
         "candidate_id": candidate_id,
@@ -42,6 +60,9 @@ def evaluate_interview(candidate_id: str, marks: int, feedback: str) -> dict:
     Returns:
         dict: A dictionary with evaluation result.
     """
+    if deadlines.expired():
+        return deadlines.try_again("Recording the evaluation")
+
     logger.info("Evaluating interview for %s with marks: %s", candidate_id, marks)
 
     passed = marks >= 60
@@ -64,52 +85,132 @@ def promote_employee(candidate_id: str) -> dict:
     Returns:
         dict: A dictionary indicating the promotion status.
     """
+    if deadlines.expired():
+        return deadlines.try_again("Promoting the candidate")
+
     logger.info("Promoting candidate %s to next stage", candidate_id)
 
+    next_stage = "final_interview"  # or "onboarding"
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    notify(
+        "promotion",
+        candidate_id,
+        "You are moving to the next stage",
+        "Congratulations, you have been promoted to the final interview stage.",
+        dedup_key=f"{normalize_id(candidate_id)}:{next_stage}:{today}",
+    )
+
     return {
         "status": "promoted",
         "candidate_id": candidate_id,
-        "next_stage": "final_interview"  # or "onboarding"
+        "next_stage": next_stage
     }
 
 
-def start_onboarding(candidate_id: str, role: str) -> dict:
+def start_onboarding(candidate_id: str, role: str, start_date: str = "") -> dict:
     """
     Starts the onboarding process for a selected candidate.
 
     Args:
         candidate_id (str): The ID of the candidate.
         role (str): The job role for the candidate.
+        start_date (str): First working day in YYYY-MM-DD format (defaults to today).
 
     Returns:
         dict: A dictionary indicating the onboarding status.
     """
-    logger.info("Starting onboarding for %s as %s", candidate_id, role)
+    if deadlines.expired():
+        return deadlines.try_again("Starting onboarding")
+
+    start_date = start_date or datetime.utcnow().strftime("%Y-%m-%d")
+    logger.info("Starting onboarding for %s as %s on %s", candidate_id, role, start_date)
+
+    try:
+        onboarding_id = get_onboarding_engine().start(candidate_id, role, start_date)
+    except ValueError as e:
+        return {"candidate_id": candidate_id, "status": "not_started", "reason": str(e)}
+    notify(
+        "onboarding_welcome",
+        candidate_id,
+        f"Welcome to Cymbal Home & Garden, {role}",
+        f"Your onboarding has started. Your first day is {start_date}.",
+        dedup_key=f"{normalize_id(candidate_id)}:{start_date}",
+    )
 
     return {
         "status": "onboarding_started",
         "candidate_id": candidate_id,
         "role": role,
-        "onboarding_id": str(uuid.uuid4())
+        "start_date": start_date,
+        "onboarding_id": onboarding_id
+    }
+
+
+def get_onboarding_status(onboarding_id: str) -> dict:
+    """
+    Reports the progress of a started onboarding.
+
+    Args:
+        onboarding_id (str): The onboarding ID returned by start_onboarding.
+
+    Returns:
+        dict: The overall status and the state of each onboarding step.
+    """
+    if deadlines.expired():
+        return deadlines.try_again("Checking the onboarding status")
+
+    logger.info("Checking onboarding status of %s", onboarding_id)
+
+    record = get_onboarding_engine().status(onboarding_id)
+    if record is None:
+        return {"onboarding_id": onboarding_id, "status": "not_found"}
+
+    return {
+        "onboarding_id": onboarding_id,
+        "candidate_id": record["employee_id"],
+        "status": record["status"],
+        "steps": {
+            name: {key: step[key] for key in ("state", "attempts", "error")}
+            for name, step in record["steps"].items()
+        }
     }
 
 
 def ask_hr_question(candidate_id: str, question: str) -> dict:
     """
-    Simulates asking an HR-related question.
+    Submits an HR question to the HR queue.
+
+    Near-duplicate questions are grouped so HR answers them once; if the
+    question was already answered, the answer is returned right away.
 
     Args:
         candidate_id (str): The ID of the candidate.
         question (str): The question to ask.
 
     Returns:
-        dict: A simulated HR response.
+        dict: The HR answer if one exists, otherwise an acknowledgement.
     """
+    if deadlines.expired():
+        return deadlines.try_again("Sending the HR question")
+
     logger.info("Candidate %s asked HR: %s", candidate_id, question)
 
+    try:
+        cluster, record = hr_queue.ask(candidate_id, question)
+    except ValueError:
+        return {"candidate_id": candidate_id, "status": "not_found"}
+    if record.answered:
+        return {
+            "candidate_id": candidate_id,
+            "question": question,
+            "answered": True,
+            "response": record.response,
+        }
     return {
         "candidate_id": candidate_id,
         "question": question,
+        "answered": False,
+        "similar_questions": len(cluster.questions) - 1,
         "response": "Thank you for your question. Our HR team will get back to you shortly."
     }
 
@@ -125,13 +226,25 @@ def update_employee_status(candidate_id: str, status: str) -> dict:
     Returns:
         dict: A dictionary with the update result.
     """
+    if deadlines.expired():
+        return deadlines.try_again("Updating the status")
+
     logger.info("Updating status for %s to %s", candidate_id, status)
 
+    # Version-checked: onboarding and HR answers write the same record.
+    employee = get_store().update(
+        candidate_id, lambda e: e.update_employee_status(status) or True
+    )
+    if employee is None:
+        return {"candidate_id": candidate_id, "status": "not_found"}
+
     return {
         "candidate_id": candidate_id,
         "status": status,
         "updated_at": datetime.utcnow().isoformat()
     }
+
+
 def add_applicant_and_prompt_interview(name: str, email: str, role: str) -> dict:
     """
     Adds a new applicant and prompts for interview scheduling.
@@ -144,15 +257,78 @@ def add_applicant_and_prompt_interview(name: str, email: str, role: str) -> dict
     Returns:
         dict: A dictionary containing the applicant data and next step prompt.
     """
-    candidate_id = f"APP-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"  # Simple ID generation
+    if deadlines.expired():
+        return deadlines.try_again("Adding the applicant")
+
+    now = datetime.utcnow()
+    # Timestamp plus a random suffix so applicants added in the same second
+    # do not overwrite each other in the roster.
+    candidate_id = f"APP-{now.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:4].upper()}"
     logger.info("New applicant added: %s, Email: %s, Role: %s", name, email, role)
 
+    first_name, _, last_name = name.strip().partition(" ")
+    get_store().put(
+        Employee(
+            employee_id=candidate_id,
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            phone_number="000-000-0000",
+            job_applications=[
+                JobApplication(
+                    job_id=f"J{uuid.uuid4().hex[:4].upper()}",
+                    position=role,
+                    application_date=now.strftime("%Y-%m-%d"),
+                    status="Submitted",
+                    resume="",
+                )
+            ],
+            interviews=[],
+            address=Address(street="", city="", state="", zip=""),
+            status="Applicant",
+        )
+    )
+
     return {
         "candidate_id": candidate_id,
         "name": name,
         "email": email,
         "applied_role": role,
         "status": "Applicant",
-        "created_at": datetime.utcnow().isoformat(),
+        "created_at": now.isoformat(),
         "next_step": "Would you like to schedule an interview for this applicant?"
-    }
\ No newline at end of file
+    }
+
+
+def find_employee(query: str, limit: int = 5) -> dict:
+    """
+    Finds employees and applicants by fuzzy match on name, email or role.
+
+    Args:
+        query (str): Free text such as "Jon Doe cashier" or part of an email.
+        limit (int): Maximum number of matches to return.
+
+    Returns:
+        dict: The best matches, most similar first, with their candidate IDs.
+    """
+    if deadlines.expired():
+        return deadlines.try_again("Searching the roster")
+
+    logger.info("Searching employees for %r", query)
+
+    matches = get_employee_index().search(query, limit=limit)
+
+    return {
+        "query": query,
+        "matches": [
+            {
+                "candidate_id": m.employee_id,
+                "name": m.name,
+                "email": m.email,
+                "role": m.role,
+                "status": m.status,
+                "score": m.score,
+            }
+            for m in matches
+        ],
+    }
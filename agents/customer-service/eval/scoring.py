@@ -0,0 +1,438 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Scores many runs of the eval files at once, with variance statistics.
+
+`test_eval.py` runs every file once and gets a single pass or fail, which
+hides flaky cases. `collect` plays every file `num_runs` times against the
+agent, each run in its own session, and `score` turns the runs into
+(cases, runs) arrays, one case per turn of a file:
+
+* `trajectory`: 1.0 where the turn's tool calls equal `expected_tool_use`
+  (names and inputs, in order; transfers between agents are not tool
+  uses), else 0.0;
+* `response`: ROUGE-1 F1 of the turn's final text against `reference`, the
+  measure behind `response_match_score`, without stemming.
+
+`summarize` reports per case the mean of each metric with a bootstrap
+confidence interval, and per file the share of runs that meet the
+thresholds of `test_config.json`, i.e. how often `test_eval.py` would
+pass. `compare` diffs a report against a stored baseline; a case regresses
+when its whole interval lies below the baseline mean:
+
+    python -m eval.scoring --runs 20            # diff report, exit 1 on
+                                                # any regression
+    python -m eval.scoring --runs 20 --update-baseline
+
+Needs numpy, which the dev dependencies provide.
+"""
+
+import argparse
+import asyncio
+import glob
+import itertools
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from google.adk.agents import BaseAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+EVAL_DATA = os.path.join(os.path.dirname(__file__), "eval_data")
+BASELINE = os.path.join(os.path.dirname(__file__), "scoring_baseline.json")
+METRICS = ("trajectory", "response")
+# Keys of `test_config.json` criteria, per metric.
+CRITERIA = {
+    "trajectory": "tool_trajectory_avg_score",
+    "response": "response_match_score",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_APP_NAME = "eval_scoring"
+
+
+def load_cases(paths: List[str]) -> List[Dict[str, Any]]:
+    """Returns every turn of the eval files as a case.
+
+    Args:
+        paths (List[str]): `*.test.json` files, each a list of turns with
+            `query`, `expected_tool_use` and `reference`.
+
+    Returns:
+        List[Dict[str, Any]]: The turns in file order, each with its file's
+            name under `file` and an `id` of the form `name#turn`.
+    """
+    cases = []
+    for path in paths:
+        name = os.path.basename(path).removesuffix(".test.json")
+        with open(path, encoding="utf-8") as f:
+            turns = json.load(f)
+        for index, turn in enumerate(turns):
+            cases.append(dict(turn, file=name, id=f"{name}#{index}"))
+    return cases
+
+
+def load_criteria(directory: str = EVAL_DATA) -> Dict[str, float]:
+    """Returns the pass thresholds per metric from `test_config.json`."""
+    path = os.path.join(directory, "test_config.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        criteria = json.load(f).get("criteria", {})
+    return {
+        metric: criteria[key]
+        for metric, key in CRITERIA.items()
+        if key in criteria
+    }
+
+
+async def _play(
+    runner: InMemoryRunner, turns: List[Dict[str, Any]], run: int
+) -> List[Tuple[List[Dict[str, Any]], str]]:
+    """Plays the turns of one file in a fresh session.
+
+    Returns:
+        Per turn, the tool calls made and the last final text.
+    """
+    user_id = f"eval-{run}"
+    session = await runner.session_service.create_session(
+        app_name=_APP_NAME, user_id=user_id
+    )
+    played = []
+    for turn in turns:
+        calls: List[Dict[str, Any]] = []
+        text = ""
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session.id,
+            new_message=types.Content(
+                role="user", parts=[types.Part(text=turn["query"])]
+            ),
+        ):
+            calls += [
+                {"tool_name": call.name, "tool_input": call.args or {}}
+                for call in event.get_function_calls()
+                if call.name != "transfer_to_agent"
+            ]
+            if event.is_final_response() and event.content:
+                final = "".join(
+                    p.text for p in event.content.parts or [] if p.text
+                )
+                text = final or text
+        played.append((calls, text))
+    return played
+
+
+async def collect(
+    agent: BaseAgent,
+    cases: List[Dict[str, Any]],
+    num_runs: int,
+    concurrency: int = 4,
+) -> Dict[str, List[List[Any]]]:
+    """Plays every file of `cases` `num_runs` times against `agent`.
+
+    Runs are I/O bound on the model, so up to `concurrency` of them play at
+    once; the turns of one run stay sequential.
+
+    Returns:
+        Dict[str, List[List[Any]]]: `tool_use` and `responses`, each indexed
+            [case][run].
+    """
+    runner = InMemoryRunner(agent=agent, app_name=_APP_NAME)
+    files: Dict[str, List[int]] = {}
+    for index, case in enumerate(cases):
+        files.setdefault(case["file"], []).append(index)
+    tool_use = [[None] * num_runs for _ in cases]
+    responses = [[""] * num_runs for _ in cases]
+    limit = asyncio.Semaphore(concurrency)
+
+    async def play(indices: List[int], run: int) -> None:
+        async with limit:
+            played = await _play(runner, [cases[i] for i in indices], run)
+        for index, (calls, text) in zip(indices, played):
+            tool_use[index][run] = calls
+            responses[index][run] = text
+
+    await asyncio.gather(
+        *(
+            play(indices, run)
+            for indices in files.values()
+            for run in range(num_runs)
+        )
+    )
+    return {"tool_use": tool_use, "responses": responses}
+
+
+def _canonical(calls: Optional[List[Dict[str, Any]]]) -> str:
+    return json.dumps(
+        [[c["tool_name"], c.get("tool_input") or {}] for c in calls or []],
+        sort_keys=True,
+    )
+
+
+def trajectory_scores(
+    expected: List[List[Dict[str, Any]]], tool_use: List[List[Any]]
+) -> np.ndarray:
+    """Returns 1.0 per (case, run) whose tool calls match exactly."""
+    wanted = np.array([_canonical(calls) for calls in expected], dtype=object)
+    actual = np.array(
+        [[_canonical(calls) for calls in row] for row in tool_use],
+        dtype=object,
+    ).reshape(len(expected), -1)
+    return (actual == wanted[:, None]).astype(float)
+
+
+def response_scores(
+    references: List[str], responses: List[List[str]]
+) -> np.ndarray:
+    """Returns the ROUGE-1 F1 of every (case, run) response.
+
+    All texts are tokenized once into ids of a shared vocabulary. Token
+    counts are kept sparse, as sorted (text, token) keys from `np.unique`,
+    so memory grows with the number of tokens rather than with cases x runs
+    x vocabulary. Each response count is clipped by its reference count,
+    looked up with one `searchsorted`.
+    """
+    vocab: Dict[str, int] = {}
+
+    def ids(text: str) -> List[int]:
+        return [
+            vocab.setdefault(t, len(vocab))
+            for t in _TOKEN_RE.findall(text.lower())
+        ]
+
+    ref_ids = [ids(text) for text in references]
+    resp_ids = [ids(text) for row in responses for text in row]
+    cases = len(references)
+    runs = len(responses[0]) if responses else 0
+    size = max(len(vocab), 1)
+
+    def counts(
+        texts: List[List[int]],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Unique (text index, token id) keys and how often each occurs.
+        lengths = np.array([len(t) for t in texts], dtype=np.int64)
+        tokens = np.fromiter(
+            itertools.chain.from_iterable(texts), np.int64, lengths.sum()
+        )
+        owners = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        return lengths, *np.unique(owners * size + tokens, return_counts=True)
+
+    ref_lengths, ref_keys, ref_counts = counts(ref_ids)
+    resp_lengths, resp_keys, resp_counts = counts(resp_ids)
+    pairs = resp_keys // size
+    wanted = pairs // max(runs, 1) * size + resp_keys % size
+    clipped = np.zeros(len(resp_keys))
+    if len(ref_keys):
+        found = np.minimum(np.searchsorted(ref_keys, wanted), len(ref_keys) - 1)
+        hit = ref_keys[found] == wanted
+        clipped[hit] = np.minimum(resp_counts[hit], ref_counts[found[hit]])
+    overlap = np.bincount(
+        pairs, weights=clipped, minlength=cases * runs
+    ).reshape(cases, runs)
+    # F1 = 2PR / (P + R) = 2 * overlap / (|response| + |reference|).
+    total = resp_lengths.reshape(cases, runs) + ref_lengths[:, None]
+    return np.divide(
+        2.0 * overlap,
+        total,
+        out=np.zeros(overlap.shape),
+        where=total > 0,
+    )
+
+
+def score(
+    cases: List[Dict[str, Any]], runs: Dict[str, List[List[Any]]]
+) -> Dict[str, np.ndarray]:
+    """Returns a (cases, runs) score array per metric."""
+    return {
+        "trajectory": trajectory_scores(
+            [c.get("expected_tool_use") or [] for c in cases],
+            runs["tool_use"],
+        ),
+        "response": response_scores(
+            [c.get("reference") or "" for c in cases], runs["responses"]
+        ),
+    }
+
+
+def bootstrap_ci(
+    scores: np.ndarray,
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns per-row percentile bootstrap bounds of the mean.
+
+    Every row is resampled with the same run indices, so all cases are
+    bootstrapped in one (cases, resamples, runs) gather.
+    """
+    runs = scores.shape[-1]
+    picks = np.random.default_rng(seed).integers(
+        0, runs, size=(resamples, runs)
+    )
+    means = scores[:, picks].mean(axis=-1)
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(means, [tail, 1 - tail], axis=-1)
+    return low, high
+
+
+def summarize(
+    cases: List[Dict[str, Any]],
+    scores: Dict[str, np.ndarray],
+    criteria: Optional[Dict[str, float]] = None,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Returns per-case statistics and per-file pass rates.
+
+    A run of a file passes when, for every metric with a threshold, the
+    mean over the file's turns reaches it, as in `AgentEvaluator`.
+    """
+    criteria = criteria if criteria is not None else load_criteria()
+    names = list(dict.fromkeys(c["file"] for c in cases))
+    file_of = np.array([names.index(c["file"]) for c in cases])
+    turns = np.bincount(file_of, minlength=len(names))[:, None]
+    report: Dict[str, Any] = {
+        "runs": int(scores["trajectory"].shape[1]),
+        "confidence": confidence,
+        "cases": {c["id"]: {} for c in cases},
+        "files": {},
+    }
+    passed = np.ones((len(names), report["runs"]), dtype=bool)
+    file_means = {}
+    for metric in METRICS:
+        values = scores[metric]
+        low, high = bootstrap_ci(values, confidence, seed=seed)
+        mean = values.mean(axis=1)
+        std = (
+            values.std(axis=1, ddof=1)
+            if values.shape[1] > 1
+            else np.zeros_like(mean)
+        )
+        for i, case in enumerate(cases):
+            report["cases"][case["id"]][metric] = {
+                "mean": round(float(mean[i]), 4),
+                "std": round(float(std[i]), 4),
+                "ci_low": round(float(low[i]), 4),
+                "ci_high": round(float(high[i]), 4),
+            }
+        per_file = np.zeros((len(names), values.shape[1]))
+        np.add.at(per_file, file_of, values)
+        per_file /= turns
+        file_means[metric] = per_file.mean(axis=1)
+        if metric in criteria:
+            passed &= per_file >= criteria[metric]
+    for i, name in enumerate(names):
+        report["files"][name] = {
+            "pass_rate": round(float(passed[i].mean()), 4),
+            **{m: round(float(file_means[m][i]), 4) for m in METRICS},
+        }
+    return report
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Returns report lines; lines of regressed cases start with 'FAIL'."""
+    lines = []
+    for case_id, metrics in report["cases"].items():
+        before = baseline.get("cases", {}).get(case_id)
+        if before is None:
+            lines.append(f"NEW   {case_id}: no baseline")
+            continue
+        for metric, stats in metrics.items():
+            delta = stats["mean"] - before[metric]
+            status = "FAIL " if stats["ci_high"] < before[metric] else "ok   "
+            lines.append(
+                f"{status} {case_id} {metric}: {stats['mean']:.3f} "
+                f"[{stats['ci_low']:.3f}, {stats['ci_high']:.3f}] vs "
+                f"{before[metric]:.3f} ({delta:+.3f})"
+            )
+    for name, stats in report["files"].items():
+        before = baseline.get("files", {}).get(name)
+        suffix = (
+            f" vs {before['pass_rate']:.0%}"
+            f" ({(stats['pass_rate'] - before['pass_rate']) * 100:+.0f} pts)"
+            if before
+            else ""
+        )
+        lines.append(
+            f"      {name}: passes {stats['pass_rate']:.0%} of "
+            f"{report['runs']} runs{suffix}"
+        )
+    return lines
+
+
+def to_baseline(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Keeps the means of a report, the part a later run is compared to."""
+    return {
+        "runs": report["runs"],
+        "cases": {
+            case_id: {m: stats["mean"] for m, stats in metrics.items()}
+            for case_id, metrics in report["cases"].items()
+        },
+        "files": {
+            name: {"pass_rate": stats["pass_rate"]}
+            for name, stats in report["files"].items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--files", default=os.path.join(EVAL_DATA, "*.test.json")
+    )
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the case means of this run as the new baseline",
+    )
+    parser.add_argument("--confidence", type=float, default=0.95)
+    args = parser.parse_args()
+
+    from dotenv import find_dotenv, load_dotenv
+
+    load_dotenv(find_dotenv(".env"))
+    from customer_service.agent import root_agent
+
+    cases = load_cases(sorted(glob.glob(args.files)))
+    runs = asyncio.run(
+        collect(root_agent, cases, args.runs, args.concurrency)
+    )
+    report = summarize(cases, score(cases, runs), confidence=args.confidence)
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(to_baseline(report), f, indent=2)
+            f.write("\n")
+        print(f"Wrote {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(json.dumps(report, indent=2))
+        print(f"No baseline at {args.baseline}; run with --update-baseline")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    lines = compare(report, baseline)
+    print("\n".join(lines))
+    if any(line.startswith("FAIL") for line in lines):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
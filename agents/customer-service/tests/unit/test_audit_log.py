@@ -0,0 +1,157 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import glob
+import os
+import time
+from types import SimpleNamespace
+
+from customer_service.shared_libraries import audit_log, callbacks
+from customer_service.shared_libraries.audit_log import AuditLog
+
+
+def fill(log, n, candidates=10):
+    for i in range(n):
+        log.record(
+            "update_employee_status",
+            f"app-{i % candidates}",
+            "call",
+            {"status": f"s{i}"},
+        )
+
+
+def test_query_returns_candidate_records_in_order(tmp_path):
+    log = AuditLog(str(tmp_path), block_records=16)
+    fill(log, 200)
+    records = log.query("APP-3")
+    assert len(records) == 20
+    assert {r["candidate_id"] for r in records} == {"APP-3"}
+    assert [r["payload"]["status"] for r in records][:2] == ["s3", "s13"]
+    assert records == sorted(records, key=lambda r: r["ts"])
+
+    middle = records[10]["ts"]
+    assert len(log.query("app-3", since=middle)) == 10
+    assert log.query("APP-404") == []
+    log.close()
+
+
+def test_segments_rotate_and_sealed_indexes_are_searched(tmp_path):
+    log = AuditLog(str(tmp_path), max_segment_bytes=2048, block_records=32)
+    fill(log, 2000)
+    log.flush()
+    assert log.stats()["segments"] > 2
+    sealed = glob.glob(os.path.join(str(tmp_path), "segment-*.idx"))
+    assert len(sealed) == log.stats()["segments"] - 1
+    assert len(log.query("APP-7")) == 200
+    log.close()
+
+    reopened = AuditLog(str(tmp_path))
+    assert len(reopened.query("APP-7")) == 200
+    reopened.close()
+
+
+def test_rolled_and_closed_segments_are_synced(tmp_path, monkeypatch):
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(
+        audit_log.os, "fsync", lambda fd: synced.append(fd) or fsync(fd)
+    )
+    log = AuditLog(str(tmp_path), max_segment_bytes=512, block_records=32)
+    fill(log, 200)
+    log.flush()
+    rolled = log.stats()["segments"] - 1
+    assert rolled > 0
+    # Each sealed segment syncs its log and its index.
+    assert len(synced) == 2 * rolled
+    log.close()
+    assert len(synced) == 2 * rolled + 2
+
+
+def test_in_memory_roster_audits_to_a_stable_directory(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("GOOGLE_storage_settings", raising=False)
+    monkeypatch.delenv("GOOGLE_audit_settings", raising=False)
+
+    first = audit_log.default_directory()
+
+    assert first == audit_log.default_directory()
+    assert first == str(tmp_path / ".customer_service" / "audit")
+
+
+def test_unsealed_segment_is_recovered_after_crash(tmp_path):
+    log = AuditLog(str(tmp_path), block_records=8)
+    fill(log, 50)
+    log.flush()
+    # Simulate a crash: no close, plus a torn block at the end.
+    with open(log._active.path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00\x01\x00")
+
+    recovered = AuditLog(str(tmp_path))
+    assert len(recovered.query("APP-1")) == 5
+    fill(recovered, 10)
+    assert len(recovered.query("APP-1")) == 6
+    recovered.close()
+
+
+def test_sustains_50k_records_per_second(tmp_path):
+    log = AuditLog(str(tmp_path))
+    started = time.perf_counter()
+    fill(log, 50_000, candidates=5000)
+    enqueued = time.perf_counter() - started
+    log.flush(timeout=30)
+    total = time.perf_counter() - started
+    assert enqueued < 1.0  # the tool path only enqueues
+    assert total < 2.0, f"wrote 50k records in {total:.2f}s"
+    assert log.stats()["records_written"] == 50_000
+    assert len(log.query("APP-42")) == 10
+    log.close()
+
+
+def test_tool_callbacks_feed_the_audit_log(tmp_path):
+    log = AuditLog(str(tmp_path))
+    audit_log.set_audit_log(log)
+    try:
+        context = SimpleNamespace(
+            state={}, invocation_id="inv-1", agent_name="interview_agent"
+        )
+        args = {"candidate_id": "APP-9", "marks": 75, "feedback": "Good"}
+        tool = SimpleNamespace(name="evaluate_interview")
+        callbacks.before_tool(tool, args, context)
+        callbacks.after_tool(tool, args, context, {"status": "passed"})
+        callbacks.before_tool(SimpleNamespace(name="find_employee"), {}, context)
+        failed = {"candidate_id": "app-9", "new_status": "Agent"}
+        status_tool = SimpleNamespace(name="update_employee_status")
+        callbacks.before_tool(status_tool, failed, context)
+        callbacks.on_tool_error(
+            status_tool, failed, context, RuntimeError("store closed")
+        )
+
+        records = log.query("app-9")
+        assert [r["phase"] for r in records] == [
+            "call",
+            "result",
+            "call",
+            "error",
+        ]
+        assert records[0]["payload"]["feedback"] == "good"
+        assert records[1]["payload"] == {"status": "passed"}
+        assert records[3]["payload"] == {
+            "error": "RuntimeError: store closed"
+        }
+        assert records[0]["invocation_id"] == "inv-1"
+    finally:
+        audit_log.set_audit_log(None)
+        log.close()
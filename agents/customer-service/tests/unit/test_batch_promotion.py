@@ -0,0 +1,190 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+import pytest
+from customer_service.entities.customer import Address, Employee, Interview
+from customer_service.jobs import batch_promotion
+from customer_service.shared_libraries.storage import EmployeeStore
+
+
+def candidate(i, marks, status="Interviewed"):
+    return Employee(
+        employee_id=f"E{i:04d}",
+        first_name="Cand",
+        last_name=str(i),
+        email=f"cand{i}@example.com",
+        phone_number="000-000-0000",
+        job_applications=[],
+        interviews=[
+            Interview(
+                interview_date="2025-04-01",
+                interview_panel=["HR"],
+                result="Passed" if m >= 60 else "Failed",
+                marks=m,
+            )
+            for m in marks
+        ],
+        address=Address(street="", city="", state="", zip=""),
+        status=status,
+    )
+
+
+def test_interview_flow_leads_to_promotion(capsys):
+    employee = candidate(0, [], "Applicant")
+    for i, marks in enumerate((85, 90, 88)):
+        employee.schedule_interview(f"2025-04-0{i + 1}", ["HR"])
+        assert employee.status == "Interview Scheduled"
+        employee.evaluate_interview(i, result="Passed", marks=marks)
+        assert employee.status == "Interviewed"
+
+    employee.evaluate_candidate(start_date="2025-05-01")
+
+    assert employee.status == "Agent"
+    assert employee.onboarding.start_date == "2025-05-01"
+    assert "promoted to Agent" in capsys.readouterr().out
+
+    held = candidate(1, [], "Applicant")
+    held.schedule_interview("2025-04-01", ["HR"])
+    held.schedule_interview("2025-04-02", ["Tech Lead"])
+    held.evaluate_interview(0, result="Passed", marks=90)
+    # One round still ungraded.
+    assert held.status == "Interview Scheduled"
+    held.evaluate_interview(1, result="Failed", marks=40)
+    held.evaluate_candidate(start_date="2025-05-01")
+    assert held.status == "Interviewed"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "roster.db")
+    store = EmployeeStore(path)
+    store.put_many(
+        [candidate(i, [70, 80, 90]) for i in range(0, 20)]  # eligible
+        + [candidate(i, [70, 50]) for i in range(20, 35)]  # not yet
+        + [candidate(i, [], "Applicant") for i in range(35, 40)]
+        + [candidate(i, [90, 90, 90], "Terminated") for i in range(40, 45)]
+    )
+    store.close()
+    return path
+
+
+def test_batch_applies_rules_in_parallel(db_path, tmp_path):
+    stats = batch_promotion.run(
+        db_path,
+        "2025-05-01",
+        workers=2,
+        chunk_size=7,
+        checkpoint_path=str(tmp_path / "ckpt.json"),
+    )
+    assert stats["chunks"] == 7
+    assert stats["scanned"] == 45
+    assert stats["promoted"] == 20 and stats["held"] == 15
+    assert stats["skipped"] == 0
+
+    store = EmployeeStore(db_path)
+    promoted = store.get("E0003")
+    assert promoted.status == "Agent"
+    assert promoted.onboarding.start_date == "2025-05-01"
+    assert store.get("E0021").status == "Interviewed"
+    assert store.get("E0036").status == "Applicant"
+    assert store.get("E0041").status == "Terminated"
+
+
+def test_passing_marks_are_honoured(db_path):
+    stats = batch_promotion.run(db_path, "2025-05-01", passing_marks=85)
+    assert stats["promoted"] == 0 and stats["held"] == 35
+    assert EmployeeStore(db_path).get("E0021").status == "Interviewed"
+
+
+def test_only_interviewed_candidates_move_and_only_up(tmp_path):
+    path = str(tmp_path / "roster.db")
+    store = EmployeeStore(path)
+    store.put_many(
+        [
+            candidate(0, [90, 90, 90], "Hired"),
+            candidate(1, [90, 90, 90], "Interview Scheduled"),
+            candidate(2, [90, 50], "Interview Scheduled"),
+            candidate(3, [90, 50], "Hired"),
+            candidate(4, [90, 90, 90]),
+        ]
+    )
+
+    stats = batch_promotion.run(path, "2025-05-01", workers=1)
+
+    assert stats["promoted"] == 1 and stats["held"] == 0
+    assert [store.get(f"E{i:04d}").status for i in range(5)] == [
+        "Hired",
+        "Interview Scheduled",
+        "Interview Scheduled",
+        "Hired",
+        "Agent",
+    ]
+    assert store.get("E0000").onboarding is None
+    assert store.get_version("E0003") == 1
+
+
+def test_concurrent_writes_are_kept_and_counted(db_path, monkeypatch):
+    store = EmployeeStore(db_path)
+    read_range = store.get_range
+
+    def read_then_race(first_id, last_id):
+        employees = read_range(first_id, last_id)
+        # Tools write two eligible candidates after the scan.
+        phone = store.get("E0001")
+        phone.phone_number = "555-0100"
+        store.put(phone)
+        terminated = store.get("E0002")
+        terminated.status = "Terminated"
+        store.put(terminated)
+        return employees
+
+    monkeypatch.setattr(store, "get_range", read_then_race)
+
+    result = batch_promotion.evaluate_chunk(
+        0, "E0000", "E0004", "2025-05-01", 60, store=store
+    )
+
+    assert (result.promoted, result.held, result.skipped) == (4, 0, 1)
+    updated = store.get("E0001")
+    assert (updated.status, updated.phone_number) == ("Agent", "555-0100")
+    assert store.get("E0002").status == "Terminated"
+
+
+def test_resume_skips_completed_chunks(db_path, tmp_path):
+    ckpt = str(tmp_path / "ckpt.json")
+    store = EmployeeStore(db_path)
+    ranges = store.id_ranges(10)
+    # Simulate a crash after the first chunk committed.
+    batch_promotion.evaluate_chunk(0, *ranges[0], "2025-05-01", 60, store=store)
+    with open(ckpt, "w") as f:
+        json.dump(
+            {
+                "params": {"start_date": "2025-05-01", "passing_marks": 60},
+                "ranges": [list(r) for r in ranges],
+                "completed": [0],
+            },
+            f,
+        )
+
+    stats = batch_promotion.run(db_path, "2025-05-01", checkpoint_path=ckpt)
+    assert stats["chunks"] == len(ranges) - 1
+    assert stats["scanned"] == 35
+    assert store.get("E0015").status == "Agent"
+    with open(ckpt) as f:
+        assert json.load(f)["completed"] == list(range(len(ranges)))
+
+    with pytest.raises(ValueError):
+        batch_promotion.run(db_path, "2025-06-01", checkpoint_path=ckpt)
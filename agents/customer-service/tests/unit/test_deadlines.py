@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from customer_service.config import ModelSchedulerModel, ToolExecutorModel
+from customer_service.entities.customer import Employee
+from customer_service.shared_libraries import callbacks, deadlines, storage
+from customer_service.shared_libraries.model_scheduler import ModelScheduler
+from customer_service.shared_libraries.tool_executor import ToolExecutor
+from customer_service.tools import tools
+from google.adk.models import LlmRequest
+from google.genai import types
+
+
+@pytest.fixture(autouse=True)
+def unbound():
+    yield
+    deadlines.bind(None)
+
+
+def context(deadline=None, **state):
+    if deadline is not None:
+        state[deadlines.DEADLINE_KEY] = deadline
+    return SimpleNamespace(
+        state=state, invocation_id="inv-1", agent_name="interview_agent"
+    )
+
+
+def request():
+    return LlmRequest(
+        contents=[types.Content(role="user", parts=[types.Part(text="hi")])]
+    )
+
+
+def test_turn_deadline_is_set_once_per_turn():
+    ctx = context()
+
+    callbacks.before_agent(ctx)
+    first = ctx.state[deadlines.DEADLINE_KEY]
+    callbacks.before_agent(ctx)  # the specialist the router transferred to
+
+    assert ctx.state[deadlines.DEADLINE_KEY] == first
+    assert 29 < deadlines.remaining(first) <= 30
+
+
+def test_before_tool_skips_tools_once_the_deadline_passed():
+    tool = SimpleNamespace(name="schedule_interview")
+
+    result = callbacks.before_tool(
+        tool, {"candidate_id": "C1"}, context(time.time() - 1)
+    )
+
+    assert result["status"] == "try_again"
+    assert callbacks.before_tool(tool, {}, context(time.time() + 5)) is None
+    assert 4 < deadlines.remaining() <= 5
+
+
+def test_tools_check_the_bound_deadline_before_writing():
+    store = storage.EmployeeStore()
+    store.put(Employee.get_customer("E001"))
+    storage.set_store(store)
+    try:
+        deadlines.bind(time.time() - 1)
+        result = tools.update_employee_status("E001", "Agent")
+
+        assert result["status"] == "try_again"
+        assert store.get("E001").status == "Hired"
+        deadlines.bind(time.time() + 5)
+        result = tools.update_employee_status("E001", "Agent")
+        assert result["status"] == "Agent"
+    finally:
+        storage.set_store(None)
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_wait_is_bounded_by_the_deadline(monkeypatch):
+    monkeypatch.setattr(callbacks, "RPM_QUOTA", 1)
+    ctx = context(time.time() + 1, timer_start=time.time(), request_count=1)
+
+    started = time.perf_counter()
+    response = await callbacks.rate_limit_callback(ctx, request())
+
+    assert time.perf_counter() - started < 0.5
+    assert response.content.parts[0].text == deadlines.TRY_AGAIN_MESSAGE
+    assert ctx.state["request_count"] == 1
+
+    # A wait that fits in the turn is taken without blocking the loop.
+    monkeypatch.setattr(callbacks, "RATE_LIMIT_SECS", -0.95)
+    assert await callbacks.rate_limit_callback(ctx, request()) is None
+    assert ctx.state["request_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tool_timeout_and_quota_wait_end_at_the_deadline():
+    executor = ToolExecutor(ToolExecutorModel(timeout_secs=10))
+    release = threading.Event()
+
+    def slow(candidate_id: str) -> dict:
+        release.wait(5)
+        return {"status": "done"}
+
+    deadlines.bind(time.time() + 0.1)
+    started = time.perf_counter()
+    result = await executor.wrap(slow)(candidate_id="C1")
+    release.set()
+
+    assert result["status"] == "error"
+    assert time.perf_counter() - started < 1
+
+    scheduler = ModelScheduler(
+        ModelSchedulerModel(requests_per_minute=1, burst=1)
+    )
+    assert await scheduler.acquire("interview", deadlines.remaining())
+    assert not await scheduler.acquire("interview", 0.05)
+    executor.shutdown()
@@ -0,0 +1,203 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from eval import scoring
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm, LlmResponse
+from google.genai import types
+
+CART = {"tool_name": "access_cart_information", "tool_input": {"id": "1"}}
+
+
+class FlakyLlm(BaseLlm):
+    """Looks up the cart on every other turn it is asked, then replies."""
+
+    turns: object = None
+
+    async def generate_content_async(self, llm_request, stream=False):
+        last = llm_request.contents[-1].parts[0]
+        if last.function_response:
+            text = "one bag of potting soil"
+        elif next(self.turns) % 2 == 0:
+            call = types.FunctionCall(
+                name="access_cart_information", args={"id": "1"}
+            )
+            yield LlmResponse(
+                content=types.Content(
+                    role="model", parts=[types.Part(function_call=call)]
+                )
+            )
+            return
+        else:
+            text = "no idea"
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)])
+        )
+
+
+def access_cart_information(id: str) -> dict:
+    """Returns the cart.
+
+    Args:
+        id (str): The customer ID.
+
+    Returns:
+        dict: The cart.
+    """
+    return {"items": ["potting soil"]}
+
+
+def test_scores_match_trajectories_exactly_and_rouge1_per_run():
+    trajectory = scoring.trajectory_scores(
+        [[CART], []],
+        [
+            [[CART], [dict(CART, tool_input={"id": "2"})], []],
+            [[], None, [CART]],
+        ],
+    )
+    response = scoring.response_scores(
+        ["the cat sat", ""],
+        [["the cat sat", "The cat, the cat!", "dog"], ["", "x", ""]],
+    )
+
+    assert trajectory.tolist() == [[1, 0, 0], [1, 1, 0]]
+    # "the cat the cat" vs "the cat sat": overlap 2, F1 = 4 / (4 + 3).
+    assert response[0].tolist() == pytest.approx([1.0, 4 / 7, 0.0])
+    assert response[1].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_response_scores_stay_sparse_over_a_large_vocabulary():
+    # 400 cases x 25 runs over a 60k-word vocabulary: a dense count array
+    # would need 2.4 GB.
+    references = [f"ref{c} shared w{c}a w{c}b" for c in range(400)]
+    responses = [
+        [f"run{c}x{r} w{c}a" if r else references[c] for r in range(25)]
+        for c in range(400)
+    ]
+    responses[7][3] += " " + " ".join(f"filler{i}" for i in range(50000))
+
+    scores = scoring.response_scores(references, responses)
+
+    assert scores.shape == (400, 25)
+    assert (scores[:, 0] == 1.0).all()
+    # Overlap 1 ("wNa") of a 2-token response and a 4-token reference.
+    assert scores[0, 1] == pytest.approx(2 / 6)
+    assert scores[7, 3] == pytest.approx(2 / (50002 + 4))
+
+
+def test_summary_reports_intervals_and_file_pass_rates():
+    cases = [
+        {"id": "a#0", "file": "a"},
+        {"id": "a#1", "file": "a"},
+        {"id": "b#0", "file": "b"},
+    ]
+    scores = {
+        "trajectory": np.array([[1.0] * 8, [1.0, 0.0] * 4, [0.0] * 8]),
+        "response": np.array([[0.9] * 8, [0.5] * 8, [0.1] * 8]),
+    }
+
+    report = scoring.summarize(
+        cases, scores, {"trajectory": 0.75, "response": 0.2}
+    )
+
+    steady = report["cases"]["a#0"]["trajectory"]
+    assert steady == {"mean": 1.0, "std": 0.0, "ci_low": 1.0, "ci_high": 1.0}
+    flaky = report["cases"]["a#1"]["trajectory"]
+    assert flaky["mean"] == 0.5 and flaky["std"] > 0
+    assert flaky["ci_low"] < 0.5 < flaky["ci_high"]
+    # File a averages 1.0 over its turns on half of the runs, 0.5 on the
+    # others; file b never reaches the trajectory threshold.
+    assert report["files"]["a"]["pass_rate"] == 0.5
+    assert report["files"]["b"]["pass_rate"] == 0.0
+    assert report["files"]["a"]["response"] == pytest.approx(0.7)
+
+
+def test_compare_flags_only_intervals_below_the_baseline():
+    report = {
+        "runs": 20,
+        "cases": {
+            "a#0": {
+                "trajectory": {"mean": 0.6, "ci_low": 0.4, "ci_high": 0.8},
+                "response": {"mean": 0.3, "ci_low": 0.2, "ci_high": 0.4},
+            },
+            "a#1": {
+                "trajectory": {"mean": 1.0, "ci_low": 1.0, "ci_high": 1.0},
+                "response": {"mean": 0.5, "ci_low": 0.5, "ci_high": 0.5},
+            },
+        },
+        "files": {"a": {"pass_rate": 0.6}},
+    }
+    baseline = scoring.to_baseline(report)
+    baseline["cases"]["a#0"] = {"trajectory": 0.7, "response": 0.5}
+    del baseline["cases"]["a#1"]
+    baseline["files"]["a"]["pass_rate"] = 0.9
+
+    lines = scoring.compare(report, baseline)
+
+    failed = [line for line in lines if line.startswith("FAIL")]
+    assert failed == [
+        "FAIL  a#0 response: 0.300 [0.200, 0.400] vs 0.500 (-0.200)"
+    ]
+    assert "NEW   a#1: no baseline" in lines
+    assert lines[-1] == "      a: passes 60% of 20 runs vs 90% (-30 pts)"
+
+
+@pytest.mark.asyncio
+async def test_collect_plays_every_file_per_run_in_its_own_session():
+    agent = Agent(
+        name="cart_agent",
+        model=FlakyLlm(model="stub", turns=itertools.count()),
+        instruction="Answer about the cart.",
+        tools=[access_cart_information],
+    )
+    cases = [
+        {
+            "id": "cart#0",
+            "file": "cart",
+            "query": "what is in my cart?",
+            "expected_tool_use": [CART],
+            "reference": "one bag of potting soil",
+        }
+    ]
+
+    runs = await scoring.collect(agent, cases, num_runs=6, concurrency=2)
+    scores = scoring.score(cases, runs)
+
+    assert sorted(scores["trajectory"][0].tolist()) == [0] * 3 + [1] * 3
+    assert (scores["response"] == scores["trajectory"]).all()
+    assert set(runs["responses"][0]) == {"one bag of potting soil", "no idea"}
+
+
+def test_loads_the_eval_files_and_their_thresholds():
+    data = os.path.join(
+        os.path.dirname(__file__), "..", "..", "eval", "eval_data"
+    )
+
+    cases = scoring.load_cases([os.path.join(data, "simple.test.json")])
+
+    assert [c["id"] for c in cases] == ["simple#0", "simple#1"]
+    assert cases[1]["expected_tool_use"][0]["tool_input"] == {
+        "customer_id": "123"
+    }
+    assert scoring.load_criteria(data) == {
+        "trajectory": 0.2,
+        "response": 0.2,
+    }
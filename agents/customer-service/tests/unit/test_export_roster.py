@@ -0,0 +1,167 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import json
+
+import pytest
+from customer_service.entities.customer import (
+    Address,
+    Employee,
+    Interview,
+    JobApplication,
+    Onboarding,
+)
+from customer_service.jobs import export_roster
+from customer_service.shared_libraries.storage import EmployeeStore
+
+
+def employee(i, status, role, applied, marks=(), onboarded=False):
+    return Employee(
+        employee_id=f"E{i:03d}",
+        first_name="Emp",
+        last_name=str(i),
+        email=f"emp{i}@example.com",
+        phone_number="000-000-0000",
+        job_applications=[
+            JobApplication(
+                job_id=f"J{i}",
+                position=role,
+                application_date=applied,
+                status="Submitted",
+                resume="",
+            )
+        ],
+        interviews=[
+            Interview(
+                interview_date="2025-04-01",
+                interview_panel=["HR"],
+                result="Passed" if m >= 60 else "Failed",
+                marks=m,
+            )
+            for m in marks
+        ],
+        onboarding=(
+            Onboarding(
+                start_date="2025-05-01",
+                orientation_scheduled=True,
+                benefits_package=False,
+                system_access_granted=True,
+            )
+            if onboarded
+            else None
+        ),
+        address=Address(street="1 Main", city="Town", state="CA", zip="1"),
+        status=status,
+    )
+
+
+@pytest.fixture
+def store():
+    store = EmployeeStore()
+    store.put_many(
+        [
+            employee(1, "Agent", "Cashier", "2025-01-10", (70, 80, 90), True),
+            employee(2, "Interviewed", "Cashier", "2025-02-10", (40, 65)),
+            employee(3, "Interviewed", "Stocker", "2025-03-10", (61,)),
+            employee(4, "Applicant", "Cashier", "2024-12-01"),
+        ]
+    )
+    return store
+
+
+def test_flatten_summarizes_nested_records(store):
+    rows = {r["employee_id"]: r for r in export_roster.export_rows(store)}
+    assert list(rows["E001"]) == list(export_roster.COLUMNS)
+    assert rows["E001"]["interviews_passed"] == 3
+    assert rows["E001"]["best_marks"] == 90
+    assert rows["E001"]["system_access_granted"] is True
+    assert rows["E002"]["last_interview_result"] == "Passed"
+    assert rows["E004"]["onboarding_start_date"] is None
+    assert rows["E004"]["city"] == "Town"
+
+
+def test_filters_by_status_role_and_dates(store):
+    def ids(**filters):
+        return [
+            r["employee_id"]
+            for r in export_roster.export_rows(store, page_size=1, **filters)
+        ]
+
+    assert ids() == ["E001", "E002", "E003", "E004"]
+    assert ids(status="Interviewed") == ["E002", "E003"]
+    assert ids(status="Interviewed", role="Cashier") == ["E002"]
+    # Tool arguments arrive lowercased.
+    assert ids(status="Interviewed", role="cashier") == ["E002"]
+    assert ids(since="2025-01-01", until="2025-02-28") == ["E001", "E002"]
+
+
+def test_status_filter_matches_legacy_spellings(store):
+    legacy = employee(5, "interviewed", "Cashier", "2025-03-20")
+    store.insert_rows(
+        [("E005", "interviewed", "Cashier", 1, legacy.model_dump_json())]
+    )
+    ids = [
+        r["employee_id"]
+        for r in export_roster.export_rows(store, status="interviewed")
+    ]
+    assert ids == ["E002", "E003", "E005"]
+
+
+def test_csv_and_jsonl_output(store, tmp_path):
+    csv_path = str(tmp_path / "roster.csv")
+    stats = export_roster.export(store, "csv", csv_path, role="Cashier")
+    assert stats["rows"] == 3 and stats["rows_per_sec"] > 0
+    with open(csv_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["employee_id"] for r in rows] == ["E001", "E002", "E004"]
+
+    jsonl_path = str(tmp_path / "roster.jsonl")
+    export_roster.export(store, "jsonl", jsonl_path)
+    with open(jsonl_path) as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 4 and rows[0]["best_marks"] == 90
+
+
+def test_child_tables_have_a_row_per_interview(store, tmp_path):
+    rows = list(
+        export_roster.export_rows(store, role="CASHIER", table="interviews")
+    )
+    assert [(r["employee_id"], r["interview_number"]) for r in rows] == [
+        ("E001", 1),
+        ("E001", 2),
+        ("E001", 3),
+        ("E002", 1),
+        ("E002", 2),
+    ]
+    assert rows[3]["marks"] == 40 and rows[3]["interview_panel"] == "HR"
+
+    path = str(tmp_path / "applications.csv")
+    stats = export_roster.export(store, "csv", path, table="applications")
+    assert stats["rows"] == 4
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        assert tuple(reader.fieldnames) == export_roster.APPLICATION_COLUMNS
+        assert next(reader)["position"] == "Cashier"
+    with pytest.raises(ValueError):
+        list(export_roster.export_rows(store, table="offers"))
+
+
+def test_parquet_output(store, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "roster.parquet")
+    assert export_roster.export(store, "parquet", path)["rows"] == 4
+    table = pq.read_table(path)
+    assert table.column_names == list(export_roster.COLUMNS)
+    assert table.column("best_marks").to_pylist() == [90, 65, 61, None]
@@ -0,0 +1,126 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import inspect
+import json
+import os
+import tracemalloc
+from collections import Counter
+
+from customer_service.entities.customer import Employee
+from customer_service.jobs import generate_synthetic
+from customer_service.jobs.generate_synthetic import (
+    STATUSES,
+    RosterGenerator,
+    conversation,
+)
+from customer_service.shared_libraries.storage import EmployeeStore
+from customer_service.tools import tools
+
+
+def test_records_are_reproducible_and_addressable_by_index():
+    generator = RosterGenerator(seed=7)
+
+    first = [e.model_dump_json() for e in generator.employees(20)]
+    again = [e.model_dump_json() for e in RosterGenerator(7).employees(20)]
+    middle = [e.model_dump_json() for e in generator.employees(5, start=10)]
+    other = [e.model_dump_json() for e in RosterGenerator(8).employees(20)]
+
+    assert first == again
+    assert middle == first[10:15]
+    assert first != other
+
+
+def test_records_follow_the_funnel_and_their_status():
+    employees = list(RosterGenerator(seed=1).employees(3000))
+
+    shares = Counter(e.status for e in employees)
+    for status, share in STATUSES:
+        assert abs(shares[status] / len(employees) - share) < 0.03
+    for employee in employees:
+        Employee.model_validate_json(employee.model_dump_json())
+        if employee.status == "Applicant":
+            assert not employee.interviews and not employee.hr_questions
+        if employee.status == "Agent":
+            assert employee.is_eligible_for_promotion()
+            assert employee.onboarding.system_access_granted
+        if employee.status == "Interview Scheduled":
+            assert employee.interviews[-1].marks is None
+    marks = [i.marks for e in employees for i in e.interviews if i.marks]
+    assert 60 < sum(marks) / len(marks) < 80
+
+
+def test_conversations_use_real_tools_with_the_records_data():
+    parameters = {
+        name: set(inspect.signature(func).parameters)
+        for name, func in inspect.getmembers(tools, inspect.isfunction)
+    }
+
+    for employee in RosterGenerator(seed=3).employees(200):
+        turns = conversation(employee, seed=3)
+        assert set(turns[0]) == {"query", "expected_tool_use", "reference"}
+        calls = [c for t in turns for c in t["expected_tool_use"]]
+        for call in calls:
+            assert set(call["tool_input"]) <= parameters[call["tool_name"]]
+        names = [c["tool_name"] for c in calls]
+        assert names.count("schedule_interview") == len(employee.interviews)
+        assert names.count("ask_hr_question") == len(employee.hr_questions)
+        if employee.status == "Agent":
+            assert "promote_employee" in names
+            assert "start_onboarding" in names
+
+
+def test_generate_streams_roster_and_conversation_files(tmp_path):
+    roster = tmp_path / "roster.jsonl"
+    db = str(tmp_path / "roster.db")
+
+    stats = generate_synthetic.generate(
+        250,
+        seed=2,
+        roster=str(roster),
+        db=db,
+        conversations=3,
+        conversations_dir=str(tmp_path / "conv"),
+        batch_size=100,
+    )
+
+    assert stats["employees"] == 250 and stats["conversations"] == 3
+    lines = roster.read_text().splitlines()
+    assert len(lines) == 250
+    assert EmployeeStore(db).count() == 250
+    files = sorted(os.listdir(tmp_path / "conv"))
+    assert files == [
+        "synthetic-E0000000.test.json",
+        "synthetic-E0000001.test.json",
+        "synthetic-E0000002.test.json",
+    ]
+    script = json.loads((tmp_path / "conv" / files[0]).read_text())
+    assert isinstance(script, list) and script[0]["expected_tool_use"] == []
+
+
+def test_generation_memory_does_not_grow_with_the_count(tmp_path):
+    generator = RosterGenerator(seed=4)
+
+    def peak(count):
+        tracemalloc.start()
+        generate_synthetic.write_roster(
+            generator, count, jsonl=str(tmp_path / f"{count}.jsonl")
+        )
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak
+
+    small, large = peak(200), peak(4000)
+
+    assert large < small * 1.5
@@ -0,0 +1,155 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.genai import types
+from customer_service.shared_libraries.history import (
+    HistoryPruner,
+    content_tokens,
+)
+
+
+def user(text):
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def model(text):
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def tool_turn(name):
+    return [
+        types.Content(
+            role="model",
+            parts=[
+                types.Part(
+                    function_call=types.FunctionCall(
+                        name=name, args={"candidate_id": "e001"}
+                    )
+                )
+            ],
+        ),
+        types.Content(
+            role="user",
+            parts=[
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        name=name, response={"status": "ok"}
+                    )
+                )
+            ],
+        ),
+    ]
+
+
+def conversation(turns):
+    contents = []
+    for i in range(turns):
+        contents.append(user(f"question {i} " + "x" * 200))
+        contents.append(model(f"answer {i} " + "y" * 200))
+    return contents
+
+
+def test_history_under_budget_is_untouched():
+    contents = conversation(3)
+    pruner = HistoryPruner(token_budget=10_000)
+    assert pruner.prune(contents) is contents
+
+
+def test_old_turns_are_summarized_and_recent_kept():
+    contents = conversation(10)
+    pruner = HistoryPruner(
+        token_budget=600, keep_recent_turns=2, summary_max_tokens=200
+    )
+    pruned = pruner.prune(contents, ("s1", "root"))
+
+    # Three verbatim turns fit in the budget left after the summary.
+    assert len(pruned) == 6
+    assert pruned[1:] == contents[-5:]
+    assert pruned[0].parts[1] == contents[-6].parts[0]
+    summary = pruned[0].parts[0].text
+    assert summary.startswith("Summary of the earlier")
+    assert "question 6" in summary and "question 0" not in summary
+    assert sum(content_tokens(c) for c in pruned) <= 600
+    assert pruner._histories["s1", "root"].summary_turns == 7
+
+
+def test_counts_and_summary_are_incremental():
+    contents = conversation(10)
+    pruner = HistoryPruner(
+        token_budget=600, keep_recent_turns=2, summary_max_tokens=200
+    )
+    pruner.prune(contents, ("s1", "root"))
+    history = pruner._histories["s1", "root"]
+    history.counts[1] = 10**6  # would be recounted if not cached
+    history.summary_lines[-1] = "- cached line"
+
+    contents += [user("question 10"), model("answer 10")]
+    pruned = pruner.prune(contents, ("s1", "root"))
+    assert len(history.counts) == len(contents)
+    assert history.counts[1] == 10**6
+    assert "- cached line" in pruned[0].parts[0].text
+
+
+def test_cache_is_per_agent_and_checks_the_prefix():
+    contents = conversation(10)
+    pruner = HistoryPruner(
+        token_budget=600, keep_recent_turns=2, summary_max_tokens=200
+    )
+    pruner.prune(contents, ("s1", "root"))
+    pruner._histories["s1", "root"].counts[1] = 10**6
+
+    # Another agent of the same session keeps its own counts.
+    pruner.prune(contents, ("s1", "interview_agent"))
+    assert pruner._histories["s1", "interview_agent"].counts[1] < 10**6
+
+    # Same length, different contents: the stale counts are dropped.
+    rewritten = [user("For context: " + "z" * 300)] + contents[1:]
+    pruner.prune(rewritten, ("s1", "root"))
+    assert pruner._histories["s1", "root"].counts[1] < 10**6
+
+    small = HistoryPruner(max_histories=2)
+    for session in ("a", "b", "c"):
+        small.prune(contents, (session, "root"))
+    assert list(small._histories) == [("b", "root"), ("c", "root")]
+
+
+def test_latest_tool_result_is_kept_while_its_turn_is_cut():
+    contents = conversation(4)
+    call, result = tool_turn("schedule_interview")
+    contents[1:1] = [call, result]
+    pruner = HistoryPruner(
+        token_budget=300, keep_recent_turns=1, summary_max_tokens=100
+    )
+    pruned = pruner.prune(contents)
+
+    # Turn 0 holds the tool pair; it is summarized, the pair kept verbatim.
+    assert pruned[1:3] == [call, result]
+    assert pruned[3:] == contents[-2:]
+    assert contents[0] not in pruned and contents[3] not in pruned
+
+
+def test_early_tool_call_does_not_stop_pruning():
+    pruner = HistoryPruner(
+        token_budget=1200, keep_recent_turns=2, summary_max_tokens=200
+    )
+    contents = [user("turn 0"), *tool_turn("find_employee"), model("done")]
+    sizes = []
+    for i in range(1, 51):
+        contents += [user(f"question {i} " + "x" * 200), model("y" * 200)]
+        pruned = pruner.prune(contents, ("s1", "root"))
+        sizes.append(sum(content_tokens(c) for c in pruned))
+
+    assert max(sizes[10:]) <= 1200
+    assert pruned[1:3] == contents[1:3]
+    assert pruned[-4:] == contents[-4:]
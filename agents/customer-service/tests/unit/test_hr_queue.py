@@ -0,0 +1,183 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import string
+import threading
+import time
+
+import pytest
+from customer_service.entities.customer import Employee
+from customer_service.shared_libraries import hr_queue, storage
+from customer_service.shared_libraries.hr_queue import HRQuestionQueue
+from customer_service.tools import tools
+
+TOPICS = [
+    "how many vacation days do i get per year",
+    "when is payday for new employees",
+    "what is the dental insurance coverage",
+    "can i work remotely on fridays",
+    "how do i enroll in the 401k retirement plan",
+]
+
+
+def make_employee(employee_id):
+    employee = Employee.get_customer("E001")
+    employee.employee_id = employee_id
+    return employee
+
+
+@pytest.fixture
+def store():
+    store = storage.EmployeeStore()
+    store.put_many(make_employee(f"E{i:03d}") for i in range(1, 4))
+    storage.set_store(store)
+    hr_queue.set_hr_queue(None)
+    yield store
+    hr_queue.set_hr_queue(None)
+    storage.set_store(None)
+
+
+def test_near_duplicates_share_a_cluster():
+    queue = HRQuestionQueue(store=storage.EmployeeStore())
+    first = queue.add("E001", 0, "How many vacation days do I get per year?")
+    again = queue.add("E002", 0, "how many vacation days do i get a year")
+    typo = queue.add("E003", 0, "How many vacaton days do I get per year")
+    other = queue.add("E001", 1, "When is payday for new employees?")
+
+    assert first is again is typo
+    assert other is not first
+    assert len(first.questions) == 3
+
+
+def test_top_orders_by_volume_and_age():
+    queue = HRQuestionQueue(store=storage.EmployeeStore())
+    now = time.time()
+    for i in range(3):
+        queue.add(f"E{i}", 0, TOPICS[0], asked_at=now)
+    queue.add("E9", 0, TOPICS[1], asked_at=now - 5 * 86400)
+    queue.add("E8", 0, TOPICS[2], asked_at=now)
+
+    top = queue.top(limit=2)
+
+    # One question waiting five days outweighs three asked just now.
+    assert [c["question"] for c in top] == [TOPICS[1], TOPICS[0]]
+    assert top[1]["open_questions"] == 3
+
+
+def test_answer_writes_back_to_every_record(store):
+    for employee_id in ("E001", "E002", "E003"):
+        tools.ask_hr_question(employee_id, "When is payday?")
+    tools.ask_hr_question("E001", "Is there a gym discount?")
+    queue = hr_queue.get_hr_queue()
+    cluster = queue.find("when is payday")
+
+    assert queue.answer(cluster.id, "The 15th and last day of the month.") == 3
+
+    for employee_id in ("E001", "E002", "E003"):
+        payday = store.get(employee_id).hr_questions[0]
+        assert payday.answered
+        assert payday.response == "The 15th and last day of the month."
+    assert not store.get("E001").hr_questions[1].answered
+    assert [c["question"] for c in queue.top()] == ["Is there a gym discount?"]
+
+
+def test_answered_cluster_answers_new_questions(store):
+    tools.ask_hr_question("E001", "What is the dress code?")
+    queue = hr_queue.get_hr_queue()
+    queue.answer(queue.find("What is the dress code?").id, "Business casual.")
+
+    result = tools.ask_hr_question("E002", "what's the dress code")
+
+    assert result["answered"]
+    assert result["response"] == "Business casual."
+    assert store.get("E002").hr_questions[0].response == "Business casual."
+
+
+def test_queue_is_rebuilt_from_storage(store):
+    tools.ask_hr_question("E001", TOPICS[3])
+    tools.ask_hr_question("E002", TOPICS[3])
+    hr_queue.set_hr_queue(None)
+
+    top = hr_queue.get_hr_queue().top()
+
+    assert top[0]["question"] == TOPICS[3]
+    assert top[0]["open_questions"] == 2
+
+
+def test_rebuild_restores_answered_clusters(store):
+    tools.ask_hr_question("E001", "What is the dress code?")
+    tools.ask_hr_question("E002", TOPICS[3])
+    queue = hr_queue.get_hr_queue()
+    queue.answer(queue.find("What is the dress code?").id, "Business casual.")
+    hr_queue.set_hr_queue(None)
+
+    result = tools.ask_hr_question("E003", "what's the dress code")
+
+    assert result["response"] == "Business casual."
+    assert [c["question"] for c in hr_queue.get_hr_queue().top()] == [
+        TOPICS[3]
+    ]
+
+
+def test_unknown_candidates_are_rejected(store):
+    result = tools.ask_hr_question("E404", TOPICS[0])
+
+    assert result == {"candidate_id": "E404", "status": "not_found"}
+    assert hr_queue.get_hr_queue().top() == []
+
+
+def test_concurrent_questions_and_answers_are_all_kept(store):
+    tools.ask_hr_question("E001", TOPICS[0])
+    queue = hr_queue.get_hr_queue()
+    cluster = queue.find(TOPICS[0])
+
+    def ask(worker):
+        for i in range(20):
+            hr_queue.ask("E001", f"{TOPICS[1 + worker]} {i}")
+
+    threads = [threading.Thread(target=ask, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    queue.answer(cluster.id, "25 days.")
+    for thread in threads:
+        thread.join()
+
+    questions = store.get("E001").hr_questions
+    assert len(questions) == 81
+    assert questions[0].response == "25 days."
+
+
+def test_insert_and_lookup_stay_sub_millisecond():
+    rng = random.Random(7)
+    words = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+        for _ in range(20000)
+    ]
+    queue = HRQuestionQueue(store=storage.EmployeeStore())
+    questions = [
+        " ".join(rng.choice(words) for _ in range(8)) for _ in range(20000)
+    ]
+    started = time.perf_counter()
+    for i, question in enumerate(questions):
+        queue.add(f"E{i}", 0, question)
+    insert_ms = (time.perf_counter() - started) * 1000 / len(questions)
+
+    started = time.perf_counter()
+    for question in questions[:2000]:
+        assert queue.find(question) is not None
+    lookup_ms = (time.perf_counter() - started) * 1000 / 2000
+
+    assert insert_ms < 1.0
+    assert lookup_ms < 1.0
@@ -0,0 +1,134 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+from google.adk import Agent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from customer_service.shared_libraries import callbacks
+from customer_service.shared_libraries.model_router import (
+    CAPABLE,
+    FAST,
+    ModelRouter,
+    classify_turn,
+)
+
+
+def request(text):
+    return LlmRequest(
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])]
+    )
+
+
+@pytest.mark.parametrize(
+    "text, tier",
+    [
+        ("hi", FAST),
+        ("yes please", FAST),
+        ("Thanks, that's all!", FAST),
+        ("yes, schedule the interview for Friday", CAPABLE),
+        ("what is the leave policy for new hires?", CAPABLE),
+        ("can you tell me what happens after the third round of talks", CAPABLE),
+    ],
+)
+def test_classify_turn(text, tier):
+    assert classify_turn(request(text)) == tier
+
+
+def test_tool_results_go_to_capable_tier():
+    req = request("yes")
+    req.contents.append(
+        types.Content(
+            role="user",
+            parts=[
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        name="promote_employee", response={"ok": True}
+                    )
+                )
+            ],
+        )
+    )
+    assert classify_turn(req) == CAPABLE
+
+
+class StubLlm(BaseLlm):
+    """Answers instantly, sleeping longer when asked for the capable model."""
+
+    delays: dict = {}
+
+    async def generate_content_async(self, llm_request, stream=False):
+        await asyncio.sleep(self.delays[llm_request.model])
+        yield LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(text=f"answered by {llm_request.model}")],
+            )
+        )
+
+
+@pytest.mark.asyncio
+async def test_router_dispatches_to_stub_models(monkeypatch):
+    router = ModelRouter(fast_model="stub-fast", capable_model="stub-capable")
+    monkeypatch.setattr(callbacks, "model_router", router)
+    agent = Agent(
+        name="router_test",
+        model=StubLlm(
+            model="stub-capable",
+            delays={"stub-fast": 0.001, "stub-capable": 0.02},
+        ),
+        instruction="test",
+        before_model_callback=callbacks.route_model_callback,
+        after_model_callback=callbacks.record_route_latency,
+    )
+    runner = InMemoryRunner(agent=agent, app_name="router_test")
+    session = await runner.session_service.create_session(
+        app_name="router_test", user_id="u"
+    )
+
+    replies = []
+    for text in ["hi", "please schedule an interview for E001", "thanks"]:
+        async for event in runner.run_async(
+            user_id="u",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=text)]),
+        ):
+            if event.content and event.content.parts:
+                replies.append(event.content.parts[0].text)
+
+    assert replies == [
+        "answered by stub-fast",
+        "answered by stub-capable",
+        "answered by stub-fast",
+    ]
+    stats = router.stats()
+    assert stats[FAST]["calls"] == 2 and stats[CAPABLE]["calls"] == 1
+    assert stats[FAST]["share"] == pytest.approx(2 / 3)
+    assert stats[CAPABLE]["avg_latency_secs"] > stats[FAST]["avg_latency_secs"]
+
+
+def test_latency_samples_are_bounded():
+    router = ModelRouter("fast", "capable")
+    for i in range(5000):
+        router.record(FAST, float(i))
+    router.record(CAPABLE, 1.0)
+
+    stats = router.stats()
+    assert len(router._latencies[FAST]) == 1024
+    assert stats[FAST]["calls"] == 5000
+    assert stats[FAST]["share"] == pytest.approx(5000 / 5001)
+    assert stats[FAST]["p95_latency_secs"] >= 5000 - 1024
@@ -0,0 +1,133 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from customer_service.config import ModelSchedulerModel
+from customer_service.shared_libraries import callbacks
+from customer_service.shared_libraries.model_scheduler import (
+    BUSY_MESSAGE,
+    ModelScheduler,
+)
+from google.adk.models import LlmRequest
+from google.genai import types
+
+
+def user_request(text):
+    return LlmRequest(
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])]
+    )
+
+
+def scheduler(**settings):
+    # 100 calls per second, one at a time, so queueing kicks in at once.
+    settings.setdefault("requests_per_minute", 6000)
+    settings.setdefault("burst", 1)
+    return ModelScheduler(ModelSchedulerModel(**settings))
+
+
+async def acquire_in_order(sched, classes):
+    """Queues `classes` in order; returns the classes in release order."""
+    released = []
+
+    async def one(cls):
+        if await sched.acquire(cls):
+            released.append(cls)
+
+    tasks = []
+    for cls in classes:
+        tasks.append(asyncio.create_task(one(cls)))
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return released
+
+
+def test_classify_by_agent_then_intent():
+    sched = scheduler()
+
+    assert sched.classify("hr_agent", user_request("hello")) == "hr"
+    assert sched.classify("interview_agent", user_request("")) == "interview"
+    assert (
+        sched.classify("router", user_request("What is the leave policy?"))
+        == "hr"
+    )
+    assert (
+        sched.classify("router", user_request("Schedule my interview; PTO?"))
+        == "interview"
+    )
+    assert sched.classify("router", user_request("hi there")) == "general"
+
+
+@pytest.mark.asyncio
+async def test_weighted_fair_queuing_favours_heavier_classes():
+    sched = scheduler()
+
+    released = await acquire_in_order(
+        sched, ["hr"] * 20 + ["interview"] * 4
+    )
+
+    # The first call takes the only token; the four interview calls queued
+    # behind twenty FAQ calls still go out within the next few releases.
+    assert len(released) == 24
+    assert max(i for i, c in enumerate(released) if c == "interview") < 8
+    stats = sched.stats()
+    assert stats["interview"]["delay_p95_ms"] < stats["hr"]["delay_p95_ms"]
+    assert stats["hr"]["admitted"] == 20 and stats["hr"]["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_lower_priority_work():
+    sched = scheduler(requests_per_minute=60, max_queue_depth=2)
+
+    assert await sched.acquire("hr")  # takes the token
+    first = asyncio.create_task(sched.acquire("hr"))
+    second = asyncio.create_task(sched.acquire("hr"))
+    await asyncio.sleep(0)
+    interview = asyncio.create_task(sched.acquire("interview"))
+    await asyncio.sleep(0)
+    # The queue is full of calls at least as important as this one.
+    assert not await sched.acquire("hr")
+
+    assert not await second  # newest FAQ call displaced
+    assert not first.done() and not interview.done()
+    assert sched.stats()["hr"]["shed"] == 2
+    for task in (first, interview):
+        task.cancel()
+    await asyncio.gather(first, interview, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_call_is_shed_after_its_max_wait():
+    sched = scheduler(requests_per_minute=6, max_wait_secs={"hr": 0.05})
+
+    assert await sched.acquire("hr")
+    assert not await sched.acquire("hr")
+    stats = sched.stats()["hr"]
+    assert (stats["admitted"], stats["shed"], stats["waiting"]) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_shed_call_is_answered_without_the_model(monkeypatch):
+    monkeypatch.setattr(
+        callbacks, "model_scheduler", scheduler(max_queue_depth=0)
+    )
+    context = SimpleNamespace(agent_name="hr_agent", state={})
+    request = user_request("How many vacation days do I get?")
+
+    assert await callbacks.schedule_model_call(context, request) is None
+    response = await callbacks.schedule_model_call(context, request)
+
+    assert response.content.parts[0].text == BUSY_MESSAGE
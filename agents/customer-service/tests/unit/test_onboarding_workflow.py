@@ -0,0 +1,255 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from customer_service.entities.customer import Employee
+from customer_service.shared_libraries import audit_log, callbacks, storage
+from customer_service.shared_libraries import onboarding_workflow as wf
+from customer_service.shared_libraries.audit_log import AuditLog
+from customer_service.shared_libraries.storage import EmployeeStore
+from customer_service.tools import tools
+
+
+class Recorder:
+    """Provisioner factory that logs start/end times and fails on demand."""
+
+    def __init__(self):
+        self.events = []
+        self.failures = {}
+
+    def step(self, name, seconds=0.05):
+        async def provision(employee_id, role, start_date):
+            self.events.append((name, "start", time.perf_counter()))
+            await asyncio.sleep(seconds)
+            if self.failures.get(name, 0) > 0:
+                self.failures[name] -= 1
+                raise RuntimeError(f"{name} backend down")
+            self.events.append((name, "end", time.perf_counter()))
+
+        return provision
+
+    def time_of(self, name, kind):
+        return next(t for n, k, t in self.events if n == name and k == kind)
+
+
+@pytest.fixture
+def employees():
+    store = EmployeeStore()
+    store.put(Employee.get_customer("E001"))
+    return store
+
+
+def make_engine(employees, recorder, path=":memory:", **kwargs):
+    steps = [
+        wf.Step("create_accounts", recorder.step("create_accounts")),
+        wf.Step(
+            "grant_system_access",
+            recorder.step("grant_system_access"),
+            ("create_accounts",),
+        ),
+        wf.Step("enroll_benefits", recorder.step("enroll_benefits", 0.1)),
+        wf.Step(
+            "schedule_orientation",
+            recorder.step("schedule_orientation"),
+            ("create_accounts",),
+        ),
+    ]
+    kwargs.setdefault("backoff_base_secs", 0.01)
+    return wf.OnboardingEngine(
+        wf.WorkflowStore(path), employees, steps, **kwargs
+    )
+
+
+def test_independent_steps_run_concurrently(employees):
+    recorder = Recorder()
+    engine = make_engine(employees, recorder)
+    workflow_id = engine.start("e001", "cashier", "2025-05-01")
+    record = engine.wait(workflow_id, timeout=5)
+
+    assert record["status"] == wf.DONE
+    # Benefits has no dependencies and overlaps the account chain.
+    assert recorder.time_of("enroll_benefits", "start") < recorder.time_of(
+        "create_accounts", "end"
+    )
+    # Dependent steps wait for their prerequisite.
+    for name in ("grant_system_access", "schedule_orientation"):
+        assert recorder.time_of(name, "start") >= recorder.time_of(
+            "create_accounts", "end"
+        )
+    employee = employees.get("E001")
+    assert employee.status == "Onboarded"
+    assert employee.onboarding.start_date == "2025-05-01"
+    assert employee.onboarding.system_access_granted
+    assert employee.onboarding.benefits_package
+    assert employee.onboarding.orientation_scheduled
+
+
+def test_failed_steps_are_retried_then_skip_dependents(employees):
+    recorder = Recorder()
+    recorder.failures = {"enroll_benefits": 1, "create_accounts": 5}
+    engine = make_engine(employees, recorder, max_attempts=3)
+    record = engine.wait(engine.start("E001", "cashier", "2025-05-01"), 5)
+
+    steps = record["steps"]
+    assert record["status"] == wf.FAILED
+    assert steps["enroll_benefits"]["state"] == wf.DONE
+    assert steps["enroll_benefits"]["attempts"] == 2
+    assert steps["create_accounts"]["state"] == wf.FAILED
+    assert steps["create_accounts"]["attempts"] == 3
+    assert "backend down" in steps["create_accounts"]["error"]
+    assert steps["grant_system_access"]["state"] == wf.SKIPPED
+    employee = employees.get("E001")
+    assert employee.status == "Hired"
+    assert employee.onboarding.benefits_package
+    assert not employee.onboarding.system_access_granted
+
+
+def test_unfinished_workflow_resumes_without_redoing_steps(
+    employees, tmp_path
+):
+    path = str(tmp_path / "workflows.db")
+    store = wf.WorkflowStore(path)
+    workflow_id = store.create(
+        "E001",
+        "cashier",
+        "2025-05-01",
+        [
+            "create_accounts",
+            "grant_system_access",
+            "enroll_benefits",
+            "schedule_orientation",
+        ],
+    )
+    record = store.get(workflow_id)
+    record["steps"]["create_accounts"]["state"] = wf.DONE
+    record["steps"]["enroll_benefits"]["state"] = wf.RUNNING
+    store.save(workflow_id, wf.RUNNING, record["steps"])
+
+    recorder = Recorder()
+    engine = make_engine(employees, recorder, path)
+    assert engine.resume_unfinished() == [workflow_id]
+    assert engine.wait(workflow_id, 5)["status"] == wf.DONE
+    started = [n for n, kind, _ in recorder.events if kind == "start"]
+    assert "create_accounts" not in started
+    assert "enroll_benefits" in started
+
+
+def test_only_existing_hired_employees_are_onboarded(employees):
+    recorder = Recorder()
+    engine = make_engine(employees, recorder)
+    applicant = employees.get("E001")
+    applicant.employee_id, applicant.status = "E002", "Applicant"
+    employees.put(applicant)
+
+    with pytest.raises(ValueError, match="not found"):
+        engine.start("E404", "cashier", "2025-05-01")
+    with pytest.raises(ValueError, match="hired"):
+        engine.start("e002", "cashier", "2025-05-01")
+
+    # Terminated while provisioning: the steps finish, onboarding does not.
+    workflow_id = engine.start("E001", "cashier", "2025-05-01")
+    employees.update(
+        "E001", lambda e: e.update_employee_status("Terminated") or True
+    )
+    assert engine.wait(workflow_id, 5)["status"] == wf.DONE
+    employee = employees.get("E001")
+    assert employee.status == "Terminated"
+    assert employee.onboarding.system_access_granted
+
+
+def test_hired_through_the_agent_can_be_onboarded(employees, tmp_path):
+    # The real callback lowercases the arguments of both tool calls.
+    applicant = employees.get("E001")
+    applicant.status = "Interviewed"
+    employees.put(applicant)
+    engine = make_engine(employees, Recorder())
+    log = AuditLog(str(tmp_path))
+    context = SimpleNamespace(
+        state={}, invocation_id="inv-1", agent_name="onboarding_agent"
+    )
+
+    def call(tool, **args):
+        tool_ref = SimpleNamespace(name=tool.__name__)
+        callbacks.before_tool(tool_ref, args, context)
+        return tool(**args)
+
+    storage.set_store(employees)
+    audit_log.set_audit_log(log)
+    wf.set_onboarding_engine(engine)
+    try:
+        call(tools.update_employee_status, candidate_id="E001", status="Hired")
+        result = call(
+            tools.start_onboarding,
+            candidate_id="E001",
+            role="Cashier",
+            start_date="2025-05-01",
+        )
+        assert result["status"] == "onboarding_started"
+        assert engine.wait(result["onboarding_id"], 5)["status"] == wf.DONE
+    finally:
+        wf.set_onboarding_engine(None)
+        audit_log.set_audit_log(None)
+        storage.set_store(None)
+        log.close()
+
+    assert employees.get("E001").status == "Onboarded"
+
+    # Rows written before statuses were canonicalized still pass the gate.
+    legacy = employees.get("E001").model_copy(
+        update={"employee_id": "E003", "status": "hired"}
+    )
+    employees.insert_rows(
+        [("E003", "hired", "", 1, legacy.model_dump_json())]
+    )
+    workflow_id = engine.start("e003", "cashier", "2025-05-01")
+    assert engine.wait(workflow_id, 5)["status"] == wf.DONE
+    assert employees.get("E003").status == "Onboarded"
+
+
+def test_dependency_cycles_are_rejected():
+    noop = wf.simulated_provisioner(0)
+    with pytest.raises(ValueError):
+        wf.validate_dag([wf.Step("a", noop, ("b",)), wf.Step("b", noop, ("a",))])
+    with pytest.raises(ValueError):
+        wf.validate_dag([wf.Step("a", noop, ("missing",))])
+
+
+def test_start_onboarding_tool_returns_before_provisioning(employees):
+    engine = make_engine(employees, Recorder())
+    wf.set_onboarding_engine(engine)
+    try:
+        started = time.perf_counter()
+        result = tools.start_onboarding("e001", "cashier", "2025-05-01")
+        assert time.perf_counter() - started < 0.05
+        assert result["status"] == "onboarding_started"
+
+        onboarding_id = result["onboarding_id"]
+        assert tools.get_onboarding_status(onboarding_id)["status"] in (
+            wf.PENDING,
+            wf.RUNNING,
+        )
+        engine.wait(onboarding_id, 5)
+        status = tools.get_onboarding_status(onboarding_id)
+        assert status["status"] == wf.DONE
+        assert status["candidate_id"] == "E001"
+        assert set(status["steps"]) == {s.name for s in engine.steps}
+        assert tools.get_onboarding_status("nope")["status"] == "not_found"
+        rejected = tools.start_onboarding("e404", "cashier", "2025-05-01")
+        assert rejected["status"] == "not_started"
+    finally:
+        wf.set_onboarding_engine(None)
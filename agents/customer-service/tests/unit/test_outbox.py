@@ -0,0 +1,239 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import threading
+from email import message_from_bytes
+
+import pytest
+from customer_service.entities.customer import Employee
+from customer_service.shared_libraries import outbox as outbox_module
+from customer_service.shared_libraries import storage
+from customer_service.shared_libraries.outbox import (
+    Outbox,
+    OutboxWorker,
+    SmtpPool,
+)
+from customer_service.tools import tools
+
+
+class LocalSmtpServer:
+    """Minimal SMTP server on localhost that records received messages."""
+
+    def __init__(self, reject_first: int = 0):
+        self.messages = []
+        self.connections = 0
+        self.reject_first = reject_first
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever)
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._session, "127.0.0.1", 0), self._loop
+        ).result()
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _session(self, reader, writer):
+        self.connections += 1
+
+        async def reply(line):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply("220 localhost ESMTP stand-in")
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                await reply("250 localhost")
+            elif command.startswith("DATA"):
+                await reply("354 end with <CRLF>.<CRLF>")
+                data = b""
+                while (chunk := await reader.readline()) != b".\r\n":
+                    data += chunk
+                if self.reject_first > 0:
+                    self.reject_first -= 1
+                    await reply("451 try again later")
+                else:
+                    self.messages.append(message_from_bytes(data))
+                    await reply("250 queued")
+            elif command.startswith("QUIT"):
+                await reply("221 bye")
+                break
+            else:  # MAIL, RCPT, RSET, NOOP
+                await reply("250 ok")
+        writer.close()
+
+    def close(self):
+        self._server.close()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+@pytest.fixture
+def smtp_server():
+    server = LocalSmtpServer()
+    yield server
+    server.close()
+
+
+def make_worker(outbox, server, **kwargs):
+    return OutboxWorker(
+        outbox,
+        SmtpPool("127.0.0.1", server.port, size=2),
+        "onboarding@cymbal.example",
+        backoff_base_secs=0,
+        **kwargs,
+    )
+
+
+def fill(outbox, n):
+    for i in range(n):
+        outbox.enqueue(
+            "interview_invite",
+            f"cand{i}@example.com",
+            "Interview",
+            f"Slot {i}",
+            dedup_key=f"invite:{i}",
+        )
+
+
+@pytest.mark.asyncio
+async def test_batches_are_delivered_over_pooled_connections(smtp_server):
+    outbox = Outbox()
+    fill(outbox, 30)
+    worker = make_worker(outbox, smtp_server, batch_size=20)
+
+    assert await worker.run_once() == 20
+    assert await worker.run_once() == 10
+    assert await worker.run_once() == 0
+
+    stats = worker.stats()
+    assert stats["queue_depth"] == 0 and stats["sent"] == 30
+    assert stats["delivered_per_sec"] > 0
+    # Two pooled connections carried all 30 messages.
+    assert smtp_server.connections == 2
+    assert len(smtp_server.messages) == 30
+    ids = {m["Message-ID"] for m in smtp_server.messages}
+    assert len(ids) == 30
+    worker.pool.close()
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_dropped_and_failures_retried():
+    server = LocalSmtpServer(reject_first=2)
+    try:
+        outbox = Outbox()
+        fill(outbox, 3)
+        fill(outbox, 3)  # same dedup keys: ignored
+        assert outbox.depth() == 3
+
+        worker = make_worker(outbox, server, max_attempts=2)
+        assert await worker.run_once() == 1
+        assert outbox.counts()["pending"] == 2
+        assert await worker.run_once() == 2
+        assert len(server.messages) == 3
+        worker.pool.close()
+    finally:
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    server = LocalSmtpServer(reject_first=10)
+    try:
+        outbox = Outbox()
+        fill(outbox, 1)
+        worker = make_worker(outbox, server, max_attempts=2)
+        await worker.run_once()
+        await worker.run_once()
+        assert outbox.counts() == {"pending": 0, "sent": 0, "failed": 1}
+        worker.pool.close()
+    finally:
+        server.close()
+
+
+def test_claimed_notifications_are_leased():
+    outbox = Outbox(lease_secs=60)
+    fill(outbox, 5)
+    assert len(outbox.claim(3)) == 3
+    assert [n.dedup_key for n in outbox.claim(10)] == ["invite:3", "invite:4"]
+    assert outbox.claim(10) == []
+
+
+def test_failed_mark_sent_is_rolled_back():
+    outbox = Outbox()
+    fill(outbox, 1)
+    with pytest.raises(Exception):
+        outbox.mark_sent([object()])  # not bindable
+    # No transaction is left open on the shared connection.
+    assert [n.dedup_key for n in outbox.claim(10)] == ["invite:0"]
+    outbox.mark_sent([1])
+    assert outbox.counts()["sent"] == 1
+
+
+def test_worker_survives_a_failing_batch(smtp_server):
+    outbox = Outbox()
+    fill(outbox, 2)
+    worker = make_worker(outbox, smtp_server, poll_interval_secs=0.01)
+    claim, calls = outbox.claim, []
+
+    def flaky_claim(limit):
+        calls.append(limit)
+        if len(calls) <= 2:
+            raise RuntimeError("database is locked")
+        return claim(limit)
+
+    outbox.claim = flaky_claim
+    thread = threading.Thread(target=asyncio.run, args=(worker.run(),))
+    thread.start()
+    while worker.delivered < 2 and thread.is_alive():
+        threading.Event().wait(0.01)
+    worker.stop()
+    thread.join(5)
+
+    assert worker.delivered == 2
+    assert len(smtp_server.messages) == 2
+
+
+def test_stop_from_another_thread_wakes_the_idle_worker(smtp_server):
+    worker = make_worker(Outbox(), smtp_server, poll_interval_secs=60)
+    thread = threading.Thread(target=asyncio.run, args=(worker.run(),))
+    thread.start()
+    while worker._stop is None:
+        threading.Event().wait(0.01)
+
+    worker.stop()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    worker.stop()  # after run returned: a no-op
+
+
+def test_tools_enqueue_without_sending():
+    store = storage.EmployeeStore()
+    store.put(Employee.get_customer("E001"))
+    storage.set_store(store)
+    outbox = Outbox()
+    outbox_module.set_outbox(outbox)
+    try:
+        tools.schedule_interview("e001", "2025-04-01", "10:00 am")
+        tools.schedule_interview("E001", "2025-04-01", "10:00 am")
+        tools.promote_employee("e001")
+        tools.promote_employee("unknown")
+        batch = outbox.claim(10)
+        assert [n.kind for n in batch] == ["interview_invite", "promotion"]
+        assert {n.recipient for n in batch} == {"john.doe@example.com"}
+        assert batch[1].dedup_key.startswith("promotion:E001:final_interview:")
+    finally:
+        outbox_module.set_outbox(None)
+        storage.set_store(None)
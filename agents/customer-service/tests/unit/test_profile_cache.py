@@ -0,0 +1,114 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from customer_service.entities.customer import Employee
+from customer_service.shared_libraries import callbacks, storage
+from customer_service.shared_libraries import profile_cache
+from customer_service.shared_libraries.profile_cache import ProfileCache
+from customer_service.tools import tools
+
+
+def make_employee(employee_id):
+    employee = Employee.get_customer("E001")
+    employee.employee_id = employee_id
+    return employee
+
+
+@pytest.fixture
+def store():
+    store = storage.EmployeeStore()
+    store.put_many(make_employee(f"E{i:03d}") for i in range(1, 6))
+    storage.set_store(store)
+    profile_cache.set_profile_cache(None)
+    yield store
+    profile_cache.set_profile_cache(None)
+    storage.set_store(None)
+
+
+def test_second_lookup_is_a_hit(store):
+    cache = ProfileCache(store)
+
+    first = cache.get("e001")
+    second = cache.get("E001")
+
+    assert second is first
+    assert json.loads(first.json)["employee_id"] == "E001"
+    assert cache.get("E999") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_tool_write_invalidates_only_that_employee(store):
+    cache = profile_cache.get_profile_cache()
+    old = cache.get("E001")
+    other = cache.get("E002")
+
+    tools.update_employee_status("e001", "Hired")
+
+    assert cache.stats()["invalidations"] == 1
+    assert json.loads(cache.get("E001").json)["status"] == "Hired"
+    assert cache.get("E001") is not old
+    assert cache.get("E002") is other
+
+
+def test_write_from_another_process_is_seen_through_the_version(tmp_path):
+    path = str(tmp_path / "roster.db")
+    store = storage.EmployeeStore(path)
+    store.put(make_employee("E001"))
+    cache = ProfileCache(store)
+    cache.get("E001")
+
+    # A batch job writes through its own connection, bypassing the listener.
+    job_store = storage.EmployeeStore(path)
+    employee = job_store.get("E001")
+    employee.status = "Agent"
+    job_store.put(employee)
+
+    assert cache.get("E001").employee.status == "Agent"
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction_is_bounded_by_bytes(store):
+    size = ProfileCache(store).get("E001").size
+    cache = ProfileCache(store, max_bytes=size * 3)
+
+    for employee_id in ("E001", "E002", "E003"):
+        cache.get(employee_id)
+    cache.get("E001")  # most recently used again
+    cache.get("E004")
+
+    assert cache.bytes <= size * 3
+    assert cache.stats()["evictions"] == 1
+    hits = cache.stats()["hits"]
+    cache.get("E001")
+    assert cache.stats()["hits"] == hits + 1
+    cache.get("E002")
+    assert cache.stats()["hits"] == hits + 1
+
+
+def test_session_start_reads_profile_through_the_cache(store):
+    for _ in range(3):
+        context = SimpleNamespace(state={})
+        callbacks.before_agent(context)
+
+    profile = json.loads(context.state["customer_profile"])
+    assert profile["employee_id"] == "E001"
+    stats = profile_cache.get_profile_cache().stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["saved_ms"] >= 0
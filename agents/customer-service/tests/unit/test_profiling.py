@@ -0,0 +1,143 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+from types import SimpleNamespace
+
+from customer_service.config import ProfilingModel
+from customer_service.shared_libraries import profiling
+
+
+def make_context(session_id="s1", invocation_id="inv-1", state=None):
+    return SimpleNamespace(
+        session=SimpleNamespace(id=session_id),
+        invocation_id=invocation_id,
+        agent_name="router",
+        state=state or {},
+    )
+
+
+def make_tool(name):
+    return SimpleNamespace(name=name)
+
+
+def busy(secs=0.05):
+    deadline = time.perf_counter() + secs
+    while time.perf_counter() < deadline:
+        sum(i * i for i in range(1000))
+
+
+def hooks(tmp_path, **settings):
+    callbacks = profiling.instrument(
+        {"before_tool_callback": lambda **_: None},
+        ProfilingModel(enabled=True, directory=str(tmp_path), **settings),
+    )
+    return {
+        name: callbacks[f"{name}_callback"][0 if "after" in name else -1]
+        for name in ("before_agent", "after_agent", "before_tool", "after_tool")
+    }
+
+
+def files(tmp_path, session_id="s1"):
+    directory = tmp_path / session_id
+    return sorted(os.listdir(directory)) if directory.exists() else []
+
+
+def test_disabled_leaves_callbacks_untouched():
+    callbacks = {"before_tool_callback": object()}
+    assert profiling.instrument(callbacks, ProfilingModel()) is callbacks
+
+
+def test_enabled_wraps_existing_callbacks(tmp_path):
+    before = object()
+    callbacks = profiling.instrument(
+        {"before_tool_callback": before},
+        ProfilingModel(enabled=True, directory=str(tmp_path)),
+    )
+    assert callbacks["before_tool_callback"][0] is before
+    assert len(callbacks["before_tool_callback"]) == 2
+    assert len(callbacks["after_agent_callback"]) == 1
+
+
+def test_listed_session_profiles_the_turn(tmp_path):
+    h = hooks(tmp_path, sessions=["s1"], tracemalloc=True)
+    ctx = make_context()
+
+    h["before_agent"](ctx)
+    busy()
+    h["after_agent"](ctx)
+
+    names = files(tmp_path)
+    assert {os.path.splitext(n)[1] for n in names} == {".prof", ".txt"}
+    alloc = [n for n in names if n.endswith(".alloc.txt")]
+    summary = [n for n in names if n.endswith("turn-router.txt")]
+    assert alloc and summary
+    assert "busy" in (tmp_path / "s1" / summary[0]).read_text()
+    assert not profiling.tracemalloc.is_tracing()
+
+
+def test_listed_tool_is_profiled_alone(tmp_path):
+    h = hooks(tmp_path, tools=["start_onboarding"])
+    ctx = make_context()
+
+    h["before_agent"](ctx)
+    for name in ("find_employee", "start_onboarding"):
+        h["before_tool"](make_tool(name), {}, ctx)
+        busy(0.01)
+        h["after_tool"](make_tool(name), {}, ctx, {})
+    h["after_agent"](ctx)
+
+    assert files(tmp_path) and all(
+        "tool-start_onboarding" in name for name in files(tmp_path)
+    )
+
+
+def test_session_state_switch_with_sampling(tmp_path):
+    h = hooks(tmp_path, mode="sampling", sampling_interval_secs=0.001)
+    ctx = make_context(session_id="s2", state={"profiling": True})
+
+    h["before_agent"](ctx)
+    busy(0.1)
+    h["after_agent"](ctx)
+
+    folded = [n for n in files(tmp_path, "s2") if n.endswith(".folded")]
+    assert folded
+    assert "busy" in (tmp_path / "s2" / folded[0]).read_text()
+
+
+def test_unselected_traffic_is_not_profiled(tmp_path):
+    h = hooks(tmp_path, sessions=["other"], sample_rate=0.0)
+    ctx = make_context()
+
+    h["before_agent"](ctx)
+    h["before_tool"](make_tool("find_employee"), {}, ctx)
+    h["after_tool"](make_tool("find_employee"), {}, ctx, {})
+    h["after_agent"](ctx)
+
+    assert not tmp_path.joinpath("s1").exists()
+
+
+def test_tool_error_releases_the_profiler(tmp_path):
+    callbacks = profiling.instrument(
+        {}, ProfilingModel(enabled=True, directory=str(tmp_path), tools=["t"])
+    )
+    ctx = make_context()
+    callbacks["before_tool_callback"][-1](make_tool("t"), {}, ctx)
+    callbacks["on_tool_error_callback"][0](
+        make_tool("t"), {}, ctx, RuntimeError("boom")
+    )
+
+    assert files(tmp_path)
+    assert not profiling._cprofile_lock.locked()
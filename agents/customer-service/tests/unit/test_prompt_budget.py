@@ -0,0 +1,74 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Prompt size regression checks: raise a budget only on purpose."""
+
+import inspect
+import logging
+
+import pytest
+from customer_service import agent
+from customer_service.prompts import GLOBAL_INSTRUCTION
+from customer_service.shared_libraries.history import estimate_tokens
+from customer_service.shared_libraries.prompt_assembly import (
+    assemble,
+    tool_signature,
+)
+
+# Estimated tokens of each agent's rendered instruction.
+PROMPT_TOKEN_BUDGETS = {
+    "router": 160,
+    "interview_agent": 380,
+    "onboarding_agent": 280,
+    "hr_agent": 130,
+}
+GLOBAL_INSTRUCTION_BUDGET = 150
+
+
+@pytest.mark.parametrize("name, budget", PROMPT_TOKEN_BUDGETS.items())
+def test_instruction_within_budget(name, budget):
+    prompt = agent.PROMPTS[name]
+    logging.info("%s: %s", name, prompt.section_tokens)
+    assert prompt.total_tokens <= budget, prompt.section_tokens
+
+
+def test_global_instruction_within_budget():
+    assert estimate_tokens(GLOBAL_INSTRUCTION) <= GLOBAL_INSTRUCTION_BUDGET
+
+
+@pytest.mark.parametrize(
+    "sub_agent",
+    [agent.interview_agent, agent.onboarding_agent, agent.hr_agent],
+    ids=lambda a: a.name,
+)
+def test_tool_section_matches_registered_tools(sub_agent):
+    for tool in sub_agent.tools:
+        assert f"`{tool_signature(tool)}`" in sub_agent.instruction
+        for param in inspect.signature(tool).parameters:
+            assert f"{param}:" in sub_agent.instruction
+
+
+def test_tool_signature_and_rendering_are_cached():
+    def evaluate(candidate_id: str, marks: int, tool_context=None) -> dict:
+        """Scores an interview.
+
+        More details.
+        """
+
+    assert tool_signature(evaluate) == "evaluate(candidate_id: str, marks: int)"
+    first = assemble("t", "## Tools\n$tools", [evaluate])
+    assert first is assemble("t", "## Tools\n$tools", [evaluate])
+    assert "Scores an interview." in first.text
+    assert "More details" not in first.text
+    assert set(first.section_tokens) == {"preamble", "Tools"}
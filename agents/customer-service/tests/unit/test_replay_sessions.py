@@ -0,0 +1,79 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from benchmarks import replay_sessions
+from customer_service.config import ModelSchedulerModel
+from customer_service.shared_libraries import callbacks
+from customer_service.shared_libraries.model_scheduler import ModelScheduler
+
+TRACE = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "..",
+    "eval",
+    "sessions",
+    "onboarding.session.json",
+)
+
+
+def test_load_turns_groups_model_contents_per_user_message():
+    turns = replay_sessions.load_turns(TRACE)
+    assert turns[0]["query"] == "hi"
+    # Function responses are re-produced by the real tools, not replayed.
+    assert [len(t["model"]) for t in turns[:3]] == [1, 2, 2]
+
+
+def test_replay_runs_real_tools_on_the_owning_agent(monkeypatch):
+    monkeypatch.setattr(callbacks, "RPM_QUOTA", 10**9)
+    monkeypatch.setattr(
+        callbacks,
+        "model_scheduler",
+        ModelScheduler(ModelSchedulerModel(burst=10**9)),
+    )
+    results = replay_sessions.measure(TRACE, repeats=1)
+
+    tools_called = set()
+    for turn in results:
+        assert turn["latency_ms"] > 0 and turn["alloc_kib"] > 0
+        tools_called |= {
+            name for name in turn["breakdown_ms"] if name.startswith("tool:")
+        }
+    assert {
+        "tool:add_applicant_and_prompt_interview",
+        "tool:start_onboarding",
+        "tool:ask_hr_question",
+    } <= tools_called
+    assert "callback:before_tool" in results[1]["breakdown_ms"]
+
+
+def test_diff_flags_exceeded_budgets():
+    measured = {
+        "s": [
+            {
+                "turn": 0,
+                "latency_ms": 12.0,
+                "alloc_kib": 50.0,
+                "breakdown_ms": {"tool:x": 9.0},
+            },
+            {"turn": 1, "latency_ms": 1.0, "alloc_kib": 1.0},
+        ]
+    }
+    budgets = {"sessions": {"s": [{"latency_ms": 10.0, "alloc_kib": 100.0}]}}
+    lines = replay_sessions.diff(measured, budgets)
+    assert lines[0].startswith("FAIL") and "+20%" in lines[0]
+    assert lines[1].startswith("ok")
+    assert "tool:x" in lines[2]
+    assert lines[3].startswith("NEW")
@@ -0,0 +1,106 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from types import SimpleNamespace
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from customer_service.shared_libraries import callbacks
+from customer_service.shared_libraries.response_cache import ResponseCache
+
+
+def request(*texts, instruction="You are Project Pro."):
+    contents = [
+        types.Content(
+            role="user" if i % 2 == 0 else "model",
+            parts=[types.Part(text=text)],
+        )
+        for i, text in enumerate(texts)
+    ]
+    return LlmRequest(
+        model="gemini-2.0-flash-001",
+        contents=contents,
+        config=types.GenerateContentConfig(system_instruction=instruction),
+    )
+
+
+def reply(text):
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)])
+    )
+
+
+def test_normalized_requests_share_a_key():
+    cache = ResponseCache()
+    assert cache.key(request("Hi!")) == cache.key(request("  hi,"))
+    assert cache.key(request("hi")) != cache.key(request("hello"))
+    assert cache.key(request("hi")) != cache.key(
+        request("hi", instruction="Other agent")
+    )
+
+
+def test_tool_turns_bypass_the_cache():
+    cache = ResponseCache()
+    req = request("schedule it")
+    req.contents.append(
+        types.Content(
+            role="user",
+            parts=[
+                types.Part(
+                    function_response=types.FunctionResponse(
+                        name="schedule_interview", response={"ok": True}
+                    )
+                )
+            ],
+        )
+    )
+    assert cache.lookup(req) == (None, None)
+    assert cache.stats()["bypasses"] == 1
+
+
+def test_lru_and_ttl_eviction(monkeypatch):
+    cache = ResponseCache(max_entries=2, ttl_seconds=10)
+    now = [1000.0]
+    monkeypatch.setattr("time.time", lambda: now[0])
+    for key in ("a", "b"):
+        cache.put(key, reply(key), latency=1.0)
+    cache.get("a")
+    cache.put("c", reply("c"), latency=1.0)
+    assert cache.get("b") is None
+    assert cache.get("a").content.parts[0].text == "a"
+
+    now[0] += 11
+    assert cache.get("c") is None
+    stats = cache.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+    assert stats["latency_saved_secs"] == 2.0
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    ResponseCache(disk_path=str(tmp_path)).put("k", reply("hello"), 0.5)
+    cache = ResponseCache(disk_path=str(tmp_path))
+    assert cache.get("k").content.parts[0].text == "hello"
+
+
+def test_callbacks_store_then_answer(monkeypatch):
+    cache = ResponseCache()
+    monkeypatch.setattr(callbacks, "response_cache", cache)
+    first = SimpleNamespace(state={})
+    assert callbacks.response_cache_lookup(first, request("hi")) is None
+    callbacks.response_cache_store(first, reply("Hello there!"))
+
+    second = SimpleNamespace(state={})
+    hit = callbacks.response_cache_lookup(second, request("Hi"))
+    assert hit.content.parts[0].text == "Hello there!"
+    assert cache.stats()["hit_rate"] == 0.5
@@ -0,0 +1,113 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pytest
+from customer_service.entities.customer import Address, Employee, JobApplication
+from customer_service.shared_libraries.search_index import (
+    TrigramIndex,
+    get_employee_index,
+    reset_employee_index,
+)
+from customer_service.shared_libraries.storage import EmployeeStore, set_store
+from customer_service.tools.tools import (
+    add_applicant_and_prompt_interview,
+    find_employee,
+    update_employee_status,
+)
+
+
+def make_employee(employee_id, first, last, role, status="Applicant"):
+    return Employee(
+        employee_id=employee_id,
+        first_name=first,
+        last_name=last,
+        email=f"{first}.{last}@example.com".lower(),
+        phone_number="000-000-0000",
+        job_applications=[
+            JobApplication(
+                job_id="J1",
+                position=role,
+                application_date="2025-04-01",
+                status="Submitted",
+                resume="",
+            )
+        ],
+        interviews=[],
+        address=Address(street="", city="", state="", zip=""),
+        status=status,
+    )
+
+
+@pytest.fixture
+def store():
+    store = EmployeeStore()
+    set_store(store)
+    reset_employee_index()
+    yield store
+    set_store(None)
+    reset_employee_index()
+
+
+def test_search_ranks_closest_match_first():
+    index = TrigramIndex()
+    index.add_many(
+        [
+            make_employee("E1", "John", "Doe", "Cashier"),
+            make_employee("E2", "Jane", "Doe", "Gardener"),
+            make_employee("E3", "Mary", "Smith", "Cashier"),
+        ]
+    )
+    results = index.search("Jon Doe cashier")
+    assert [r.employee_id for r in results] == ["E1"]
+    assert results[0].score < 1.0
+
+    results = index.search("doe")
+    assert {r.employee_id for r in results} == {"E1", "E2"}
+
+
+def test_search_reflects_updates_and_removals():
+    index = TrigramIndex()
+    index.add(make_employee("E1", "John", "Doe", "Cashier"))
+    index.add(make_employee("E1", "John", "Doe", "Florist", status="Hired"))
+    assert index.search("cashier", min_score=0.6) == []
+    assert index.search("florist")[0].status == "Hired"
+    index.remove("e1")
+    assert index.search("john doe") == []
+    assert len(index) == 0
+
+
+def test_find_employee_tracks_tool_writes(store):
+    created = add_applicant_and_prompt_interview(
+        "jon doe", "jon.doe@example.com", "cashier"
+    )
+    result = find_employee("Jon Doe cashier")
+    assert result["matches"][0]["candidate_id"] == created["candidate_id"]
+    assert result["matches"][0]["status"] == "Applicant"
+
+    # Tool arguments arrive lowercased from `before_tool`.
+    update_employee_status(created["candidate_id"].lower(), "Interviewed")
+    result = find_employee("jon.doe@example.com")
+    assert result["matches"][0]["status"] == "Interviewed"
+
+
+def test_reset_unsubscribes_the_dropped_index(store):
+    first = get_employee_index()
+    reset_employee_index()
+    second = get_employee_index()
+
+    store.put(make_employee("E9", "Ann", "Lee", "Cashier"))
+
+    assert len(first) == 0 and len(second) == 1
+    assert update_employee_status("e404", "Hired")["status"] == "not_found"
+    assert store.get("E404") is None
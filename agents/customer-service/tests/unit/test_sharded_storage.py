@@ -0,0 +1,267 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from collections import Counter
+
+import pytest
+from customer_service.config import StorageModel
+from customer_service.entities.customer import Employee
+from customer_service.jobs import reshard
+from customer_service.shared_libraries import sharded_storage, storage
+from customer_service.shared_libraries.sharded_storage import (
+    ShardedEmployeeStore,
+    shard_of,
+)
+from customer_service.shared_libraries.storage import (
+    EmployeeStore,
+    open_store,
+)
+from customer_service.tools import tools
+
+FAST = StorageModel(layout_refresh_secs=0)
+
+
+def employees(count):
+    base = Employee.get_customer("E001")
+    for index in range(count):
+        employee = base.model_copy(deep=True)
+        employee.employee_id = f"c{index:05d}"
+        employee.status = ("Hired", "Agent", "Applicant")[index % 3]
+        yield employee
+
+
+def test_jump_hash_spreads_ids_and_moves_few_when_growing():
+    ids = [f"C{i:05d}" for i in range(6000)]
+
+    spread = Counter(shard_of(i, 4) for i in ids)
+    moved = sum(shard_of(i, 4) != shard_of(i, 5) for i in ids)
+
+    assert sorted(spread) == [0, 1, 2, 3]
+    assert min(spread.values()) > 1300
+    # Growing 4 -> 5 moves about a fifth, all of it to the new shard.
+    assert 1000 < moved < 1400
+    assert all(
+        shard_of(i, 5) == 4 for i in ids if shard_of(i, 4) != shard_of(i, 5)
+    )
+    assert shard_of("c00001", 4) == shard_of(" C00001 ", 4)
+
+
+def test_sharded_store_answers_like_a_single_store():
+    plain, sharded = EmployeeStore(), ShardedEmployeeStore(":memory:", 4)
+    seen = []
+    sharded.add_listener(lambda e: seen.append(e.employee_id))
+    for store in (plain, sharded):
+        store.put_many(employees(300))
+        store.put(store.get("c00007").model_copy(update={"status": "Agent"}))
+
+    assert sharded.shard_counts() != [300, 0, 0, 0]
+    assert len(seen) == 301
+    assert sharded.count() == plain.count() == 300
+    assert sharded.status_counts() == plain.status_counts()
+    assert sharded.get_version("C00007") == 2
+    assert sharded.get_record("c00008") == plain.get_record("c00008")
+    assert [e.employee_id for e in sharded.iter_employees(status="Agent")] == [
+        e.employee_id for e in plain.iter_employees(status="Agent")
+    ]
+    assert list(sharded.iter_records()) == list(plain.iter_records())
+    assert sharded.id_ranges(64) == plain.id_ranges(64)
+    assert sharded.get_range("C00010", "C00100") == plain.get_range(
+        "C00010", "C00100"
+    )
+
+
+@pytest.mark.parametrize(
+    "store",
+    [EmployeeStore(), ShardedEmployeeStore(":memory:", 3)],
+    ids=["plain", "sharded"],
+)
+def test_update_reapplies_the_change_after_a_concurrent_write(store):
+    store.put_many(employees(10))
+    calls = []
+
+    def hire(employee):
+        calls.append(employee.status)
+        if len(calls) == 1:
+            # Another writer lands between this read and its write.
+            other = store.get("c00004")
+            other.phone_number = "555-0100"
+            store.put(other)
+        employee.status = "Hired"
+        return True
+
+    updated = store.update("C00004", hire)
+
+    assert calls == ["Agent", "Agent"]
+    assert updated.status == "Hired"
+    stored = store.get("c00004")
+    assert (stored.status, stored.phone_number) == ("Hired", "555-0100")
+    assert store.get_version("c00004") == 3
+    assert store.update("nobody", hire) is None
+    assert store.update("c00004", lambda e: False).status == "Hired"
+    assert store.get_version("c00004") == 3
+    assert not store.put_if_version(stored, 2)
+    with pytest.raises(storage.VersionConflict):
+        store.update("c00005", lambda e: store.put(e) or True, attempts=2)
+
+
+@pytest.mark.parametrize(
+    "store",
+    [EmployeeStore(), ShardedEmployeeStore(":memory:", 3)],
+    ids=["plain", "sharded"],
+)
+def test_statuses_are_stored_in_their_canonical_spelling(store):
+    store.put_many(employees(6))
+    storage.set_store(store)
+    try:
+        # Tool arguments arrive lowercased by `before_tool`.
+        tools.update_employee_status("c00001", "hired")
+        tools.update_employee_status("c00002", "interview_scheduled")
+        tools.update_employee_status("c00004", " onboarding_complete ")
+    finally:
+        storage.set_store(None)
+    applicant = store.get("c00005").model_copy(update={"status": "APPLICANT"})
+    store.put(applicant)
+
+    assert store.get("c00001").status == "Hired"
+    assert store.get("c00002").status == "Interview Scheduled"
+    assert store.get("c00004").status == "onboarding_complete"
+    assert store.status_counts() == {
+        "Hired": 3,
+        "Interview Scheduled": 1,
+        "Applicant": 1,
+        "onboarding_complete": 1,
+    }
+    assert [e.employee_id for e in store.iter_employees(status="hired")] == [
+        "C00000",
+        "C00001",
+        "C00003",
+    ]
+
+
+def test_reshard_moves_employees_keeping_versions_and_layout(
+    tmp_path, monkeypatch
+):
+    # No other process uses the roster: skip the wait for them.
+    monkeypatch.setenv(
+        "GOOGLE_storage_settings", '{"layout_refresh_secs": 0}'
+    )
+    path = str(tmp_path / "roster.db")
+    store = EmployeeStore(path)
+    store.put_many(employees(600))
+    store.put(store.get("c00042"))
+    store.close()
+
+    grown = reshard.reshard(path, 4)
+    assert grown["from"] == 1 and grown["to"] == 4
+    assert sum(grown["per_shard"]) == 600 and min(grown["per_shard"]) > 100
+    assert (tmp_path / "roster.shard3.db").exists()
+
+    sharded = open_store(path)
+    assert isinstance(sharded, ShardedEmployeeStore)
+    assert sharded.layout == (4, None)
+    assert sharded.get_version("c00042") == 2
+    assert sharded.count() == 600
+    sharded.close()
+
+    shrunk = reshard.reshard(path, 3)
+    # Only the employees of the dropped shard move.
+    assert shrunk["moved"] == grown["per_shard"][3]
+    assert reshard.reshard(path, 1)["per_shard"] == [600]
+    single = open_store(path)
+    assert type(single) is EmployeeStore
+    assert single.get_version("c00042") == 2
+
+
+def test_reshard_keeps_serving_concurrent_reads_and_writes(tmp_path):
+    store = ShardedEmployeeStore(str(tmp_path / "roster.db"), 2, FAST)
+    store.put_many(employees(1500))
+    errors, stop = [], threading.Event()
+
+    def write(worker):
+        ids = [f"C{i:05d}" for i in range(worker, 1500, 4)]
+        for round in range(3):
+            for employee_id in ids:
+                employee = store.get(employee_id)
+                employee.status = f"round-{round}"
+                store.put(employee)
+
+    def read():
+        while not stop.is_set():
+            for index in range(0, 1500, 37):
+                if store.get(f"C{index:05d}") is None:
+                    errors.append(index)
+
+    readers = [threading.Thread(target=read) for _ in range(2)]
+    writers = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+    for thread in readers + writers:
+        thread.start()
+    try:
+        store.reshard(5, batch_size=50)
+    finally:
+        for thread in writers:
+            thread.join()
+        stop.set()
+        for thread in readers:
+            thread.join()
+
+    assert errors == []
+    assert store.count() == 1500 and store.layout == (5, None)
+    assert store.status_counts() == {"round-2": 1500}
+    # Three writes each on top of the insert: none lost, none undone.
+    assert {store.get_version(f"C{i:05d}") for i in range(1500)} == {4}
+
+
+def test_interrupted_reshard_serves_and_resumes(tmp_path, monkeypatch):
+    path = str(tmp_path / "roster.db")
+    store = ShardedEmployeeStore(path, 2, FAST)
+    store.put_many(employees(400))
+    calls = []
+
+    def fail_after_one(self, index, shards, batch_size):
+        calls.append(index)
+        if len(calls) > 1:
+            raise RuntimeError("killed")
+        return original(self, index, shards, batch_size)
+
+    original = ShardedEmployeeStore._migrate
+    monkeypatch.setattr(ShardedEmployeeStore, "_migrate", fail_after_one)
+    with pytest.raises(RuntimeError):
+        store.reshard(6)
+    monkeypatch.setattr(ShardedEmployeeStore, "_migrate", original)
+    store.close()
+
+    reopened = ShardedEmployeeStore(path, settings=FAST)
+    assert reopened.layout == (2, 6)
+    assert all(reopened.get(f"c{i:05d}") for i in range(400))
+    with pytest.raises(ValueError):
+        reopened.reshard(3)
+    assert reopened.reshard(6)["moved"] > 0
+    assert reopened.count() == 400 and reopened.layout == (6, None)
+
+
+def test_tools_route_through_the_sharded_store():
+    store = ShardedEmployeeStore(":memory:", 3)
+    store.put_many(employees(30))
+    storage.set_store(store)
+    try:
+        result = tools.update_employee_status("c00013", "Agent")
+    finally:
+        storage.set_store(None)
+
+    assert result["status"] == "Agent"
+    owner = store._shard(shard_of("C00013", 3))
+    assert owner.get("C00013").status == "Agent"
+    assert sharded_storage.read_layout(":memory:") is None
+    assert type(open_store(":memory:")) is EmployeeStore
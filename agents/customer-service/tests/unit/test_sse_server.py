@@ -0,0 +1,212 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import json
+import socket
+
+import pytest
+from benchmarks.bench_sse_server import (
+    StreamingLlm,
+    bench_runner,
+    chat,
+    read_chunked_events,
+    read_head,
+)
+from customer_service.config import ServerModel
+from customer_service.main import ChatServer
+from google.adk.models import LlmResponse
+from google.genai import types
+
+
+class CountingLlm(StreamingLlm):
+    """Streams large chunks and counts how many it has produced."""
+
+    produced: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        for _ in range(self.chunks):
+            self.produced += 1
+            await asyncio.sleep(0)
+            yield LlmResponse(
+                content=types.Content(
+                    role="model", parts=[types.Part(text="x" * 65536)]
+                ),
+                partial=True,
+            )
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="ok")])
+        )
+
+
+async def start_server(runner=None, **settings):
+    server = ChatServer(
+        runner or bench_runner(latency_ms=1, chunks=3),
+        ServerModel(port=0, **settings),
+    )
+    await server.start()
+    return server
+
+
+async def request(port, raw):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(raw)
+    await writer.drain()
+    status, headers = await read_head(reader)
+    body = await reader.readexactly(int(headers["content-length"]))
+    writer.close()
+    return status, headers, json.loads(body)
+
+
+@pytest.mark.asyncio
+async def test_streams_events_and_reuses_the_connection():
+    server = await start_server()
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+
+    first = await chat(reader, writer, "hi")
+    second = await chat(reader, writer, "again", first["session_id"])
+
+    kinds = [event for event, _ in first["events"]]
+    assert kinds[0] == "session" and kinds[-1] == "done"
+    messages = [data for event, data in first["events"] if event == "message"]
+    assert [m["partial"] for m in messages] == [True, True, True, False]
+    assert messages[-1]["final"] and messages[-1]["author"] == "bench_agent"
+    assert first["keep_alive"]
+    assert second["session_id"] == first["session_id"]
+    writer.close()
+    await server.shutdown()
+
+
+async def open_slow_client(port):
+    sock = socket.socket()
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 65536)
+    sock.connect(("127.0.0.1", port))
+    reader, writer = await asyncio.open_connection(sock=sock)
+    body = b'{"message": "hi"}'
+    writer.write(
+        b"POST /chat HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s"
+        % (len(body), body)
+    )
+    await writer.drain()
+    return reader, writer
+
+
+@pytest.mark.asyncio
+async def test_slow_client_gets_coalesced_deltas():
+    runner = bench_runner()
+    runner.agent.model = CountingLlm(model="stub", chunks=200)
+    server = await start_server(runner, client_queue_size=2)
+    reader, writer = await open_slow_client(server.port)
+
+    await asyncio.sleep(0.5)
+    await read_head(reader)
+    events = [e async for e in read_chunked_events(reader)]
+
+    deltas = [d for e, d in events if e == "message" and d["partial"]]
+    assert len(deltas) < 200
+    assert sum(len(d["text"]) for d in deltas) == 200 * 65536
+    assert events[-1][0] == "done"
+    writer.close()
+    await server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stalled_client_is_disconnected():
+    runner = bench_runner()
+    runner.agent.model = CountingLlm(model="stub", chunks=400)
+    server = await start_server(runner, write_timeout_secs=0.3)
+    _, writer = await open_slow_client(server.port)
+
+    for _ in range(50):
+        await asyncio.sleep(0.1)
+        if server.active_streams == 0:
+            break
+
+    assert server.active_streams == 0
+    writer.close()
+    await server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_rejects_with_retry_after():
+    server = await start_server(
+        bench_runner(latency_ms=300, chunks=1),
+        max_concurrent_runs=1,
+        admission_timeout_secs=0.05,
+    )
+    slow = asyncio.create_task(
+        chat(*await asyncio.open_connection("127.0.0.1", server.port), "a")
+    )
+    await asyncio.sleep(0.1)
+
+    status, headers, body = await request(
+        server.port,
+        b'POST /chat HTTP/1.1\r\nContent-Length: 16\r\n\r\n{"message": "b"}',
+    )
+
+    assert status == 503 and headers["retry-after"] == "1"
+    assert (await slow)["status"] == 200
+    await server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_drains_running_chats_and_closes_idle_ones():
+    server = await start_server(bench_runner(latency_ms=300, chunks=1))
+    port = server.port
+    idle_reader, idle_writer = await asyncio.open_connection(
+        "127.0.0.1", server.port
+    )
+    reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+    running = asyncio.create_task(chat(reader, writer, "a"))
+    await asyncio.sleep(0.1)
+
+    await server.shutdown()
+
+    result = await running
+    assert result["events"][-1][0] == "done"
+    # Both connections are closed once the chat has finished.
+    assert await reader.read() == b""
+    assert await idle_reader.read() == b""
+    with pytest.raises(OSError):
+        await asyncio.open_connection("127.0.0.1", port)
+    idle_writer.close()
+
+
+@pytest.mark.asyncio
+async def test_health_and_errors():
+    server = await start_server()
+
+    status, _, health = await request(
+        server.port, b"GET /healthz HTTP/1.1\r\n\r\n"
+    )
+    missing, _, _ = await request(server.port, b"GET /nope HTTP/1.1\r\n\r\n")
+    bad, _, _ = await request(
+        server.port, b"POST /chat HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}"
+    )
+
+    lengths = [
+        (
+            await request(
+                server.port,
+                b"POST /chat HTTP/1.1\r\nContent-Length: %s\r\n\r\n" % value,
+            )
+        )[0]
+        for value in (b"abc", b"-5", b"+2", b"1_0")
+    ]
+
+    assert status == 200 and health["status"] == "ok"
+    assert missing == 404
+    assert bad == 400
+    assert lengths == [400] * 4
+    await server.shutdown()
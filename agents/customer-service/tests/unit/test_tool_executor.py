@@ -0,0 +1,179 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import inspect
+import threading
+import time
+
+import pytest
+from benchmarks.bench_parallel_tools import (
+    bench_runner,
+    in_call_order,
+    in_step_order,
+    run_turn,
+    slow_tool,
+)
+from customer_service.config import ToolExecutorModel
+from customer_service.entities.customer import Employee
+from customer_service.shared_libraries import hr_queue, storage
+from customer_service.shared_libraries.tool_executor import (
+    ToolExecutor,
+    parallelize,
+)
+from customer_service.tools import tools
+
+
+@pytest.fixture
+def executor():
+    executor = ToolExecutor(ToolExecutorModel(max_workers=8))
+    yield executor
+    executor.shutdown()
+
+
+def test_wrapped_tool_keeps_name_signature_and_docs(executor):
+    wrapped = parallelize([tools.update_employee_status], executor)[0]
+
+    assert inspect.iscoroutinefunction(wrapped)
+    assert wrapped.__name__ == "update_employee_status"
+    assert wrapped.__doc__ == tools.update_employee_status.__doc__
+    assert list(inspect.signature(wrapped).parameters) == [
+        "candidate_id",
+        "status",
+    ]
+
+
+def test_a_tool_shared_by_agents_is_wrapped_once(executor):
+    interview = parallelize(
+        [tools.evaluate_interview, tools.find_employee], executor
+    )
+    onboarding = parallelize([tools.find_employee], executor)
+
+    assert interview[1] is onboarding[0]
+    assert interview[0] is not interview[1]
+
+
+def test_concurrent_turns_for_one_candidate_keep_every_write():
+    # Per-candidate ordering covers one turn; other sessions' calls for the
+    # same candidate overlap on the pool and must not undo each other.
+    store = storage.EmployeeStore()
+    store.put(Employee.get_customer("E001"))
+    storage.set_store(store)
+    hr_queue.set_hr_queue(None)
+    statuses = ["Onboarded", "Agent"] * 10
+
+    def ask(worker):
+        for i in range(10):
+            tools.ask_hr_question("E001", f"question {worker} {i}")
+
+    threads = [threading.Thread(target=ask, args=(w,)) for w in range(3)]
+    threads.append(
+        threading.Thread(
+            target=lambda: [
+                tools.update_employee_status("E001", s) for s in statuses
+            ]
+        )
+    )
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        employee = store.get("E001")
+    finally:
+        hr_queue.set_hr_queue(None)
+        storage.set_store(None)
+
+    assert len(employee.hr_questions) == 30
+    assert employee.status == "Agent"
+    assert store.get_version("E001") == 1 + 30 + 20
+
+
+def test_disabled_executor_leaves_tools_alone():
+    executor = ToolExecutor(ToolExecutorModel(enabled=False))
+
+    assert parallelize([tools.find_employee], executor) == [
+        tools.find_employee
+    ]
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_same_candidate_runs_in_order_others_concurrently(executor):
+    log = []
+    update_step = executor.wrap(slow_tool(50, log))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            update_step(candidate_id=f"c{candidate}", step=step)
+            for step in range(3)
+            for candidate in range(4)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    assert [r["step"] for r in results] == [0] * 4 + [1] * 4 + [2] * 4
+    assert in_step_order(log)
+    # Three rounds of 50 ms, not twelve.
+    assert elapsed < 0.4
+
+
+@pytest.mark.asyncio
+async def test_timeout_answers_but_keeps_the_candidate_in_line():
+    executor = ToolExecutor(
+        ToolExecutorModel(timeouts={"hold": 0.05}, timeout_secs=5)
+    )
+    release = threading.Event()
+    order = []
+
+    def hold(candidate_id: str) -> dict:
+        release.wait(5)
+        order.append("hold")
+        return {"status": "done"}
+
+    def follow(candidate_id: str) -> dict:
+        order.append("follow")
+        return {"status": "done"}
+
+    result = await executor.wrap(hold)(candidate_id="C1")
+    follower = asyncio.create_task(executor.wrap(follow)(candidate_id="c1"))
+    other = await executor.wrap(follow)(candidate_id="C2")
+    await asyncio.sleep(0.05)
+
+    assert result["status"] == "error"
+    assert "0.05s" in result["message"]
+    assert executor.timeouts == 1
+    assert other["status"] == "done" and not follower.done()
+    release.set()
+    assert (await follower)["status"] == "done"
+    assert order == ["follow", "hold", "follow"]
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_multi_call_turn_runs_concurrently_in_adk(executor):
+    log = []
+    tool = parallelize([slow_tool(100, log)], executor)[0]
+    runner = bench_runner(tool, candidates=4, steps=2)
+    await run_turn(runner)  # pays for ADK's lazy imports
+    log.clear()
+
+    turn = await run_turn(runner)
+
+    assert len(turn["responses"]) == 8
+    assert in_call_order(turn["responses"])
+    assert in_step_order(log)
+    # Two rounds of 100 ms, not eight.
+    assert turn["ms"] < 500